@@ -0,0 +1,45 @@
+"""add depreciation models and segment index
+
+Revision ID: 0004_add_depreciation_models
+Revises: 0003_add_seller_reputation, 0003_add_sellers
+Create Date: 2024-02-01 00:00:00
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0004_add_depreciation_models"
+down_revision = ("0003_add_seller_reputation", "0003_add_sellers")
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "depreciation_models",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("region_key", sa.String(), nullable=False),
+        sa.Column("brand", sa.String(), nullable=False),
+        sa.Column("model", sa.String(), nullable=False),
+        sa.Column("reference_year", sa.Integer(), nullable=False),
+        sa.Column("intercept", sa.Float(), nullable=False),
+        sa.Column("year_coef", sa.Float(), nullable=False),
+        sa.Column("mileage_coef", sa.Float(), nullable=False),
+        sa.Column("residual_std", sa.Float(), nullable=False),
+        sa.Column("sample_size", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("region_key", "brand", "model", name="uq_depreciation_segment"),
+    )
+    op.create_index(
+        "ix_normalized_listings_segment",
+        "normalized_listings",
+        ["brand", "model", "state", "year"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_normalized_listings_segment", table_name="normalized_listings")
+    op.drop_table("depreciation_models")
@@ -0,0 +1,57 @@
+"""add duplicate listing clusters and LSH buckets
+
+Revision ID: 0005_add_listing_dedup
+Revises: 0004_add_depreciation_models
+Create Date: 2024-02-05 00:00:00
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0005_add_listing_dedup"
+down_revision = "0004_add_depreciation_models"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("normalized_listings", sa.Column("canonical_listing_id", sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        "fk_normalized_listings_canonical_listing_id",
+        "normalized_listings",
+        "normalized_listings",
+        ["canonical_listing_id"],
+        ["id"],
+    )
+    op.create_index("ix_normalized_listings_canonical_listing_id", "normalized_listings", ["canonical_listing_id"])
+
+    op.create_table(
+        "listing_fingerprints",
+        sa.Column("listing_id", sa.Integer(), nullable=False),
+        sa.Column("signature", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["listing_id"], ["normalized_listings.id"],),
+        sa.PrimaryKeyConstraint("listing_id"),
+    )
+    op.create_table(
+        "listing_lsh_buckets",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("bucket_key", sa.String(), nullable=False),
+        sa.Column("listing_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["listing_id"], ["normalized_listings.id"],),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_listing_lsh_buckets_bucket_key", "listing_lsh_buckets", ["bucket_key"])
+    op.create_index("ix_listing_lsh_buckets_listing_id", "listing_lsh_buckets", ["listing_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_listing_lsh_buckets_listing_id", table_name="listing_lsh_buckets")
+    op.drop_index("ix_listing_lsh_buckets_bucket_key", table_name="listing_lsh_buckets")
+    op.drop_table("listing_lsh_buckets")
+    op.drop_table("listing_fingerprints")
+    op.drop_index("ix_normalized_listings_canonical_listing_id", table_name="normalized_listings")
+    op.drop_constraint("fk_normalized_listings_canonical_listing_id", "normalized_listings", type_="foreignkey")
+    op.drop_column("normalized_listings", "canonical_listing_id")
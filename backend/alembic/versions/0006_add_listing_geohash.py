@@ -0,0 +1,26 @@
+"""add geohash cell to normalized listings
+
+Revision ID: 0006_add_listing_geohash
+Revises: 0005_add_listing_dedup
+Create Date: 2024-02-10 00:00:00
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0006_add_listing_geohash"
+down_revision = "0005_add_listing_dedup"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("normalized_listings", sa.Column("geohash", sa.String(length=12), nullable=True))
+    op.create_index("ix_normalized_listings_geohash", "normalized_listings", ["geohash"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_normalized_listings_geohash", table_name="normalized_listings")
+    op.drop_column("normalized_listings", "geohash")
@@ -0,0 +1,58 @@
+"""add listing text columns and full-text search indexes
+
+Revision ID: 0007_add_listing_text_search
+Revises: 0006_add_listing_geohash
+Create Date: 2024-02-12 00:00:00
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0007_add_listing_text_search"
+down_revision = "0006_add_listing_geohash"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("normalized_listings", sa.Column("title", sa.String(), nullable=True))
+    op.add_column("normalized_listings", sa.Column("description", sa.Text(), nullable=True))
+
+    if op.get_bind().dialect.name != "postgresql":
+        # SQLite builds its FTS5 table lazily, see app.services.search_index.
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(
+        """
+        ALTER TABLE normalized_listings ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('portuguese', coalesce(brand, '') || ' ' || coalesce(model, '')), 'A')
+            || setweight(to_tsvector('portuguese', coalesce("trim", '')), 'B')
+            || setweight(to_tsvector('portuguese', coalesce(title, '')), 'C')
+            || setweight(to_tsvector('portuguese', coalesce(description, '')), 'D')
+        ) STORED
+        """
+    )
+    op.execute(
+        """
+        ALTER TABLE normalized_listings ADD COLUMN search_document text GENERATED ALWAYS AS (
+            lower(coalesce(brand, '') || ' ' || coalesce(model, '') || ' ' || coalesce("trim", '') || ' ' || coalesce(title, ''))
+        ) STORED
+        """
+    )
+    op.execute("CREATE INDEX ix_normalized_listings_search_vector ON normalized_listings USING gin (search_vector)")
+    op.execute(
+        "CREATE INDEX ix_normalized_listings_search_trgm ON normalized_listings USING gin (search_document gin_trgm_ops)"
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_normalized_listings_search_trgm")
+        op.execute("DROP INDEX IF EXISTS ix_normalized_listings_search_vector")
+        op.drop_column("normalized_listings", "search_document")
+        op.drop_column("normalized_listings", "search_vector")
+    op.drop_column("normalized_listings", "description")
+    op.drop_column("normalized_listings", "title")
@@ -0,0 +1,36 @@
+"""add alert_matches outbox
+
+Revision ID: 0008_add_alert_matches
+Revises: 0007_add_listing_text_search
+Create Date: 2024-02-14 00:00:00
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0008_add_alert_matches"
+down_revision = "0007_add_listing_text_search"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "alert_matches",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("alert_id", sa.Integer(), sa.ForeignKey("alerts.id"), nullable=False),
+        sa.Column("listing_id", sa.Integer(), sa.ForeignKey("normalized_listings.id"), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("delivered_at", sa.DateTime(), nullable=True),
+        sa.UniqueConstraint("alert_id", "listing_id", name="uq_alert_match"),
+    )
+    op.create_index("ix_alert_matches_listing_id", "alert_matches", ["listing_id"])
+    op.create_index("ix_alert_matches_delivered_at", "alert_matches", ["delivered_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_alert_matches_delivered_at", table_name="alert_matches")
+    op.drop_index("ix_alert_matches_listing_id", table_name="alert_matches")
+    op.drop_table("alert_matches")
@@ -0,0 +1,26 @@
+"""add opportunity score and badge to normalized listings
+
+Revision ID: 0009_add_listing_opportunity_score
+Revises: 0008_add_alert_matches
+Create Date: 2024-02-16 00:00:00
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0009_add_listing_opportunity_score"
+down_revision = "0008_add_alert_matches"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("normalized_listings", sa.Column("opportunity_score", sa.Float(), nullable=True))
+    op.add_column("normalized_listings", sa.Column("opportunity_badge", sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("normalized_listings", "opportunity_badge")
+    op.drop_column("normalized_listings", "opportunity_score")
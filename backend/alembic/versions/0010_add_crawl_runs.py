@@ -0,0 +1,50 @@
+"""add crawl runs and listing last-seen tracking
+
+Revision ID: 0010_add_crawl_runs
+Revises: 0009_add_listing_opportunity_score
+Create Date: 2024-02-18 00:00:00
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0010_add_crawl_runs"
+down_revision = "0009_add_listing_opportunity_score"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "crawl_runs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("source_id", sa.Integer(), sa.ForeignKey("listing_sources.id"), nullable=False),
+        sa.Column("region_key", sa.String(), nullable=False, server_default=""),
+        sa.Column("query_text", sa.String(), nullable=False, server_default=""),
+        sa.Column("started_at", sa.DateTime(), nullable=False),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sa.Column("listings_seen", sa.Integer(), nullable=True),
+    )
+    op.create_index("ix_crawl_runs_scope", "crawl_runs", ["source_id", "region_key", "query_text", "id"])
+
+    op.add_column("raw_listings", sa.Column("crawl_run_id", sa.Integer(), sa.ForeignKey("crawl_runs.id"), nullable=True))
+    op.add_column(
+        "normalized_listings", sa.Column("last_seen_run_id", sa.Integer(), sa.ForeignKey("crawl_runs.id"), nullable=True)
+    )
+    op.add_column("normalized_listings", sa.Column("last_seen_at", sa.DateTime(), nullable=True))
+    op.create_index("ix_normalized_listings_last_seen_run_id", "normalized_listings", ["last_seen_run_id"])
+    op.create_index("ix_normalized_listings_source_external", "normalized_listings", ["source_id", "external_id"])
+    op.create_index("ix_normalized_listings_status_state", "normalized_listings", ["status", "state"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_normalized_listings_status_state", table_name="normalized_listings")
+    op.drop_index("ix_normalized_listings_source_external", table_name="normalized_listings")
+    op.drop_index("ix_normalized_listings_last_seen_run_id", table_name="normalized_listings")
+    op.drop_column("normalized_listings", "last_seen_at")
+    op.drop_column("normalized_listings", "last_seen_run_id")
+    op.drop_column("raw_listings", "crawl_run_id")
+    op.drop_index("ix_crawl_runs_scope", table_name="crawl_runs")
+    op.drop_table("crawl_runs")
@@ -0,0 +1,40 @@
+"""add listing price history and price trend
+
+Revision ID: 0011_add_listing_price_history
+Revises: 0010_add_crawl_runs
+Create Date: 2024-02-20 00:00:00
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0011_add_listing_price_history"
+down_revision = "0010_add_crawl_runs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "listing_price_history",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column(
+            "listing_id", sa.Integer(), sa.ForeignKey("normalized_listings.id"), nullable=False
+        ),
+        sa.Column("price_brl", sa.Float(), nullable=False),
+        sa.Column("observed_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index(
+        "ix_listing_price_history_listing_observed",
+        "listing_price_history",
+        ["listing_id", "observed_at"],
+    )
+    op.add_column("normalized_listings", sa.Column("price_trend", sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("normalized_listings", "price_trend")
+    op.drop_index("ix_listing_price_history_listing_observed", table_name="listing_price_history")
+    op.drop_table("listing_price_history")
@@ -0,0 +1,38 @@
+"""add raw payload archive index
+
+Revision ID: 0012_add_raw_payload_archive
+Revises: 0011_add_listing_price_history
+Create Date: 2024-02-22 00:00:00
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0012_add_raw_payload_archive"
+down_revision = "0011_add_listing_price_history"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "raw_payload_archive",
+        sa.Column("raw_id", sa.Integer(), primary_key=True),
+        sa.Column("source_id", sa.Integer(), sa.ForeignKey("listing_sources.id"), nullable=False),
+        sa.Column("external_id", sa.String(), nullable=False),
+        sa.Column("fetched_at", sa.DateTime(), nullable=False),
+        sa.Column("segment", sa.String(), nullable=False),
+        sa.Column("offset", sa.Integer(), nullable=False),
+        sa.Column("length", sa.Integer(), nullable=False),
+        sa.Column("line", sa.Integer(), nullable=False),
+    )
+    op.create_index("ix_raw_payload_archive_fetched_at", "raw_payload_archive", ["fetched_at"])
+    op.create_index("ix_raw_listings_source_external", "raw_listings", ["source_id", "external_id", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_raw_listings_source_external", table_name="raw_listings")
+    op.drop_index("ix_raw_payload_archive_fetched_at", table_name="raw_payload_archive")
+    op.drop_table("raw_payload_archive")
@@ -0,0 +1,36 @@
+"""add html_pages index for the stored detail page packs
+
+Revision ID: 0013_add_html_pages
+Revises: 0012_add_raw_payload_archive
+Create Date: 2024-02-24 00:00:00
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0013_add_html_pages"
+down_revision = "0012_add_raw_payload_archive"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "html_pages",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("source_name", sa.String(), nullable=False),
+        sa.Column("external_id", sa.String(), nullable=True),
+        sa.Column("url", sa.String(), nullable=False),
+        sa.Column("pack", sa.String(), nullable=False),
+        sa.Column("offset", sa.Integer(), nullable=False),
+        sa.Column("length", sa.Integer(), nullable=False),
+        sa.Column("fetched_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_html_pages_source_external", "html_pages", ["source_name", "external_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_html_pages_source_external", table_name="html_pages")
+    op.drop_table("html_pages")
@@ -0,0 +1,74 @@
+"""make (source_id, external_id) unique on normalized_listings
+
+Revision ID: 0014_unique_normalized_listing_source
+Revises: 0013_add_html_pages
+Create Date: 2024-02-26 00:00:00
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0014_unique_normalized_listing_source"
+down_revision = "0013_add_html_pages"
+branch_labels = None
+depends_on = None
+
+# Concurrent normalization could insert the same marketplace listing twice. Duplicates are
+# folded into the newest row (it carries the latest crawl) before the constraint goes on.
+REPOINTED = (
+    ("listing_price_history", "listing_id"),
+    ("alert_matches", "listing_id"),
+    ("recommendations", "chosen_listing_id"),
+    ("normalized_listings", "canonical_listing_id"),
+)
+DROPPED = ("listing_fingerprints", "listing_lsh_buckets")
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE TEMPORARY TABLE listing_merge AS
+        SELECT n.id AS id,
+               (SELECT MAX(k.id) FROM normalized_listings k
+                WHERE k.source_id = n.source_id AND k.external_id = n.external_id) AS keep_id
+        FROM normalized_listings n
+        """
+    )
+    op.execute("DELETE FROM listing_merge WHERE id = keep_id")
+    # An alert may already have matched the surviving row; uq_alert_match forbids a second match.
+    op.execute(
+        """
+        DELETE FROM alert_matches
+        WHERE listing_id IN (SELECT id FROM listing_merge)
+          AND EXISTS (
+            SELECT 1 FROM alert_matches kept, listing_merge m
+            WHERE m.id = alert_matches.listing_id
+              AND kept.listing_id = m.keep_id
+              AND kept.alert_id = alert_matches.alert_id
+          )
+        """
+    )
+    for table, column in REPOINTED:
+        op.execute(
+            f"""
+            UPDATE {table}
+            SET {column} = (SELECT m.keep_id FROM listing_merge m WHERE m.id = {table}.{column})
+            WHERE {column} IN (SELECT id FROM listing_merge)
+            """
+        )
+    op.execute("UPDATE normalized_listings SET canonical_listing_id = NULL WHERE canonical_listing_id = id")
+    # Fingerprints and LSH buckets are rebuilt from the surviving row on its next normalization.
+    for table in DROPPED:
+        op.execute(f"DELETE FROM {table} WHERE listing_id IN (SELECT id FROM listing_merge)")
+    op.execute("DELETE FROM normalized_listings WHERE id IN (SELECT id FROM listing_merge)")
+    op.execute("DROP TABLE listing_merge")
+
+    op.drop_index("ix_normalized_listings_source_external", table_name="normalized_listings")
+    op.create_unique_constraint(
+        "uq_normalized_listings_source_external", "normalized_listings", ["source_id", "external_id"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("uq_normalized_listings_source_external", "normalized_listings", type_="unique")
+    op.create_index("ix_normalized_listings_source_external", "normalized_listings", ["source_id", "external_id"])
@@ -0,0 +1,40 @@
+"""add listing price drops
+
+Revision ID: 0015_add_listing_price_drops
+Revises: 0014_unique_normalized_listing_source
+Create Date: 2024-03-04 00:00:00
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0015_add_listing_price_drops"
+down_revision = "0014_unique_normalized_listing_source"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "listing_price_drops",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column(
+            "listing_id", sa.Integer(), sa.ForeignKey("normalized_listings.id"), nullable=False
+        ),
+        sa.Column("crawl_run_id", sa.Integer(), sa.ForeignKey("crawl_runs.id"), nullable=False),
+        sa.Column("previous_price_brl", sa.Float(), nullable=False),
+        sa.Column("current_price_brl", sa.Float(), nullable=False),
+        sa.Column("drop_ratio", sa.Float(), nullable=False),
+        sa.Column("detected_at", sa.DateTime(), nullable=False),
+        sa.UniqueConstraint("listing_id", "crawl_run_id", name="uq_listing_price_drop_run"),
+    )
+    op.create_index("ix_listing_price_drops_listing_id", "listing_price_drops", ["listing_id"])
+    op.create_index("ix_listing_price_drops_detected_at", "listing_price_drops", ["detected_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_listing_price_drops_detected_at", table_name="listing_price_drops")
+    op.drop_index("ix_listing_price_drops_listing_id", table_name="listing_price_drops")
+    op.drop_table("listing_price_drops")
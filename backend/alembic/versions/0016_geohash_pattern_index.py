@@ -0,0 +1,34 @@
+"""index geohash with varchar_pattern_ops for prefix search
+
+Revision ID: 0016_geohash_pattern_index
+Revises: 0015_add_listing_price_drops
+Create Date: 2024-03-06 00:00:00
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0016_geohash_pattern_index"
+down_revision = "0015_add_listing_price_drops"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        # SQLite's LIKE optimisation does not need a special operator class.
+        return
+    op.drop_index("ix_normalized_listings_geohash", table_name="normalized_listings")
+    op.create_index(
+        "ix_normalized_listings_geohash",
+        "normalized_listings",
+        ["geohash"],
+        postgresql_ops={"geohash": "varchar_pattern_ops"},
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.drop_index("ix_normalized_listings_geohash", table_name="normalized_listings")
+    op.create_index("ix_normalized_listings_geohash", "normalized_listings", ["geohash"])
@@ -0,0 +1,33 @@
+"""index the opportunities feed order
+
+Revision ID: 0017_add_opportunity_feed_index
+Revises: 0016_geohash_pattern_index
+Create Date: 2024-03-08 00:00:00
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0017_add_opportunity_feed_index"
+down_revision = "0016_geohash_pattern_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        # SQLite cannot declare NULLS LAST on an index column; it sorts the (small) region instead.
+        return
+    # Matches the feed: live canonical listings of a state, best opportunity_score first.
+    op.execute(
+        """
+        CREATE INDEX ix_normalized_listings_feed ON normalized_listings
+            (state, opportunity_score DESC NULLS LAST, id)
+            WHERE status = 'active' AND canonical_listing_id IS NULL
+        """
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_normalized_listings_feed")
@@ -0,0 +1,38 @@
+"""key listing price drops by the price change instead of the crawl run
+
+Revision ID: 0018_key_price_drops_by_price_change
+Revises: 0017_add_opportunity_feed_index
+Create Date: 2024-03-11 00:00:00
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0018_key_price_drops_by_price_change"
+down_revision = "0017_add_opportunity_feed_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # A drop that persisted over several runs was stored once per run; keep the first sighting.
+    op.execute(
+        """
+        DELETE FROM listing_price_drops
+        WHERE id NOT IN (
+            SELECT MIN(id) FROM listing_price_drops
+            GROUP BY listing_id, previous_price_brl, current_price_brl
+        )
+        """
+    )
+    with op.batch_alter_table("listing_price_drops") as batch:
+        batch.drop_constraint("uq_listing_price_drop_run", type_="unique")
+        batch.create_unique_constraint(
+            "uq_listing_price_drop", ["listing_id", "previous_price_brl", "current_price_brl"]
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("listing_price_drops") as batch:
+        batch.drop_constraint("uq_listing_price_drop", type_="unique")
+        batch.create_unique_constraint("uq_listing_price_drop_run", ["listing_id", "crawl_run_id"])
@@ -1,9 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_db
-from app.core.security import create_access_token, hash_password, verify_password
+from app.api.deps import get_async_db
+from app.core.security import create_access_token, hash_password_async, verify_password_async
 from app.models.user import User
 from app.schemas.auth import TokenOut, UserCreate, UserOut
 
@@ -11,21 +11,21 @@ router = APIRouter(prefix="/v1/auth", tags=["auth"])
 
 
 @router.post("/register", response_model=UserOut)
-def register(user_in: UserCreate, db: Session = Depends(get_db)) -> UserOut:
-    existing = db.execute(select(User).where(User.email == user_in.email)).scalar_one_or_none()
+async def register(user_in: UserCreate, db: AsyncSession = Depends(get_async_db)) -> UserOut:
+    existing = (await db.execute(select(User).where(User.email == user_in.email))).scalar_one_or_none()
     if existing:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
-    user = User(email=user_in.email, hashed_password=hash_password(user_in.password))
+    user = User(email=user_in.email, hashed_password=await hash_password_async(user_in.password))
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     return user
 
 
 @router.post("/login", response_model=TokenOut)
-def login(user_in: UserCreate, db: Session = Depends(get_db)) -> TokenOut:
-    user = db.execute(select(User).where(User.email == user_in.email)).scalar_one_or_none()
-    if not user or not verify_password(user_in.password, user.hashed_password):
+async def login(user_in: UserCreate, db: AsyncSession = Depends(get_async_db)) -> TokenOut:
+    user = (await db.execute(select(User).where(User.email == user_in.email))).scalar_one_or_none()
+    if not user or not await verify_password_async(user_in.password, user.hashed_password):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
     token = create_access_token(user.email)
     return TokenOut(access_token=token)
@@ -0,0 +1,37 @@
+import datetime as dt
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Response, status
+
+
+def listing_etag(listing_id: int, updated_at: Optional[dt.datetime]) -> str:
+    version = updated_at.isoformat() if updated_at else "0"
+    return f'"{listing_id}-{version}"'
+
+
+def digest_etag(*parts: Any) -> str:
+    """Strong ETag over values whose repr changes whenever the response would."""
+    return '"{}"'.format(hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest())
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    # If-None-Match uses weak comparison (RFC 9110 13.1.2), so a W/ prefix on either side is ignored.
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(",")
+    )
+
+
+def validator_headers(etag: str, cache_control: str) -> dict[str, str]:
+    return {"ETag": etag, "Cache-Control": cache_control}
+
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED, headers=validator_headers(etag, cache_control)
+    )
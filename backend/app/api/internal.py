@@ -1,10 +1,7 @@
 from fastapi import APIRouter
 from pydantic import BaseModel
-from redis import Redis
-from rq import Queue
 
 from app.core.config import get_settings
-from app.workers import jobs
 
 router = APIRouter(prefix="/internal", tags=["internal"])
 
@@ -17,11 +14,16 @@ class IngestRequest(BaseModel):
 
 @router.post("/ingest/{source_name}")
 def ingest_source(source_name: str, request: IngestRequest):
+    # rq and the jobs module (every service and connector) are only needed by the worker, so the
+    # job is enqueued by dotted path and rq is imported on first use.
+    from redis import Redis
+    from rq import Queue
+
     settings = get_settings()
     redis_conn = Redis.from_url(settings.redis_url)
     queue = Queue("axis", connection=redis_conn)
     job = queue.enqueue(
-        jobs.ingest_marketplace,
+        "app.workers.jobs.ingest_marketplace",
         source_name,
         request.region_key,
         request.query_text,
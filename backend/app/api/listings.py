@@ -1,61 +1,185 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db
-from app.models.listing import MarketStats, NormalizedListing
-from app.schemas.listing import ListingOut, OpportunityResponse, SellerStatsOut
-from app.services.pricing import compute_opportunity_badge, compute_regional_market_stats
+from app.api.deps import get_async_db
+from app.api.http_cache import (
+    digest_etag,
+    etag_matches,
+    listing_etag,
+    not_modified,
+    validator_headers,
+)
+from app.api.serialization import (
+    LISTING_OUT_COLUMNS,
+    PreEncodedJSONResponse,
+    dump_listing,
+    dump_listing_batch,
+    dump_nearby,
+    dump_opportunities,
+)
+from app.core.config import get_settings
+from app.models.listing import LISTING_STATUS_ACTIVE, NormalizedListing
+from app.schemas.listing import (
+    LISTING_BATCH_MAX_IDS,
+    ListingBatchRequest,
+    ListingBatchResponse,
+    ListingOut,
+    NearbyResponse,
+    OpportunityResponse,
+    SellerStatsOut,
+)
+from app.services.geo import nearby_listings
+from app.services.response_cache import (
+    LISTING_ROUTE,
+    OPPORTUNITIES_ROUTE,
+    get_response_cache,
+    region_group,
+)
+from app.services.seller_leaderboard import get_seller_leaderboard, seller_stats_entry
 from app.services.seller_stats import top_trusted_sellers
-from app.services.trust import TrustSignals, trust_badge
 
 router = APIRouter(prefix="/v1", tags=["listings"])
 
+FEED_SIZE = 20
+
 
 @router.get("/opportunities", response_model=OpportunityResponse)
-def opportunities(region: str, db: Session = Depends(get_db)) -> OpportunityResponse:
-    stats = db.execute(select(MarketStats).where(MarketStats.region_key == region)).scalar_one_or_none()
-    if not stats:
-        stats = compute_regional_market_stats(db, region_key=region)
-    listings = db.execute(select(NormalizedListing).limit(20)).scalars().all()
-    items = []
-    for listing in listings:
-        badge = compute_opportunity_badge(listing.final_price_brl or 0, stats.median_price if stats else None, stats.p25 if stats else None)
-        badge = badge or trust_badge(TrustSignals(seller_type=listing.seller_type, has_photos=bool(listing.photos)))
-        listing.badge = badge  # type: ignore[attr-defined]
-        items.append(listing)
-    return OpportunityResponse(items=items, count=len(items))
+async def opportunities(region: str, request: Request, db: AsyncSession = Depends(get_async_db)) -> Response:
+    cache_control = f"public, max-age={get_settings().feed_cache_max_age_seconds}"
+    cache = get_response_cache()
+    cached = await run_in_threadpool(cache.get, OPPORTUNITIES_ROUTE, region) if cache else None
+    if cached:
+        etag, body = cached
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return not_modified(etag, cache_control)
+        return PreEncodedJSONResponse(body, headers=validator_headers(etag, cache_control))
+
+    # Scores and badges are written by normalization and the daily scoring job, so the feed only
+    # reads them: best discount first, unscored listings last.
+    rows = (
+        await db.execute(
+            select(
+                *LISTING_OUT_COLUMNS,
+                NormalizedListing.opportunity_score,
+                NormalizedListing.opportunity_badge,
+                NormalizedListing.trust_badge,
+            )
+            .where(
+                NormalizedListing.status == LISTING_STATUS_ACTIVE,
+                NormalizedListing.canonical_listing_id.is_(None),
+                NormalizedListing.state == region,
+            )
+            .order_by(NormalizedListing.opportunity_score.desc().nulls_last(), NormalizedListing.id)
+            .limit(FEED_SIZE)
+        )
+    ).mappings().all()
+    badges = [row["opportunity_badge"] or row["trust_badge"] for row in rows]
+    etag = digest_etag(
+        region,
+        [(row["id"], row["updated_at"], row["opportunity_score"]) for row in rows],
+        badges,
+    )
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag, cache_control)
+    body = dump_opportunities(rows, badges)
+    if cache:
+        await run_in_threadpool(cache.put, OPPORTUNITIES_ROUTE, region, etag, body)
+    return PreEncodedJSONResponse(body, headers=validator_headers(etag, cache_control))
+
+
+def _trusted_sellers(db: Session, limit: int, origin: str | None) -> list[dict]:
+    return [seller_stats_entry(stat, stat.seller) for stat in top_trusted_sellers(db, limit=limit, origin=origin)]
 
 
 @router.get("/trusted-sellers", response_model=list[SellerStatsOut])
-def trusted_sellers(
+async def trusted_sellers(
     limit: int = Query(10, ge=1, le=50),
     origin: str | None = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> list[SellerStatsOut]:
-    stats = top_trusted_sellers(db, limit=limit, origin=origin)
-    response: list[SellerStatsOut] = []
-    for stat in stats:
-        seller = getattr(stat, "seller", None)
-        response.append(
-            SellerStatsOut(
-                seller_id=stat.seller_id,
-                origin=seller.origin if seller else "",
-                reputation_medal=seller.reputation_medal if seller else None,
-                reputation_score=seller.reputation_score if seller else None,
-                cancellations=seller.cancellations if seller else None,
-                response_time_hours=seller.response_time_hours if seller else None,
-                completed_sales=seller.completed_sales if seller else stat.completed_sales,
-                average_price_brl=stat.average_price_brl,
-                listings_count=stat.listings_count,
-                problem_rate=stat.problem_rate,
-                reliability_score=stat.reliability_score,
-            )
+    cached = await run_in_threadpool(get_seller_leaderboard().top, limit, origin)
+    if cached is not None:
+        return cached
+    return await db.run_sync(_trusted_sellers, limit, origin)
+
+
+@router.get("/listings/nearby", response_model=NearbyResponse)
+async def listings_nearby(
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(25, gt=0, le=500),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
+) -> PreEncodedJSONResponse:
+    matches = await db.run_sync(nearby_listings, LISTING_OUT_COLUMNS, lat, lng, radius_km, limit)
+    return PreEncodedJSONResponse(dump_nearby(matches))
+
+
+def _parse_ids(values: list[str]) -> list[int]:
+    try:
+        ids = [int(part) for value in values for part in value.split(",") if part.strip()]
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="ids must be integers") from exc
+    if not ids or len(ids) > LISTING_BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Pass between 1 and {LISTING_BATCH_MAX_IDS} ids",
         )
-    return response
+    return ids
+
+
+async def _listing_batch(db: AsyncSession, ids: list[int]) -> PreEncodedJSONResponse:
+    # One IN query for the whole batch; repeated ids are answered once, in first-seen order.
+    requested = list(dict.fromkeys(ids))
+    rows = (
+        await db.execute(select(*LISTING_OUT_COLUMNS).where(NormalizedListing.id.in_(requested)))
+    ).mappings().all()
+    by_id = {row["id"]: row for row in rows}
+    found = [by_id[listing_id] for listing_id in requested if listing_id in by_id]
+    missing = [listing_id for listing_id in requested if listing_id not in by_id]
+    return PreEncodedJSONResponse(dump_listing_batch(found, missing))
+
+
+@router.get("/listings", response_model=ListingBatchResponse)
+async def get_listings(
+    ids: list[str] = Query(..., description="Comma-separated or repeated listing ids"),
+    db: AsyncSession = Depends(get_async_db),
+) -> PreEncodedJSONResponse:
+    return await _listing_batch(db, _parse_ids(ids))
+
+
+@router.post("/listings/batch", response_model=ListingBatchResponse)
+async def get_listings_batch(
+    batch: ListingBatchRequest, db: AsyncSession = Depends(get_async_db)
+) -> PreEncodedJSONResponse:
+    return await _listing_batch(db, batch.ids)
 
 
 @router.get("/listings/{listing_id}", response_model=ListingOut)
-def get_listing(listing_id: int, db: Session = Depends(get_db)) -> ListingOut:
-    listing = db.get(NormalizedListing, listing_id)
-    return listing
+async def get_listing(listing_id: int, request: Request, db: AsyncSession = Depends(get_async_db)) -> Response:
+    cache_control = f"public, max-age={get_settings().listing_cache_max_age_seconds}"
+    cache = get_response_cache()
+    cached = await run_in_threadpool(cache.get, LISTING_ROUTE, str(listing_id)) if cache else None
+    if cached:
+        etag, body = cached
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return not_modified(etag, cache_control)
+        return PreEncodedJSONResponse(body, headers=validator_headers(etag, cache_control))
+
+    row = (
+        await db.execute(select(*LISTING_OUT_COLUMNS).where(NormalizedListing.id == listing_id))
+    ).mappings().first()
+    if not row:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Listing not found")
+    etag = listing_etag(row["id"], row["updated_at"])
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag, cache_control)
+    body = dump_listing(row)
+    if cache:
+        await run_in_threadpool(
+            cache.put, LISTING_ROUTE, str(listing_id), etag, body, region_group(row["state"])
+        )
+    return PreEncodedJSONResponse(body, headers=validator_headers(etag, cache_control))
@@ -1,9 +1,18 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db
-from app.schemas.listing import AxisBotMessage, AxisBotReply, SearchRequest, SearchResponse
+from app.api.deps import get_async_db, get_db
+from app.api.serialization import LISTING_OUT_COLUMNS, PreEncodedJSONResponse, dump_search_page
+from app.schemas.listing import (
+    AxisBotMessage,
+    AxisBotReply,
+    ListingSearchResponse,
+    SearchRequest,
+    SearchResponse,
+)
 from app.services.recommendations import AxisBotService
+from app.services.search_index import search_listings
 
 router = APIRouter(prefix="/v1", tags=["search"])
 
@@ -16,6 +25,20 @@ def start_search(payload: SearchRequest, db: Session = Depends(get_db)) -> Searc
     return SearchResponse(session_id=session_id)
 
 
+@router.get("/search/listings", response_model=ListingSearchResponse)
+async def search_listing_text(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_async_db),
+) -> PreEncodedJSONResponse:
+    try:
+        page = await db.run_sync(search_listings, LISTING_OUT_COLUMNS, q, limit, cursor)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    return PreEncodedJSONResponse(dump_search_page(page.items, page.next_cursor))
+
+
 @router.post("/axis-bot/chat", response_model=AxisBotReply)
 def axis_bot_chat(message: AxisBotMessage, db: Session = Depends(get_db)) -> AxisBotReply:
     return bot_service.handle_message(db, message.session_id, message.message)
@@ -1,14 +1,36 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.deps import get_async_db
 from app.schemas.listing import SellEstimateRequest, SellEstimateResponse
+from app.services.normalization import normalize_brand
+from app.services.valuation import ValuationQuery, estimate_sale_price, parse_vehicle_description
 
 router = APIRouter(prefix="/v1", tags=["sell"])
 
 
-@router.post("/sell/estimate", response_model=SellEstimateResponse)
-def estimate_price(payload: SellEstimateRequest) -> SellEstimateResponse:
+def _fallback_estimate(payload: SellEstimateRequest) -> SellEstimateResponse:
     base_price = 80000
     if payload.mileage_km:
         base_price -= payload.mileage_km * 0.05
     rationale = "Estimativa baseada em históricos regionais e condição informada."
     return SellEstimateResponse(min_price=base_price * 0.95, max_price=base_price * 1.05, rationale=rationale)
+
+
+@router.post("/sell/estimate", response_model=SellEstimateResponse)
+async def estimate_price(payload: SellEstimateRequest, db: AsyncSession = Depends(get_async_db)) -> SellEstimateResponse:
+    parsed_brand, parsed_model, parsed_year = parse_vehicle_description(payload.description)
+    query = ValuationQuery(
+        brand=normalize_brand(payload.brand) or parsed_brand,
+        model=payload.model or parsed_model,
+        year=payload.year or parsed_year,
+        mileage_km=payload.mileage_km,
+        region=payload.region,
+    )
+    valuation = await db.run_sync(estimate_sale_price, query)
+    if not valuation:
+        return _fallback_estimate(payload)
+    rationale = f"Estimativa baseada em {valuation.comparables} anúncios comparáveis"
+    if valuation.segment:
+        rationale += " e no modelo de depreciação do segmento"
+    return SellEstimateResponse(min_price=valuation.min_price, max_price=valuation.max_price, rationale=f"{rationale}.")
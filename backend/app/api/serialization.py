@@ -0,0 +1,79 @@
+from typing import Any, Iterable, Mapping, Optional, Sequence
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from app.core.instrumentation import timed_section
+from app.models.listing import NormalizedListing
+from app.schemas.listing import (
+    ListingBatchResponse,
+    ListingOut,
+    ListingSearchResponse,
+    NearbyListingOut,
+    NearbyResponse,
+    OpportunityResponse,
+)
+from app.services.normalization import normalize_photos
+
+# Columns backing ListingOut, selected directly so rows come back as mappings instead of ORM objects.
+LISTING_OUT_COLUMNS = tuple(
+    getattr(NormalizedListing, field) for field in ListingOut.model_fields if hasattr(NormalizedListing, field)
+)
+
+listing_adapter = TypeAdapter(ListingOut)
+opportunity_adapter = TypeAdapter(OpportunityResponse)
+nearby_adapter = TypeAdapter(NearbyResponse)
+search_adapter = TypeAdapter(ListingSearchResponse)
+batch_adapter = TypeAdapter(ListingBatchResponse)
+
+
+class PreEncodedJSONResponse(Response):
+    """Response for bodies already encoded by a pydantic-core serializer."""
+
+    media_type = "application/json"
+
+
+def _photos(value: Any) -> list[str]:
+    # photos is an untyped JSON column and older rows hold null, a bare URL or an object there;
+    # model_construct does not validate, so anything but a list is coerced here.
+    return value if isinstance(value, list) else normalize_photos(value)
+
+
+def _construct_listing(row: Mapping[str, Any], badge: Optional[str] = None) -> ListingOut:
+    # Rows come from typed columns, so validation is skipped and only the compiled serializer runs.
+    fields = dict(row)
+    fields["photos"] = _photos(fields.get("photos"))
+    return ListingOut.model_construct(**fields, badge=badge)
+
+
+@timed_section("serialization")
+def dump_listing(row: Mapping[str, Any], badge: Optional[str] = None) -> bytes:
+    return listing_adapter.dump_json(_construct_listing(row, badge))
+
+
+@timed_section("serialization")
+def dump_opportunities(rows: Sequence[Mapping[str, Any]], badges: Iterable[Optional[str]]) -> bytes:
+    items = [_construct_listing(row, badge) for row, badge in zip(rows, badges, strict=True)]
+    return opportunity_adapter.dump_json(OpportunityResponse.model_construct(items=items, count=len(items)))
+
+
+@timed_section("serialization")
+def dump_listing_batch(rows: Sequence[Mapping[str, Any]], missing: Sequence[int]) -> bytes:
+    items = [_construct_listing(row) for row in rows]
+    return batch_adapter.dump_json(ListingBatchResponse.model_construct(items=items, missing=list(missing)))
+
+
+@timed_section("serialization")
+def dump_search_page(rows: Sequence[Mapping[str, Any]], next_cursor: Optional[str]) -> bytes:
+    items = [_construct_listing(row) for row in rows]
+    return search_adapter.dump_json(ListingSearchResponse.model_construct(items=items, next_cursor=next_cursor))
+
+
+@timed_section("serialization")
+def dump_nearby(matches: Sequence[tuple[Mapping[str, Any], float]]) -> bytes:
+    items = []
+    for row, distance in matches:
+        fields = {key: value for key, value in row.items() if key in NearbyListingOut.model_fields}
+        fields["photos"] = _photos(fields.get("photos"))
+        items.append(NearbyListingOut.model_construct(**fields, distance_km=round(distance, 2)))
+    return nearby_adapter.dump_json(NearbyResponse.model_construct(items=items, count=len(items)))
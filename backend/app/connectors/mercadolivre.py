@@ -4,13 +4,17 @@ import re
 import time
 from html import unescape
 from random import uniform
-from typing import Iterable, List, Mapping, Optional
-
+from typing import TYPE_CHECKING, Iterable, List, Mapping, Optional
 from xml.etree import ElementTree as ET
 
 from app.core.config import get_settings
+from app.core.metrics import CONNECTOR_FETCH_SECONDS, CONNECTOR_PARSE_SECONDS
+
 from .base import BaseConnector
 
+if TYPE_CHECKING:
+    from app.services.html_store import HtmlPackWriter
+
 logger = logging.getLogger(__name__)
 
 
@@ -63,20 +67,6 @@ def _get_text(node: Optional[ET.Element]) -> Optional[str]:
             text_parts.append(child.tail)
     text = "".join(text_parts).strip()
     return text or None
-    urls: List[str] = []
-    anchor_pattern = re.compile(
-        r"<a[^>]*class=\"[^\"]*ui-search-link[^\"]*\"[^>]*href=\"([^\"]+)\"",
-        re.IGNORECASE,
-    )
-    for match in anchor_pattern.finditer(html):
-        href = match.group(1)
-        if href and LISTING_ID_PATTERN.search(href):
-            urls.append(href.split("?", 1)[0])
-    seen: List[str] = []
-    for url in urls:
-        if url not in seen:
-            seen.append(url)
-    return seen
 
 
 def _parse_numeric(text: Optional[str]) -> Optional[float]:
@@ -108,41 +98,40 @@ def _extract_city_state(root: ET.Element) -> tuple[Optional[str], Optional[str]]
     return None, None
 
 
-def _extract_seller_metadata(soup: BeautifulSoup) -> dict:
+def _extract_seller_metadata(root: ET.Element) -> dict:
     seller: dict = {"seller_origin": "mercadolivre"}
-    for script in soup.find_all("script"):
-        if not script.string:
-            continue
-        if "seller" not in script.string and "sellerId" not in script.string:
+    for script in root.iter("script"):
+        text = script.text
+        if not text or ("seller" not in text and "sellerId" not in text):
             continue
 
         if not seller.get("seller_id"):
-            seller_match = SELLER_ID_PATTERN.search(script.string)
+            seller_match = SELLER_ID_PATTERN.search(text)
             if seller_match:
                 seller["seller_id"] = seller_match.group(1)
 
         if not seller.get("seller_medal"):
-            medal_match = MEDAL_PATTERN.search(script.string)
+            medal_match = MEDAL_PATTERN.search(text)
             if medal_match:
                 seller["seller_medal"] = medal_match.group(1)
 
         if not seller.get("seller_score"):
-            score_match = SCORE_PATTERN.search(script.string)
+            score_match = SCORE_PATTERN.search(text)
             if score_match:
                 seller["seller_score"] = float(score_match.group(1))
 
         if seller.get("seller_cancellations") is None:
-            cancel_match = CANCELLATIONS_PATTERN.search(script.string)
+            cancel_match = CANCELLATIONS_PATTERN.search(text)
             if cancel_match:
                 seller["seller_cancellations"] = int(cancel_match.group(1))
 
         if seller.get("seller_completed_sales") is None:
-            sales_match = COMPLETED_SALES_PATTERN.search(script.string)
+            sales_match = COMPLETED_SALES_PATTERN.search(text)
             if sales_match:
                 seller["seller_completed_sales"] = int(sales_match.group(1))
 
         if seller.get("seller_response_time_hours") is None:
-            response_match = RESPONSE_TIME_PATTERN.search(script.string)
+            response_match = RESPONSE_TIME_PATTERN.search(text)
             if response_match:
                 seller["seller_response_time_hours"] = float(response_match.group(1))
 
@@ -153,13 +142,6 @@ def parse_listing_detail(html: str) -> Mapping:
     root = _parse_html(html)
     data: dict = {}
 
-    for script in root.iter("script"):
-        if script.attrib.get("type") != "application/ld+json" or not script.text:
-            continue
-        try:
-            payload = json.loads(script.text)
-    data: dict = {}
-
     json_ld_match = re.search(
         r"<script[^>]+type=\"application/ld\+json\"[^>]*>(.*?)</script>", html, re.S | re.I
     )
@@ -198,19 +180,11 @@ def parse_listing_detail(html: str) -> Mapping:
         if "ui-pdp-description__content" in classes:
             description_el = p
             break
-    if description_el:
+    if description_el is not None:
         description = _get_text(description_el)
         if description:
             data["description"] = description
 
-    for row in root.iter("tr"):
-        classes = row.attrib.get("class", "")
-        if "ui-vpp-striped-specs__table-row" not in classes:
-            continue
-        th = row.find("th")
-        td = row.find("td")
-        label = _get_text(th)
-        value = _get_text(td)
     title_match = re.search(r"<h1[^>]*>([^<]+)", html, re.I)
     if title_match and not data.get("title"):
         data["title"] = unescape(title_match.group(1)).strip()
@@ -285,7 +259,7 @@ def parse_listing_detail(html: str) -> Mapping:
             if len(parts) > 1:
                 data.setdefault("model", " ".join(parts[1:3]).strip())
 
-    data.update(_extract_seller_metadata(soup))
+    data.update(_extract_seller_metadata(root))
 
     return data
 
@@ -293,10 +267,17 @@ def parse_listing_detail(html: str) -> Mapping:
 class MercadoLivreConnector(BaseConnector):
     name = "mercadolivre"
 
-    def __init__(self, region_key: str, query_text: str = "", limit: int = 30) -> None:
+    def __init__(
+        self,
+        region_key: str,
+        query_text: str = "",
+        limit: int = 30,
+        page_store: Optional["HtmlPackWriter"] = None,
+    ) -> None:
         self.region_key = region_key
         self.query_text = query_text
         self.limit = limit
+        self.page_store = page_store
         self.settings = get_settings()
         self.rate_limit_per_minute = max(self.settings.mercadolivre_rate_limit_per_minute, 1)
         self.headless = self.settings.mercadolivre_headless
@@ -328,9 +309,11 @@ class MercadoLivreConnector(BaseConnector):
 
             search_url = self._build_search_url()
             logger.info("[mercadolivre] navigating search %s", search_url)
-            page.goto(search_url, wait_until="networkidle")
-            search_html = page.content()
-            listing_urls = parse_search_results(search_html)[: self.limit]
+            with CONNECTOR_FETCH_SECONDS.labels(self.name, "search").time():
+                page.goto(search_url, wait_until="networkidle")
+                search_html = page.content()
+            with CONNECTOR_PARSE_SECONDS.labels(self.name, "search").time():
+                listing_urls = parse_search_results(search_html)[: self.limit]
             logger.info(
                 "[mercadolivre] found %s listing urls for region=%s query=%s",
                 len(listing_urls),
@@ -341,9 +324,13 @@ class MercadoLivreConnector(BaseConnector):
             results: List[Mapping] = []
             for url in listing_urls:
                 self._delay()
-                page.goto(url, wait_until="domcontentloaded")
-                detail_html = page.content()
-                parsed = parse_listing_detail(detail_html)
+                with CONNECTOR_FETCH_SECONDS.labels(self.name, "detail").time():
+                    page.goto(url, wait_until="domcontentloaded")
+                    detail_html = page.content()
+                if self.page_store is not None:
+                    self.page_store.put(_extract_external_id(url), url, detail_html)
+                with CONNECTOR_PARSE_SECONDS.labels(self.name, "detail").time():
+                    parsed = parse_listing_detail(detail_html)
                 parsed["url"] = parsed.get("url") or url
                 parsed["external_id"] = _extract_external_id(url)
                 parsed["seller_type"] = parsed.get("seller_type") or "dealer"
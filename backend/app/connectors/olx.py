@@ -1,15 +1,24 @@
 import json
 import logging
 import re
-from typing import Callable, Iterable, List, Mapping, Optional
-
+import time
+from random import uniform
+from typing import TYPE_CHECKING, Callable, Iterable, List, Mapping, Optional
+from urllib.parse import urlencode
 from xml.etree import ElementTree as ET
 
+from app.core.config import get_settings
+from app.core.metrics import CONNECTOR_FETCH_SECONDS, CONNECTOR_PARSE_SECONDS
+
 from .base import BaseConnector
 
+if TYPE_CHECKING:
+    from app.services.html_store import HtmlPackWriter
+
 logger = logging.getLogger(__name__)
 
 LISTING_ID_PATTERN = re.compile(r"ID[A-Z0-9]+", re.IGNORECASE)
+SEARCH_URL = "https://www.olx.com.br/autos-e-pecas/carros-vans-e-utilitarios"
 
 
 def _extract_external_id(url: str) -> Optional[str]:
@@ -187,60 +196,58 @@ class OLXConnector(BaseConnector):
         fetch_search_page: Callable[[int], str],
         fetch_detail_page: Callable[[str], str],
         max_pages: int = 1,
+        page_store: Optional["HtmlPackWriter"] = None,
+        limit: Optional[int] = None,
+        close: Optional[Callable[[], None]] = None,
     ) -> None:
         self.fetch_search_page = fetch_search_page
         self.fetch_detail_page = fetch_detail_page
         self.max_pages = max_pages
+        self.page_store = page_store
+        self.limit = limit
+        self.close = close
 
     def fetch_listings(self) -> Iterable[Mapping]:
+        try:
+            yield from self._fetch_pages()
+        finally:
+            if self.close is not None:
+                self.close()
+
+    def _fetch_pages(self) -> Iterable[Mapping]:
+        fetched = 0
         for page in range(1, self.max_pages + 1):
-            html = self.fetch_search_page(page)
+            with CONNECTOR_FETCH_SECONDS.labels(self.name, "search").time():
+                html = self.fetch_search_page(page)
             if not html.strip():
                 break
-            listing_urls = parse_search_results(html)
+            with CONNECTOR_PARSE_SECONDS.labels(self.name, "search").time():
+                listing_urls = parse_search_results(html)
             if not listing_urls:
                 break
             for url in listing_urls:
-                detail_html = self.fetch_detail_page(url)
-                parsed = self.parse_listing(detail_html)
+                if self.limit is not None and fetched >= self.limit:
+                    return
+                with CONNECTOR_FETCH_SECONDS.labels(self.name, "detail").time():
+                    detail_html = self.fetch_detail_page(url)
+                if self.page_store is not None:
+                    self.page_store.put(_extract_external_id(url), url, detail_html)
+                with CONNECTOR_PARSE_SECONDS.labels(self.name, "detail").time():
+                    parsed = self.parse_listing(detail_html)
                 parsed["url"] = parsed.get("url") or url
                 parsed["external_id"] = parsed.get("external_id") or _extract_external_id(url)
                 parsed.setdefault("seller_type", "private")
+                fetched += 1
                 yield parsed
 
     def parse_listing(self, payload: Mapping) -> Mapping:
         if isinstance(payload, str):
             return parse_listing_detail(payload)
-from typing import Iterable, Mapping
-
-from .base import BaseConnector
-
-
-class OlxConnector(BaseConnector):
-    name = "olx"
-
-    def fetch_listings(self) -> Iterable[Mapping]:
-        # Placeholder: implement OLX scraping with proper compliance.
-        yield {
-            "id": "olx-demo-1",
-            "brand": "Fiat",
-            "model": "Pulse",
-            "year": 2022,
-            "mileage_km": 15000,
-            "price": 105000,
-            "city": "Rio de Janeiro",
-            "state": "RJ",
-            "seller_type": "dealer",
-            "photos": ["https://www.olx.com.br/photo.jpg"],
-            "url": "https://www.olx.com.br/olx-demo-1",
-        }
-
-    def parse_listing(self, payload: Mapping) -> Mapping:
-        return payload
+        return dict(payload)
 
     def normalize_fields(self, parsed: Mapping) -> Mapping:
         return {
-            "external_id": parsed["id"],
+            "external_id": parsed.get("external_id"),
             "brand": parsed.get("brand"),
             "model": parsed.get("model"),
             "trim": parsed.get("trim"),
@@ -253,3 +260,82 @@ class OlxConnector(BaseConnector):
             "seller_type": parsed.get("seller_type"),
             "url": parsed.get("url"),
         }
+
+
+def build_search_url(region_key: str = "", query_text: str = "", page: int = 1) -> str:
+    url = SEARCH_URL
+    if region_key:
+        url = f"{url}/estado-{region_key.strip('/').lower()}"
+    params = {}
+    if query_text:
+        params["q"] = query_text
+    if page > 1:
+        params["o"] = str(page)
+    return f"{url}?{urlencode(params)}" if params else url
+
+
+class _ThrottledFetcher:
+    """GETs pages one at a time, spaced like MercadoLivreConnector's requests.
+
+    The HTTP client is opened on the first request and released by `close`.
+    """
+
+    def __init__(self, user_agent: str, rate_limit_per_minute: int, min_delay: float, max_delay: float) -> None:
+        self.user_agent = user_agent
+        self.base_delay = max(60 / max(rate_limit_per_minute, 1), min_delay)
+        self.max_delay = max(self.base_delay, max_delay)
+        self._client = None
+        self._last_request: Optional[float] = None
+
+    def get(self, url: str) -> str:
+        import httpx
+
+        if self._client is None:
+            self._client = httpx.Client(headers={"User-Agent": self.user_agent}, timeout=15, follow_redirects=True)
+        if self._last_request is not None:
+            wait = uniform(self.base_delay, self.max_delay) - (time.monotonic() - self._last_request)
+            if wait > 0:
+                time.sleep(wait)
+        self._last_request = time.monotonic()
+        response = self._client.get(url)
+        response.raise_for_status()
+        return response.text
+
+    def close(self) -> None:
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+
+def build_olx_connector(
+    region_key: str = "",
+    query_text: str = "",
+    limit: int = 30,
+    page_store: Optional["HtmlPackWriter"] = None,
+    max_pages: int = 5,
+) -> OLXConnector:
+    """The registry's factory for "olx": fetches search and detail pages over HTTP when enabled.
+
+    With `OLX_LIVE_FETCH_ENABLED` off (the default) the connector fetches nothing.
+    """
+    settings = get_settings()
+    if not settings.olx_live_fetch_enabled:
+        logger.info("OLX live fetching is disabled; set OLX_LIVE_FETCH_ENABLED to crawl")
+        return OLXConnector(lambda page: "", lambda url: "", max_pages=0, page_store=page_store, limit=limit)
+    if not settings.olx_user_agent.strip():
+        raise ValueError("OLX_USER_AGENT must name the operator and a contact before enabling live fetching")
+
+    fetcher = _ThrottledFetcher(
+        settings.olx_user_agent,
+        settings.olx_rate_limit_per_minute,
+        settings.olx_min_delay_seconds,
+        settings.olx_max_delay_seconds,
+    )
+    return OLXConnector(
+        lambda page: fetcher.get(build_search_url(region_key, query_text, page)),
+        fetcher.get,
+        max_pages=max_pages,
+        page_store=page_store,
+        limit=limit,
+        close=fetcher.close,
+    )
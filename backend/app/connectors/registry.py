@@ -0,0 +1,79 @@
+import importlib
+import inspect
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable
+
+from .base import BaseConnector
+
+
+@lru_cache(maxsize=None)
+def _resolve(dotted_path: str) -> Callable[..., BaseConnector]:
+    module_name, _, attribute = dotted_path.partition(":")
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+@lru_cache(maxsize=None)
+def _accepted_kwargs(target: Callable[..., Any]) -> frozenset[str] | None:
+    """Keyword names the factory takes, or None when it accepts **kwargs."""
+    parameters = inspect.signature(target).parameters.values()
+    if any(parameter.kind is inspect.Parameter.VAR_KEYWORD for parameter in parameters):
+        return None
+    return frozenset(
+        parameter.name
+        for parameter in parameters
+        if parameter.kind
+        in (inspect.Parameter.POSITIONAL_OR_KEYWORD, inspect.Parameter.KEYWORD_ONLY)
+    )
+
+
+@dataclass(frozen=True)
+class ConnectorConfig:
+    """A marketplace connector referenced by "module:attribute".
+
+    The connector module (and its scraping dependencies) is imported on first use of
+    `factory`, not when the registry is loaded. Keyword arguments the factory does not take
+    are dropped, except a page store, which raises instead of going unused.
+    """
+
+    base_url: str
+    factory_path: str
+
+    @property
+    def factory(self) -> Callable[..., BaseConnector]:
+        target = _resolve(self.factory_path)
+        accepted = _accepted_kwargs(target)
+
+        def build(**kwargs: Any) -> BaseConnector:
+            if accepted is not None:
+                if kwargs.get("page_store") is not None and "page_store" not in accepted:
+                    # Dropping it would silently stop storing pages for this source.
+                    raise TypeError(f"{self.factory_path} does not accept page_store")
+                kwargs = {key: value for key, value in kwargs.items() if key in accepted}
+            return target(**kwargs)
+
+        return build
+
+
+CONNECTOR_REGISTRY: dict[str, ConnectorConfig] = {
+    "mercado_livre": ConnectorConfig(
+        base_url="https://carros.mercadolivre.com.br",
+        factory_path="app.connectors.mercadolivre:MercadoLivreConnector",
+    ),
+    "mercadolivre": ConnectorConfig(
+        base_url="https://carros.mercadolivre.com.br",
+        factory_path="app.connectors.mercadolivre:MercadoLivreConnector",
+    ),
+    "olx": ConnectorConfig(
+        base_url="https://www.olx.com.br", factory_path="app.connectors.olx:build_olx_connector"
+    ),
+}
+
+DEFAULT_CONNECTOR = ConnectorConfig(
+    base_url="https://example.com",
+    factory_path="app.connectors.example_marketplace:ExampleMarketplaceConnector",
+)
+
+
+def get_connector_config(source_name: str) -> ConnectorConfig:
+    return CONNECTOR_REGISTRY.get(source_name, DEFAULT_CONNECTOR)
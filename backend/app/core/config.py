@@ -10,21 +10,70 @@ class Settings(BaseSettings):
     debug: bool = False
     secret_key: str = "CHANGE_ME"
     access_token_expire_minutes: int = 60 * 24
+    token_cache_max_entries: int = 10_000
+    password_hash_workers: int = 2
+    password_hash_max_concurrency: int = 2
+    password_hash_max_waiting: int = 64
 
     database_url: str = "postgresql+psycopg2://axis:axis@db:5432/axis"
+    async_database_url: str | None = None
     redis_url: str = "redis://redis:6379/0"
 
     cors_origins: str = "*"
     rate_limit_per_minute: int = 60
 
+    request_metrics_sample_rate: float = 1.0
+    slow_request_ms: int = 500
+    slow_request_statements: int = 3
+
+    log_level: str = "INFO"
+    log_format: str = "json"
+    log_queue_size: int = 10_000
+    log_repeat_burst: int = 20
+    log_repeat_window_seconds: float = 10.0
+    # Request logs are already thinned by REQUEST_METRICS_SAMPLE_RATE.
+    log_repeat_exempt_loggers: str = "app.requests"
+
     ai_provider: str = "mock"
     ai_api_key: str | None = None
+    ai_cache_backend: str = "redis"
+    ai_cache_ttl_seconds: int = 60 * 60
+    ai_cache_max_entries: int = 10_000
+    ai_cache_fuzzy: bool = False
+
+    valuation_cache_seconds: int = 60 * 60
+    valuation_min_samples: int = 8
+
+    response_cache_enabled: bool = True
+    response_cache_ttl_seconds: int = 5 * 60
+    response_cache_timeout_seconds: float = 0.25
+    response_cache_backoff_seconds: float = 5.0
+    listing_cache_max_age_seconds: int = 60
+    feed_cache_max_age_seconds: int = 30
+
+    alert_index_cache_seconds: int = 5 * 60
+    market_snapshot_refresh_seconds: int = 30
+    market_snapshot_warm_on_startup: bool = True
+    crawl_sweep_missed_runs: int = 3
+
+    raw_archive_dir: str = "/var/lib/axis/raw_archive"
+    raw_hot_retention_hours: int = 24
+    raw_archive_retention_days: int = 180
+    html_store_dir: str = "/var/lib/axis/html_store"
+    html_store_enabled: bool = True
 
     mercadolivre_rate_limit_per_minute: int = 10
     mercadolivre_headless: bool = True
     mercadolivre_min_delay_seconds: int = 1
     mercadolivre_max_delay_seconds: int = 5
 
+    # Live OLX crawling is opt-in; the user agent must identify the operator and a contact.
+    olx_live_fetch_enabled: bool = False
+    olx_user_agent: str = ""
+    olx_rate_limit_per_minute: int = 10
+    olx_min_delay_seconds: int = 2
+    olx_max_delay_seconds: int = 6
+
 
 @lru_cache
 def get_settings() -> Settings:
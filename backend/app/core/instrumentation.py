@@ -0,0 +1,200 @@
+import functools
+import heapq
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Iterator, Optional, TypeVar
+
+import redis
+from fastapi import Request, Response
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .config import get_settings
+from .metrics import observe_request
+
+logger = logging.getLogger("app.requests")
+
+MAX_STATEMENT_CHARS = 500
+SECTIONS = ("db", "redis", "serialization")
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+@dataclass
+class RequestMetrics:
+    """Per-request breakdown, filled by the SQLAlchemy/Redis hooks and `timed` sections."""
+
+    slow_statements: int = 3
+    started: float = field(default_factory=time.perf_counter)
+    durations_ms: dict[str, float] = field(default_factory=lambda: dict.fromkeys(SECTIONS, 0.0))
+    db_queries: int = 0
+    redis_commands: int = 0
+    # Min-heap of (duration_ms, sql) holding only the slowest statements.
+    statements: list[tuple[float, str]] = field(default_factory=list)
+
+    def add(self, section: str, elapsed_ms: float) -> None:
+        self.durations_ms[section] = self.durations_ms.get(section, 0.0) + elapsed_ms
+
+    def add_query(self, statement: str, elapsed_ms: float) -> None:
+        self.add("db", elapsed_ms)
+        self.db_queries += 1
+        entry = (elapsed_ms, statement[:MAX_STATEMENT_CHARS])
+        if len(self.statements) < self.slow_statements:
+            heapq.heappush(self.statements, entry)
+        elif entry > self.statements[0]:
+            heapq.heapreplace(self.statements, entry)
+
+    def total_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    def slowest(self) -> list[dict[str, Any]]:
+        return [
+            {"ms": round(ms, 2), "sql": sql} for ms, sql in sorted(self.statements, reverse=True)
+        ]
+
+    def server_timing(self, total_ms: float) -> str:
+        parts = [f"total;dur={total_ms:.1f}"]
+        parts.append(f'db;dur={self.durations_ms["db"]:.1f};desc="{self.db_queries} queries"')
+        parts.append(
+            f'redis;dur={self.durations_ms["redis"]:.1f};desc="{self.redis_commands} commands"'
+        )
+        parts += [
+            f"{name};dur={elapsed:.1f}"
+            for name, elapsed in self.durations_ms.items()
+            if name not in ("db", "redis")
+        ]
+        return ", ".join(parts)
+
+
+# The metrics object is shared by reference, so threadpool workers and SQLAlchemy's async
+# greenlets, which run on copies of the request context, still add to the same request.
+_current: ContextVar[Optional[RequestMetrics]] = ContextVar("request_metrics", default=None)
+
+
+def current_metrics() -> Optional[RequestMetrics]:
+    return _current.get()
+
+
+@contextmanager
+def timed(section: str) -> Iterator[None]:
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.add(section, (time.perf_counter() - started) * 1000)
+
+
+def timed_section(section: str) -> Callable[[F], F]:
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with timed(section):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def _before_cursor_execute(conn, *_: Any) -> None:
+    if _current.get() is not None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, _cursor: Any, statement: str, *_: Any) -> None:
+    metrics = _current.get()
+    started = conn.info.get("query_started")
+    if metrics is not None and started:
+        metrics.add_query(statement, (time.perf_counter() - started.pop()) * 1000)
+
+
+def _timed_redis(method: Callable) -> Callable:
+    @functools.wraps(method)
+    def wrapper(self, *args: Any, **kwargs: Any) -> Any:
+        metrics = _current.get()
+        if metrics is None:
+            return method(self, *args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            metrics.add("redis", (time.perf_counter() - started) * 1000)
+            metrics.redis_commands += 1
+
+    wrapper.__instrumented__ = True  # type: ignore[attr-defined]
+    return wrapper
+
+
+def install_instrumentation() -> None:
+    """Hook every SQLAlchemy engine and Redis client of the process; safe to call more than once."""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    # redis-py has no command hooks, so the two network entry points are wrapped instead.
+    for cls, name in ((redis.Redis, "execute_command"), (redis.client.Pipeline, "execute")):
+        method = getattr(cls, name)
+        if not getattr(method, "__instrumented__", False):
+            setattr(cls, name, _timed_redis(method))
+
+
+async def request_metrics_middleware(
+    request: Request, call_next: Callable[[Request], Awaitable[Response]]
+) -> Response:
+    settings = get_settings()
+    if random.random() >= settings.request_metrics_sample_rate:
+        started = time.perf_counter()
+        response = await call_next(request)
+        route = getattr(request.scope.get("route"), "path", None)
+        observe_request(request.method, route, response.status_code, time.perf_counter() - started)
+        return response
+
+    metrics = RequestMetrics(slow_statements=settings.slow_request_statements)
+    token = _current.set(metrics)
+    try:
+        response = await call_next(request)
+    finally:
+        _current.reset(token)
+    total_ms = metrics.total_ms()
+    route = getattr(request.scope.get("route"), "path", None)
+    observe_request(request.method, route, response.status_code, total_ms / 1000)
+    response.headers["Server-Timing"] = metrics.server_timing(total_ms)
+
+    fields = {
+        "method": request.method,
+        "path": request.url.path,
+        "route": route,
+        "status": response.status_code,
+        "total_ms": round(total_ms, 2),
+        "db_queries": metrics.db_queries,
+        "redis_commands": metrics.redis_commands,
+        **{f"{name}_ms": round(elapsed, 2) for name, elapsed in metrics.durations_ms.items()},
+    }
+    if total_ms >= settings.slow_request_ms:
+        fields["slowest_sql"] = metrics.slowest()
+        logger.warning(
+            "Slow request %s %s took %.1fms (db %.1fms over %s queries)",
+            request.method,
+            request.url.path,
+            total_ms,
+            metrics.durations_ms["db"],
+            metrics.db_queries,
+            extra={"request_metrics": fields},
+        )
+    else:
+        logger.info(
+            "%s %s %s %.1fms",
+            request.method,
+            request.url.path,
+            response.status_code,
+            total_ms,
+            extra={"request_metrics": fields},
+        )
+    return response
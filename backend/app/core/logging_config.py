@@ -1,17 +1,223 @@
+import atexit
+import datetime as dt
+import decimal
+import json
 import logging
+import os
+import queue
 import sys
+import threading
+import time
+import uuid
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Optional
+
+from .config import get_settings
+from .metrics import LOG_RECORDS_DROPPED
+
+# Attributes every LogRecord has; anything else on a record came in through `extra=`.
+_RECORD_ATTRIBUTES = frozenset(logging.makeLogRecord({}).__dict__) | {
+    "message",
+    "asctime",
+    "taskName",
+}
+# Arguments of these types cannot change between enqueue and formatting on the listener.
+_IMMUTABLE_ARGS = (str, bytes, int, float, bool, type(None), decimal.Decimal, uuid.UUID, dt.date, dt.time)
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        payload: dict[str, Any] = {
+            "ts": dt.datetime.fromtimestamp(record.created, dt.timezone.utc).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            payload["stack"] = record.stack_info
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                payload[key] = value
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class BoundedQueueHandler(QueueHandler):
+    """Hands records to the listener thread untouched; a full queue drops and counts instead of blocking.
+
+    The stock QueueHandler formats the message on the calling thread. Here formatting, filtering
+    and I/O all happen on the listener, so logging from a hot loop costs one `put_nowait`.
+    Arguments that could still be mutated by the caller (dicts, lists, ORM objects) are rendered
+    into the message before enqueueing; the template is kept in `_template` for RepeatFilter.
+    """
+
+    def __init__(self, log_queue: queue.Queue) -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        args = record.args
+        if args and not (isinstance(args, tuple) and all(isinstance(arg, _IMMUTABLE_ARGS) for arg in args)):
+            record._template = record.msg
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            LOG_RECORDS_DROPPED.inc()
+
+    def take_dropped(self) -> int:
+        with self._lock:
+            dropped, self.dropped = self.dropped, 0
+        return dropped
+
+
+class RepeatFilter(logging.Filter):
+    """Lets at most `burst` records per (logger, level, message template) through each window.
+
+    Per-listing messages such as "Normalized listing %s" share a template, so a flood of them is
+    cut to the first `burst` per window; the next record that passes carries `suppressed`.
+    Runs on the listener thread only, so it needs no locking.
+    """
+
+    def __init__(self, burst: int, window_seconds: float, exempt: tuple[str, ...] = ()) -> None:
+        super().__init__()
+        self.burst = burst
+        self.window_seconds = window_seconds
+        self.exempt = exempt
+        self._windows: dict[tuple, list] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.burst <= 0 or record.name in self.exempt:
+            return True
+        template = getattr(record, "_template", record.msg)
+        key = (
+            record.name,
+            record.levelno,
+            template if isinstance(template, str) else repr(template),
+        )
+        now = time.monotonic()
+        window = self._windows.get(key)
+        if window is None or now - window[0] >= self.window_seconds:
+            suppressed = window[2] if window else 0
+            self._windows[key] = [now, 1, 0]
+            if suppressed:
+                record.suppressed = suppressed
+            if len(self._windows) > 10_000:
+                self._expire(now)
+            return True
+        if window[1] < self.burst:
+            window[1] += 1
+            return True
+        window[2] += 1
+        return False
+
+    def _expire(self, now: float) -> None:
+        for key in [
+            key for key, window in self._windows.items() if now - window[0] >= self.window_seconds
+        ]:
+            del self._windows[key]
+
+
+class DropReportingHandler(logging.StreamHandler):
+    """Stream handler on the listener side that stamps the next record with drops since the last one."""
+
+    def __init__(self, stream: Any, source: BoundedQueueHandler) -> None:
+        super().__init__(stream)
+        self.source = source
+
+    def emit(self, record: logging.LogRecord) -> None:
+        dropped = self.source.take_dropped()
+        if dropped:
+            record.dropped = dropped
+        super().emit(record)
+
+
+class FlushingQueueListener(QueueListener):
+    def enqueue_sentinel(self) -> None:
+        # Wait for room instead of failing when stop() runs against a full queue.
+        self.queue.put(self._sentinel)
+
+
+_listener: Optional[QueueListener] = None
+
+
+def _build_pipeline() -> tuple[BoundedQueueHandler, QueueListener]:
+    settings = get_settings()
+    queue_handler = BoundedQueueHandler(queue.Queue(maxsize=settings.log_queue_size))
+    output = DropReportingHandler(sys.stdout, queue_handler)
+    if settings.log_format == "json":
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(
+            logging.Formatter(
+                fmt="%(asctime)s | %(levelname)s | %(name)s | %(message)s",
+                datefmt="%Y-%m-%d %H:%M:%S",
+            )
+        )
+    exempt = tuple(
+        name.strip() for name in settings.log_repeat_exempt_loggers.split(",") if name.strip()
+    )
+    output.addFilter(
+        RepeatFilter(settings.log_repeat_burst, settings.log_repeat_window_seconds, exempt)
+    )
+    return queue_handler, FlushingQueueListener(
+        queue_handler.queue, output, respect_handler_level=True
+    )
+
+
+def _restart_after_fork() -> None:
+    # RQ runs each job in a forked work-horse; the listener thread does not survive the fork
+    # and the inherited queue may hold a lock, so the child gets a fresh pipeline.
+    global _listener
+    root = logging.getLogger()
+    inherited = [handler for handler in root.handlers if isinstance(handler, BoundedQueueHandler)]
+    if not inherited:
+        return
+    for handler in inherited:
+        root.removeHandler(handler)
+    queue_handler, _listener = _build_pipeline()
+    root.addHandler(queue_handler)
+    _listener.start()
+
+
+def flush_logging() -> None:
+    """Block until every record queued so far is written, then keep the listener running.
+
+    RQ work-horses leave with `os._exit`, which skips atexit, so jobs flush on their way out.
+    """
+    if _listener is not None:
+        _listener.stop()
+        _listener.start()
+
+
+def stop_logging() -> None:
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
 
 
 def setup_logging() -> None:
+    global _listener
     root = logging.getLogger()
     if root.handlers:
         return
 
-    handler = logging.StreamHandler(sys.stdout)
-    formatter = logging.Formatter(
-        fmt="%(asctime)s | %(levelname)s | %(name)s | %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S",
-    )
-    handler.setFormatter(formatter)
-    root.addHandler(handler)
-    root.setLevel(logging.INFO)
+    queue_handler, _listener = _build_pipeline()
+    root.addHandler(queue_handler)
+    root.setLevel(get_settings().log_level.upper())
+    _listener.start()
+    atexit.register(stop_logging)
+    if hasattr(os, "register_at_fork"):
+        os.register_at_fork(after_in_child=_restart_after_fork)
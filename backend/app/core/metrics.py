@@ -0,0 +1,139 @@
+import functools
+import os
+import time
+from typing import Any, Callable, Optional, TypeVar
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+REQUEST_LATENCY = Histogram(
+    "axis_http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+RATE_LIMIT_REJECTIONS = Counter(
+    "axis_rate_limit_rejections_total", "Requests rejected by the rate limiter."
+)
+
+DB_POOL_CHECKED_OUT = Gauge(
+    "axis_db_pool_checked_out",
+    "Connections currently checked out.",
+    ["engine"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_SIZE = Gauge(
+    "axis_db_pool_size", "Configured pool size.", ["engine"], multiprocess_mode="livemax"
+)
+DB_POOL_CONNECTS = Counter(
+    "axis_db_pool_connects_total", "New DBAPI connections opened.", ["engine"]
+)
+
+JOB_DURATION = Histogram(
+    "axis_job_duration_seconds",
+    "RQ job duration.",
+    ["job"],
+    buckets=(0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0, 3600.0),
+)
+JOB_RUNS = Counter("axis_job_runs_total", "RQ job runs by outcome.", ["job", "outcome"])
+
+CONNECTOR_FETCH_SECONDS = Histogram(
+    "axis_connector_fetch_seconds", "Time fetching one marketplace page.", ["source", "page"]
+)
+CONNECTOR_PARSE_SECONDS = Histogram(
+    "axis_connector_parse_seconds",
+    "Time parsing one marketplace page.",
+    ["source", "page"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0),
+)
+LISTINGS_INGESTED = Counter(
+    "axis_listings_ingested_total", "Raw listings stored per source.", ["source"]
+)
+PASSWORD_HASH_QUEUE_SECONDS = Histogram(
+    "axis_password_hash_queue_seconds",
+    "Time a bcrypt hash or verify waited for a process-pool slot.",
+    ["operation"],
+    buckets=(0.001, 0.005, 0.025, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+PASSWORD_HASH_REJECTIONS = Counter(
+    "axis_password_hash_rejections_total",
+    "bcrypt operations refused because the wait queue was full.",
+    ["operation"],
+)
+LOG_RECORDS_DROPPED = Counter("axis_log_records_dropped_total", "Log records dropped on a full logging queue.")
+AI_CACHE_LOOKUPS = Counter(
+    "axis_ai_cache_lookups_total", "AI chat responses looked up in the cache, by result.", ["result"]
+)
+
+
+def observe_request(method: str, route: Optional[str], status: int, seconds: float) -> None:
+    # Unmatched paths share one label so scanners cannot blow up the series count.
+    REQUEST_LATENCY.labels(method, route or "unmatched", str(status)).observe(seconds)
+
+
+def track_job(func: F) -> F:
+    """Record duration and success/failure of an RQ job function under its own name.
+
+    Queued log records are flushed when the job returns, before a work-horse can `os._exit`.
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        outcome = "failure"
+        try:
+            result = func(*args, **kwargs)
+            outcome = "success"
+            return result
+        finally:
+            JOB_DURATION.labels(func.__name__).observe(time.perf_counter() - started)
+            JOB_RUNS.labels(func.__name__, outcome).inc()
+            # Imported here: logging_config imports this module for its dropped-records counter.
+            from .logging_config import flush_logging
+
+            flush_logging()
+
+    return wrapper  # type: ignore[return-value]
+
+
+def instrument_pool(engine: Engine, name: str) -> None:
+    pool = engine.pool
+    size = getattr(pool, "size", None)
+    if callable(size):
+        DB_POOL_SIZE.labels(name).set(size())
+    event.listen(pool, "connect", lambda *_: DB_POOL_CONNECTS.labels(name).inc())
+    event.listen(pool, "checkout", lambda *_: DB_POOL_CHECKED_OUT.labels(name).inc())
+    event.listen(pool, "checkin", lambda *_: DB_POOL_CHECKED_OUT.labels(name).dec())
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Exposition of this process, or of every process sharing PROMETHEUS_MULTIPROC_DIR.
+
+    In multiprocess mode each uvicorn and RQ worker process writes its samples to files in that
+    directory (the variable must be set before the process starts), so one scrape of the API
+    covers the workers too.
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid: int) -> None:
+    """Drop the live-gauge files of an exited process so `livesum`/`livemax` stop counting it."""
+    if pid and os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(pid)
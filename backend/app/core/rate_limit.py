@@ -3,6 +3,7 @@ from fastapi import HTTPException, Request, status
 import redis
 
 from .config import get_settings
+from .metrics import RATE_LIMIT_REJECTIONS
 
 
 class RateLimiter:
@@ -18,6 +19,7 @@ class RateLimiter:
         if current == 1:
             self.client.expire(key, 60)
         if current > self.limit:
+            RATE_LIMIT_REJECTIONS.inc()
             raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail="Too many requests")
 
 
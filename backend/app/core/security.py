@@ -1,26 +1,178 @@
+import asyncio
 import datetime as dt
-from typing import Optional
+import hashlib
+import multiprocessing
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Optional, TypeVar
 
-import bcrypt
-import jwt
 from fastapi import HTTPException, status
 
 from .config import get_settings
-
+from .metrics import PASSWORD_HASH_QUEUE_SECONDS, PASSWORD_HASH_REJECTIONS
 
 ALGORITHM = "HS256"
 
+T = TypeVar("T")
+
+# bcrypt and PyJWT (which loads cryptography) are imported on first use, keeping them off API startup.
+
 
 def hash_password(password: str) -> str:
+    import bcrypt
+
     salt = bcrypt.gensalt()
     return bcrypt.hashpw(password.encode(), salt).decode()
 
 
 def verify_password(password: str, hashed: str) -> bool:
+    import bcrypt
+
     return bcrypt.checkpw(password.encode(), hashed.encode())
 
 
+class PasswordHasher:
+    """Runs bcrypt in a small process pool so hashing never holds the event loop or the GIL.
+
+    At most `max_concurrency` hashes are in flight and at most `max_waiting` callers queue
+    behind them; past that a login storm gets 503 instead of stalling every other endpoint.
+    """
+
+    def __init__(self, workers: int, max_concurrency: int, max_waiting: int) -> None:
+        self.workers = workers
+        self.max_concurrency = max_concurrency
+        self.max_waiting = max_waiting
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._slots_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._waiting = 0
+        self._lock = threading.Lock()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    # spawn, not fork: the API process runs the logging listener and DB pool threads.
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                    )
+        return self._executor
+
+    async def _run(self, operation: str, func: Callable[..., T], *args: str) -> T:
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._slots_loop is not loop:
+            self._slots, self._slots_loop = asyncio.Semaphore(self.max_concurrency), loop
+        if self._slots.locked() and self._waiting >= self.max_waiting:
+            PASSWORD_HASH_REJECTIONS.labels(operation).inc()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication is busy, retry shortly",
+                headers={"Retry-After": "1"},
+            )
+        queued_at = time.perf_counter()
+        self._waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self._waiting -= 1
+        try:
+            PASSWORD_HASH_QUEUE_SECONDS.labels(operation).observe(time.perf_counter() - queued_at)
+            return await loop.run_in_executor(self._pool(), func, *args)
+        finally:
+            self._slots.release()
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", hash_password, password)
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        return await self._run("verify", verify_password, password, hashed)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+_hasher: Optional[PasswordHasher] = None
+
+
+def get_password_hasher() -> PasswordHasher:
+    global _hasher
+    if _hasher is None:
+        settings = get_settings()
+        _hasher = PasswordHasher(
+            settings.password_hash_workers,
+            settings.password_hash_max_concurrency,
+            settings.password_hash_max_waiting,
+        )
+    return _hasher
+
+
+async def hash_password_async(password: str) -> str:
+    return await get_password_hasher().hash(password)
+
+
+async def verify_password_async(password: str, hashed: str) -> bool:
+    return await get_password_hasher().verify(password, hashed)
+
+
+class VerifiedTokenCache:
+    """LRU of tokens whose signature already checked out, keyed by SHA-256 of the token.
+
+    An entry is only trusted until the token's own `exp`, so caching never extends a token's life.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[bytes, tuple[Optional[str], float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> tuple[bool, Optional[str]]:
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            if entry[1] <= time.time():
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            return True, entry[0]
+
+    def put(self, token: str, subject: Optional[str], expires_at: float) -> None:
+        if self.max_entries <= 0:
+            return
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (subject, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_token_cache: Optional[VerifiedTokenCache] = None
+
+
+def get_token_cache() -> VerifiedTokenCache:
+    global _token_cache
+    if _token_cache is None:
+        _token_cache = VerifiedTokenCache(get_settings().token_cache_max_entries)
+    return _token_cache
+
+
 def create_access_token(subject: str) -> str:
+    import jwt
+
     settings = get_settings()
     expire = dt.datetime.utcnow() + dt.timedelta(minutes=settings.access_token_expire_minutes)
     payload = {"sub": subject, "exp": expire}
@@ -28,11 +180,21 @@ def create_access_token(subject: str) -> str:
 
 
 def decode_token(token: str) -> Optional[str]:
+    cache = get_token_cache()
+    hit, subject = cache.get(token)
+    if hit:
+        return subject
+
+    import jwt
+
     settings = get_settings()
     try:
         payload = jwt.decode(token, settings.secret_key, algorithms=[ALGORITHM])
-        return payload.get("sub")
     except jwt.ExpiredSignatureError as exc:  # pragma: no cover - passthrough
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token expired") from exc
     except jwt.InvalidTokenError as exc:  # pragma: no cover - passthrough
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token") from exc
+    # Tokens without `exp` are never cached: there is no point at which the entry would go stale.
+    if isinstance(payload.get("exp"), (int, float)):
+        cache.put(token, payload.get("sub"), float(payload["exp"]))
+    return payload.get("sub")
@@ -0,0 +1,11 @@
+from fastapi import FastAPI
+
+from app.api import health, metrics
+from app.core.config import get_settings
+
+# Served on its own port (see infra/docker-compose.yml) that is never published, so scrapers
+# reach /metrics without it being part of the public API.
+app = FastAPI(title=f"{get_settings().app_name} internal", docs_url=None, redoc_url=None, openapi_url=None)
+
+app.include_router(health.router)
+app.include_router(metrics.router)
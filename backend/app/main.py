@@ -1,14 +1,38 @@
-from fastapi import Depends, FastAPI, Request
+import threading
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api import auth, health, listings, search, sell
 from app.core.config import get_settings
+from app.core.instrumentation import install_instrumentation, request_metrics_middleware
 from app.core.logging_config import setup_logging
 from app.core.rate_limit import get_rate_limiter
 
 setup_logging()
+install_instrumentation()
 settings = get_settings()
-app = FastAPI(title=settings.app_name, version="0.1.0")
+
+
+def _warm_market_snapshot() -> None:
+    # Imported on the warm-up thread: the snapshot pulls in NumPy, which API startup defers.
+    from app.db.session import SessionLocal
+    from app.services.market_snapshot import warm_market_snapshot
+
+    warm_market_snapshot(SessionLocal)
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    # The first full snapshot build reads every active listing; doing it here keeps it out of the
+    # first chat request, which would otherwise hold the snapshot lock for the whole build.
+    if settings.market_snapshot_warm_on_startup:
+        threading.Thread(target=_warm_market_snapshot, name="market-snapshot-warmup", daemon=True).start()
+    yield
+
+
+app = FastAPI(title=settings.app_name, version="0.1.0", lifespan=lifespan)
 
 origins = [origin.strip() for origin in settings.cors_origins.split(",")]
 app.add_middleware(
@@ -27,6 +51,10 @@ async def rate_limit(request: Request, call_next):
     return await call_next(request)
 
 
+# Registered last so it wraps the rate limiter and its Redis round trip.
+app.middleware("http")(request_metrics_middleware)
+
+
 app.include_router(health.router)
 app.include_router(auth.router)
 app.include_router(listings.router)
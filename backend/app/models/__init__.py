@@ -1,10 +1,19 @@
 from .user import User
 from .listing import (
     Alert,
+    AlertMatch,
+    CrawlRun,
+    DepreciationModel,
+    HtmlPage,
+    ListingFingerprint,
+    ListingLshBucket,
+    ListingPriceDrop,
+    ListingPriceHistory,
     ListingSource,
     MarketStats,
     NormalizedListing,
     RawListing,
+    RawPayloadArchive,
     Recommendation,
     Seller,
     SellerStats,
@@ -15,11 +24,20 @@ __all__ = [
     "User",
     "SearchProfile",
     "ListingSource",
+    "CrawlRun",
     "RawListing",
+    "RawPayloadArchive",
     "NormalizedListing",
+    "ListingFingerprint",
+    "HtmlPage",
+    "ListingLshBucket",
+    "ListingPriceHistory",
+    "ListingPriceDrop",
     "MarketStats",
+    "DepreciationModel",
     "Recommendation",
     "Seller",
     "SellerStats",
     "Alert",
+    "AlertMatch",
 ]
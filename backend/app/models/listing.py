@@ -1,9 +1,14 @@
 import datetime as dt
-from sqlalchemy import Boolean, Column, DateTime, Float, ForeignKey, Integer, JSON, String, UniqueConstraint
+from sqlalchemy import Boolean, Column, DateTime, Float, ForeignKey, Index, Integer, JSON, String, Text, UniqueConstraint
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import relationship
+from sqlalchemy.sql.functions import FunctionElement
 
 from app.db.base import Base
 
+LISTING_STATUS_ACTIVE = "active"
+LISTING_STATUS_INACTIVE = "inactive"
+
 
 class SearchProfile(Base):
     __tablename__ = "search_profiles"
@@ -23,20 +28,74 @@ class ListingSource(Base):
     enabled = Column(Boolean, default=True, nullable=False)
 
 
+class CrawlRun(Base):
+    __tablename__ = "crawl_runs"
+    __table_args__ = (Index("ix_crawl_runs_scope", "source_id", "region_key", "query_text", "id"),)
+
+    id = Column(Integer, primary_key=True)
+    source_id = Column(Integer, ForeignKey("listing_sources.id"), nullable=False)
+    region_key = Column(String, nullable=False, default="")
+    query_text = Column(String, nullable=False, default="")
+    started_at = Column(DateTime, default=dt.datetime.utcnow, nullable=False)
+    finished_at = Column(DateTime)
+    listings_seen = Column(Integer)
+
+
 class RawListing(Base):
     __tablename__ = "raw_listings"
+    __table_args__ = (Index("ix_raw_listings_source_external", "source_id", "external_id", "id"),)
 
     id = Column(Integer, primary_key=True)
     source_id = Column(Integer, ForeignKey("listing_sources.id"), nullable=False)
     external_id = Column(String, nullable=False)
+    crawl_run_id = Column(Integer, ForeignKey("crawl_runs.id"))
     raw_payload = Column(JSON, nullable=False)
     fetched_at = Column(DateTime, default=dt.datetime.utcnow, nullable=False)
 
     source = relationship("ListingSource")
 
 
+class HtmlPage(Base):
+    """Location of a fetched detail page inside a zlib pack file of the HTML store."""
+
+    __tablename__ = "html_pages"
+    __table_args__ = (Index("ix_html_pages_source_external", "source_name", "external_id"),)
+
+    id = Column(Integer, primary_key=True)
+    source_name = Column(String, nullable=False)
+    external_id = Column(String)
+    url = Column(String, nullable=False)
+    pack = Column(String, nullable=False)
+    offset = Column(Integer, nullable=False)
+    length = Column(Integer, nullable=False)
+    fetched_at = Column(DateTime, default=dt.datetime.utcnow, nullable=False)
+
+
+class RawPayloadArchive(Base):
+    """Where an archived raw payload lives: a gzip member of a date-partitioned NDJSON segment."""
+
+    __tablename__ = "raw_payload_archive"
+
+    raw_id = Column(Integer, primary_key=True)
+    source_id = Column(Integer, ForeignKey("listing_sources.id"), nullable=False)
+    external_id = Column(String, nullable=False)
+    fetched_at = Column(DateTime, nullable=False, index=True)
+    segment = Column(String, nullable=False)
+    offset = Column(Integer, nullable=False)
+    length = Column(Integer, nullable=False)
+    line = Column(Integer, nullable=False)
+
+
 class NormalizedListing(Base):
     __tablename__ = "normalized_listings"
+    __table_args__ = (
+        Index("ix_normalized_listings_segment", "brand", "model", "state", "year"),
+        UniqueConstraint("source_id", "external_id", name="uq_normalized_listings_source_external"),
+        Index("ix_normalized_listings_status_state", "status", "state"),
+        # Radius search matches geohash prefixes with LIKE, which Postgres only serves from a
+        # pattern_ops index unless the database collation is C.
+        Index("ix_normalized_listings_geohash", "geohash", postgresql_ops={"geohash": "varchar_pattern_ops"}),
+    )
 
     id = Column(Integer, primary_key=True)
     source_id = Column(Integer, ForeignKey("listing_sources.id"), nullable=False)
@@ -44,6 +103,8 @@ class NormalizedListing(Base):
     brand = Column(String, nullable=False)
     model = Column(String, nullable=False)
     trim = Column(String)
+    title = Column(String)
+    description = Column(Text)
     year = Column(Integer)
     mileage_km = Column(Integer)
     price_brl = Column(Float)
@@ -53,12 +114,19 @@ class NormalizedListing(Base):
     state = Column(String)
     lat = Column(Float)
     lng = Column(Float)
+    geohash = Column(String(12))
     photos = Column(JSON, default=list)
     url = Column(String)
     seller_type = Column(String)
     seller_id = Column(Integer, ForeignKey("sellers.id"))
-    status = Column(String, default="active")
+    status = Column(String, default=LISTING_STATUS_ACTIVE)
+    last_seen_run_id = Column(Integer, ForeignKey("crawl_runs.id"), index=True)
+    last_seen_at = Column(DateTime)
     trust_badge = Column(String)
+    opportunity_score = Column(Float)
+    opportunity_badge = Column(String)
+    price_trend = Column(Float)
+    canonical_listing_id = Column(Integer, ForeignKey("normalized_listings.id"), index=True)
     created_at = Column(DateTime, default=dt.datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=dt.datetime.utcnow, onupdate=dt.datetime.utcnow)
 
@@ -66,6 +134,70 @@ class NormalizedListing(Base):
     seller = relationship("Seller", back_populates="listings")
 
 
+class photo_count(FunctionElement):
+    """Length of a JSON photos column, 0 when it holds null, a scalar or an object.
+
+    Postgres' json_array_length raises on anything but an array, and older rows and some
+    connectors stored photos as null or a single URL string.
+    """
+
+    type = Integer()
+    inherit_cache = True
+
+
+@compiles(photo_count)
+def _photo_count_postgresql(element, compiler, **kw):
+    column = compiler.process(element.clauses, **kw)
+    return f"CASE WHEN json_typeof({column}) = 'array' THEN json_array_length({column}) ELSE 0 END"
+
+
+@compiles(photo_count, "sqlite")
+def _photo_count_sqlite(element, compiler, **kw):
+    column = compiler.process(element.clauses, **kw)
+    return f"CASE WHEN json_type({column}) = 'array' THEN json_array_length({column}) ELSE 0 END"
+
+
+class ListingPriceHistory(Base):
+    __tablename__ = "listing_price_history"
+    __table_args__ = (Index("ix_listing_price_history_listing_observed", "listing_id", "observed_at"),)
+
+    id = Column(Integer, primary_key=True)
+    listing_id = Column(Integer, ForeignKey("normalized_listings.id"), nullable=False)
+    price_brl = Column(Float, nullable=False)
+    observed_at = Column(DateTime, default=dt.datetime.utcnow, nullable=False)
+
+
+class ListingPriceDrop(Base):
+    __tablename__ = "listing_price_drops"
+    __table_args__ = (
+        UniqueConstraint("listing_id", "previous_price_brl", "current_price_brl", name="uq_listing_price_drop"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    listing_id = Column(Integer, ForeignKey("normalized_listings.id"), nullable=False, index=True)
+    crawl_run_id = Column(Integer, ForeignKey("crawl_runs.id"), nullable=False)
+    previous_price_brl = Column(Float, nullable=False)
+    current_price_brl = Column(Float, nullable=False)
+    drop_ratio = Column(Float, nullable=False)
+    detected_at = Column(DateTime, default=dt.datetime.utcnow, nullable=False, index=True)
+
+
+class ListingFingerprint(Base):
+    __tablename__ = "listing_fingerprints"
+
+    listing_id = Column(Integer, ForeignKey("normalized_listings.id"), primary_key=True)
+    signature = Column(JSON, nullable=False)
+    created_at = Column(DateTime, default=dt.datetime.utcnow, nullable=False)
+
+
+class ListingLshBucket(Base):
+    __tablename__ = "listing_lsh_buckets"
+
+    id = Column(Integer, primary_key=True)
+    bucket_key = Column(String, nullable=False, index=True)
+    listing_id = Column(Integer, ForeignKey("normalized_listings.id"), nullable=False, index=True)
+
+
 class MarketStats(Base):
     __tablename__ = "market_stats"
 
@@ -81,6 +213,25 @@ class MarketStats(Base):
     updated_at = Column(DateTime, default=dt.datetime.utcnow, nullable=False)
 
 
+class DepreciationModel(Base):
+    """Per-segment log-price regression on vehicle age and mileage, fitted nightly."""
+
+    __tablename__ = "depreciation_models"
+    __table_args__ = (UniqueConstraint("region_key", "brand", "model", name="uq_depreciation_segment"),)
+
+    id = Column(Integer, primary_key=True)
+    region_key = Column(String, nullable=False)
+    brand = Column(String, nullable=False)
+    model = Column(String, nullable=False)
+    reference_year = Column(Integer, nullable=False)
+    intercept = Column(Float, nullable=False)
+    year_coef = Column(Float, nullable=False)
+    mileage_coef = Column(Float, nullable=False)
+    residual_std = Column(Float, nullable=False)
+    sample_size = Column(Integer, nullable=False)
+    updated_at = Column(DateTime, default=dt.datetime.utcnow, nullable=False)
+
+
 class Recommendation(Base):
     __tablename__ = "recommendations"
 
@@ -137,3 +288,17 @@ class Alert(Base):
     region_key = Column(String, nullable=False)
     active = Column(Boolean, default=True, nullable=False)
     created_at = Column(DateTime, default=dt.datetime.utcnow, nullable=False)
+
+
+class AlertMatch(Base):
+    __tablename__ = "alert_matches"
+    __table_args__ = (UniqueConstraint("alert_id", "listing_id", name="uq_alert_match"),)
+
+    id = Column(Integer, primary_key=True)
+    alert_id = Column(Integer, ForeignKey("alerts.id"), nullable=False)
+    listing_id = Column(Integer, ForeignKey("normalized_listings.id"), nullable=False, index=True)
+    created_at = Column(DateTime, default=dt.datetime.utcnow, nullable=False)
+    delivered_at = Column(DateTime, index=True)
+
+    alert = relationship("Alert")
+    listing = relationship("NormalizedListing")
@@ -1,23 +1,29 @@
 from datetime import datetime
 from typing import Any, List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+# Upper bound on ids per batch lookup; one IN query and one response body stay small at this size.
+LISTING_BATCH_MAX_IDS = 200
 
 
 class ListingBase(BaseModel):
     brand: str
     model: str
     trim: Optional[str] = None
+    title: Optional[str] = None
     year: Optional[int] = None
     mileage_km: Optional[int] = None
     price_brl: Optional[float] = None
     final_price_brl: Optional[float] = None
+    price_trend: Optional[float] = None
     city: Optional[str] = None
     state: Optional[str] = None
     photos: List[str] = []
     url: Optional[str] = None
     seller_type: Optional[str] = None
     seller_id: Optional[int] = None
+    canonical_listing_id: Optional[int] = None
     badge: Optional[str] = None
 
 
@@ -36,6 +42,29 @@ class OpportunityResponse(BaseModel):
     count: int
 
 
+class ListingSearchResponse(BaseModel):
+    items: List[ListingOut]
+    next_cursor: Optional[str] = None
+
+
+class ListingBatchRequest(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=LISTING_BATCH_MAX_IDS)
+
+
+class ListingBatchResponse(BaseModel):
+    items: List[ListingOut]
+    missing: List[int]
+
+
+class NearbyListingOut(ListingOut):
+    distance_km: float
+
+
+class NearbyResponse(BaseModel):
+    items: List[NearbyListingOut]
+    count: int
+
+
 class SellerStatsOut(BaseModel):
     seller_id: int
     origin: str
@@ -76,6 +105,9 @@ class SellEstimateRequest(BaseModel):
     description: str
     mileage_km: Optional[int] = None
     region: Optional[str] = None
+    brand: Optional[str] = None
+    model: Optional[str] = None
+    year: Optional[int] = None
 
 
 class SellEstimateResponse(BaseModel):
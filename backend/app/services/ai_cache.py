@@ -0,0 +1,154 @@
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Protocol
+
+import redis
+
+from app.core.config import get_settings
+from app.core.metrics import AI_CACHE_LOOKUPS
+
+from .ai_provider import AIProvider, MockProvider
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _fold_text(text: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return _WHITESPACE.sub(" ", stripped.casefold()).strip()
+
+
+def message_fingerprint(messages: list[Dict[str, str]], fuzzy: bool = False, provider: str = "") -> str:
+    """Stable cache key for a message list; fuzzy mode ignores accents, case and spacing.
+
+    `provider` keeps answers of different providers (or models) under different keys.
+    """
+    normalized: list = [provider]
+    for message in messages:
+        content = message.get("content", "") or ""
+        content = _fold_text(content) if fuzzy else content.strip()
+        normalized.append([message.get("role", ""), content])
+    encoded = json.dumps(normalized, ensure_ascii=False, separators=(",", ":")).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class ResponseCache(Protocol):
+    def get(self, key: str) -> Optional[str]:  # pragma: no cover - interface
+        ...
+
+    def set(self, key: str, value: str) -> None:  # pragma: no cover - interface
+        ...
+
+
+class InMemoryResponseCache:
+    def __init__(self, ttl_seconds: int, max_entries: int, clock: Callable[[], float] = time.monotonic) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(max_entries, 1)
+        self._clock = clock
+        self._entries: "OrderedDict[str, tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class RedisResponseCache:
+    """Shared cache; a sorted set of insertion times bounds the number of live keys.
+
+    Members older than the TTL are trimmed on every write, so the index only counts (and
+    evicts among) entries that still exist.
+    """
+
+    def __init__(self, client: redis.Redis, ttl_seconds: int, max_entries: int, prefix: str = "ai_cache") -> None:
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(max_entries, 1)
+        self.prefix = prefix
+        self.index_key = f"{prefix}:index"
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}:entry:{key}"
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            return self.client.get(self._key(key))
+        except redis.RedisError as exc:
+            logger.warning("AI cache read failed: %s", exc)
+            return None
+
+    def set(self, key: str, value: str) -> None:
+        try:
+            now = time.time()
+            pipe = self.client.pipeline()
+            pipe.set(self._key(key), value, ex=self.ttl_seconds)
+            pipe.zremrangebyscore(self.index_key, "-inf", now - self.ttl_seconds)
+            pipe.zadd(self.index_key, {key: now})
+            pipe.zcard(self.index_key)
+            size = pipe.execute()[-1]
+            overflow = size - self.max_entries
+            if overflow > 0:
+                evicted = [member for member, _ in self.client.zpopmin(self.index_key, overflow)]
+                if evicted:
+                    self.client.delete(*(self._key(member) for member in evicted))
+        except redis.RedisError as exc:
+            logger.warning("AI cache write failed: %s", exc)
+
+
+class CachedProvider(AIProvider):
+    def __init__(self, provider: AIProvider, cache: ResponseCache, fuzzy: bool = False) -> None:
+        self.provider = provider
+        self.cache = cache
+        self.fuzzy = fuzzy
+
+    @property
+    def identity(self) -> str:
+        return self.provider.identity
+
+    def chat(self, messages: list[Dict[str, str]]) -> str:
+        key = message_fingerprint(messages, fuzzy=self.fuzzy, provider=self.provider.identity)
+        cached = self.cache.get(key)
+        if cached is not None:
+            AI_CACHE_LOOKUPS.labels("hit").inc()
+            return cached
+        AI_CACHE_LOOKUPS.labels("miss").inc()
+        response = self.provider.chat(messages)
+        self.cache.set(key, response)
+        return response
+
+
+def build_ai_provider(provider: Optional[AIProvider] = None) -> AIProvider:
+    settings = get_settings()
+    provider = provider or MockProvider()
+    backend = settings.ai_cache_backend.lower()
+    if backend == "redis":
+        client = redis.Redis.from_url(settings.redis_url, decode_responses=True)
+        cache: ResponseCache = RedisResponseCache(client, settings.ai_cache_ttl_seconds, settings.ai_cache_max_entries)
+    elif backend == "memory":
+        cache = InMemoryResponseCache(settings.ai_cache_ttl_seconds, settings.ai_cache_max_entries)
+    else:
+        return provider
+    return CachedProvider(provider, cache, fuzzy=settings.ai_cache_fuzzy)
@@ -3,6 +3,11 @@ from typing import Dict
 
 
 class AIProvider(ABC):
+    @property
+    def identity(self) -> str:
+        """Names the provider in cache keys; override to add the model when it is configurable."""
+        return type(self).__name__
+
     @abstractmethod
     def chat(self, messages: list[Dict[str, str]]) -> str:  # pragma: no cover - interface
         raise NotImplementedError
@@ -0,0 +1,148 @@
+import itertools
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Iterable, Mapping, Optional, Sequence
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.models.listing import Alert, AlertMatch, NormalizedListing
+
+ANY = "*"
+
+AlertKey = tuple[str, str, str]
+
+
+def _key_part(value: Optional[str]) -> str:
+    return " ".join(str(value).casefold().split()) if value else ANY
+
+
+def _number(query: Mapping[str, Any], field: str) -> Optional[float]:
+    value = query.get(field)
+    return float(value) if value not in (None, "") else None
+
+
+@dataclass(frozen=True)
+class AlertCriteria:
+    """Range predicates of one alert, checked after the index narrowed it down by segment."""
+
+    alert_id: int
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    min_year: Optional[float] = None
+    max_year: Optional[float] = None
+    max_mileage_km: Optional[float] = None
+
+    def matches(self, listing: NormalizedListing) -> bool:
+        price = listing.final_price_brl or listing.price_brl
+        checks = (
+            (self.min_price, price, lambda bound, value: value >= bound),
+            (self.max_price, price, lambda bound, value: value <= bound),
+            (self.min_year, listing.year, lambda bound, value: value >= bound),
+            (self.max_year, listing.year, lambda bound, value: value <= bound),
+            (self.max_mileage_km, listing.mileage_km, lambda bound, value: value <= bound),
+        )
+        # A bound on a field the listing does not report cannot be satisfied.
+        return all(bound is None or (value is not None and accept(bound, value)) for bound, value, accept in checks)
+
+
+def compile_alert(alert: Alert) -> tuple[AlertKey, AlertCriteria]:
+    """Turn an alert row into its index key and predicates.
+
+    `query_json` holds optional `brand`, `model`, `min_price`, `max_price`, `min_year`,
+    `max_year` and `max_mileage_km`; a `region_key` of "*" follows the whole country.
+    """
+    query = alert.query_json or {}
+    key = (_key_part(alert.region_key).upper(), _key_part(query.get("brand")), _key_part(query.get("model")))
+    criteria = AlertCriteria(
+        alert_id=alert.id,
+        min_price=_number(query, "min_price"),
+        max_price=_number(query, "max_price"),
+        min_year=_number(query, "min_year"),
+        max_year=_number(query, "max_year"),
+        max_mileage_km=_number(query, "max_mileage_km"),
+    )
+    return key, criteria
+
+
+class AlertIndex:
+    """Inverted index of active alerts keyed by (region, brand, model), with "*" as wildcard.
+
+    A listing probes at most eight keys, so matching a batch costs O(listings) lookups plus
+    the predicates of alerts in those buckets, independent of the total number of alerts.
+    """
+
+    def __init__(self, alerts: Iterable[Alert] = ()) -> None:
+        self._buckets: dict[AlertKey, list[AlertCriteria]] = defaultdict(list)
+        self.size = 0
+        for alert in alerts:
+            key, criteria = compile_alert(alert)
+            self._buckets[key].append(criteria)
+            self.size += 1
+
+    @classmethod
+    def load(cls, db: Session) -> "AlertIndex":
+        return cls(db.execute(select(Alert).where(Alert.active.is_(True))).scalars())
+
+    def match(self, listing: NormalizedListing) -> list[int]:
+        region = _key_part(listing.state).upper()
+        keys = itertools.product((region, ANY), (_key_part(listing.brand), ANY), (_key_part(listing.model), ANY))
+        return [
+            criteria.alert_id
+            for key in dict.fromkeys(keys)
+            for criteria in self._buckets.get(key, ())
+            if criteria.matches(listing)
+        ]
+
+
+class AlertIndexCache:
+    def __init__(self, ttl_seconds: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._index: Optional[AlertIndex] = None
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        self._loaded_at = None
+
+    def get(self, db: Session) -> AlertIndex:
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl_seconds:
+            return self._index
+        with self._lock:
+            if self._loaded_at is None or time.monotonic() - self._loaded_at >= self.ttl_seconds:
+                self._index = AlertIndex.load(db)
+                self._loaded_at = time.monotonic()
+            return self._index
+
+
+_index_cache: Optional[AlertIndexCache] = None
+
+
+def get_alert_index_cache() -> AlertIndexCache:
+    global _index_cache
+    if _index_cache is None:
+        _index_cache = AlertIndexCache(get_settings().alert_index_cache_seconds)
+    return _index_cache
+
+
+def match_new_listings(db: Session, listings: Sequence[NormalizedListing], index: Optional[AlertIndex] = None) -> int:
+    """Queue an alert_matches row for every (alert, listing) pair in one pass over the batch."""
+    index = index or get_alert_index_cache().get(db)
+    pairs = {(alert_id, listing.id) for listing in listings for alert_id in index.match(listing)}
+    if not pairs:
+        return 0
+    already_queued = {
+        (row.alert_id, row.listing_id)
+        for row in db.execute(
+            select(AlertMatch.alert_id, AlertMatch.listing_id).where(
+                AlertMatch.listing_id.in_({listing_id for _, listing_id in pairs})
+            )
+        )
+    }
+    new_pairs = sorted(pairs - already_queued)
+    if new_pairs:
+        db.execute(insert(AlertMatch), [{"alert_id": alert_id, "listing_id": listing_id} for alert_id, listing_id in new_pairs])
+    return len(new_pairs)
@@ -0,0 +1,92 @@
+import datetime as dt
+from typing import Iterable, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.models.listing import (
+    LISTING_STATUS_ACTIVE,
+    LISTING_STATUS_INACTIVE,
+    CrawlRun,
+    NormalizedListing,
+)
+
+
+def start_crawl_run(db: Session, source_id: int, region_key: str = "", query_text: str = "") -> CrawlRun:
+    run = CrawlRun(source_id=source_id, region_key=region_key or "", query_text=query_text or "")
+    db.add(run)
+    db.flush()
+    return run
+
+
+def finish_crawl_run(run: CrawlRun, listings_seen: int) -> None:
+    run.finished_at = dt.datetime.utcnow()
+    run.listings_seen = listings_seen
+
+
+SEEN_STAMP_CHUNK = 500
+
+
+def mark_listings_seen(db: Session, run: CrawlRun, external_ids: Iterable[str]) -> int:
+    """Stamp already-normalized listings of the run's source with the run that just fetched them.
+
+    Runs inside ingestion so the sweep never depends on normalization jobs having caught up;
+    `updated_at` is left alone because being seen again does not change the listing.
+    """
+    ids = list(dict.fromkeys(str(external_id) for external_id in external_ids))
+    stamped = 0
+    now = dt.datetime.utcnow()
+    for start in range(0, len(ids), SEEN_STAMP_CHUNK):
+        result = db.execute(
+            update(NormalizedListing)
+            .where(
+                NormalizedListing.source_id == run.source_id,
+                NormalizedListing.external_id.in_(ids[start : start + SEEN_STAMP_CHUNK]),
+            )
+            .values(last_seen_run_id=run.id, last_seen_at=now, updated_at=NormalizedListing.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+        stamped += result.rowcount
+    return stamped
+
+
+def sweep_unseen_listings(
+    db: Session, run: CrawlRun, missed_runs: Optional[int] = None
+) -> list[tuple[int, Optional[str]]]:
+    """Deactivate listings of the run's (source, region, query) missing from its last K finished runs.
+
+    Ingestion stamps every listing with the run that last saw it, so a listing is stale
+    when that stamp is older than the K-th most recent run of the same scope. The whole sweep
+    is a single UPDATE ... RETURNING; nothing happens until the scope has K finished runs.
+    Returns (id, state) of every deactivated listing.
+    """
+    missed_runs = missed_runs or get_settings().crawl_sweep_missed_runs
+    recent = db.execute(
+        select(CrawlRun.id)
+        .where(
+            CrawlRun.source_id == run.source_id,
+            CrawlRun.region_key == run.region_key,
+            CrawlRun.query_text == run.query_text,
+            CrawlRun.finished_at.is_not(None),
+        )
+        .order_by(CrawlRun.id.desc())
+        .limit(missed_runs)
+    ).scalars().all()
+    if len(recent) < missed_runs:
+        return []
+
+    scope_runs = select(CrawlRun.id).where(
+        CrawlRun.source_id == run.source_id,
+        CrawlRun.region_key == run.region_key,
+        CrawlRun.query_text == run.query_text,
+        CrawlRun.id < recent[-1],
+    )
+    result = db.execute(
+        update(NormalizedListing)
+        .where(NormalizedListing.status == LISTING_STATUS_ACTIVE, NormalizedListing.last_seen_run_id.in_(scope_runs))
+        .values(status=LISTING_STATUS_INACTIVE, updated_at=dt.datetime.utcnow())
+        .returning(NormalizedListing.id, NormalizedListing.state)
+        .execution_options(synchronize_session=False)
+    )
+    return [tuple(row) for row in result]
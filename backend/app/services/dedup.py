@@ -0,0 +1,181 @@
+import datetime as dt
+import hashlib
+import re
+import unicodedata
+from typing import Iterable, Mapping, Optional, Sequence
+from urllib.parse import urlparse
+
+import numpy as np
+from sqlalchemy import case, delete, func, insert, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.models.listing import (
+    LISTING_STATUS_ACTIVE,
+    LISTING_STATUS_INACTIVE,
+    ListingFingerprint,
+    ListingLshBucket,
+    NormalizedListing,
+)
+
+NUM_PERMUTATIONS = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+SIMILARITY_THRESHOLD = 0.5
+PRICE_TOLERANCE = 0.05
+MILEAGE_BUCKET_KM = 5_000
+PRICE_BUCKET_BRL = 2_000
+
+_PRIME = np.uint64(4294967291)  # largest 32-bit prime, keeps a * h + b inside uint64
+_rng = np.random.default_rng(20240205)
+_A = _rng.integers(1, int(_PRIME), size=NUM_PERMUTATIONS, dtype=np.uint64)
+_B = _rng.integers(0, int(_PRIME), size=NUM_PERMUTATIONS, dtype=np.uint64)
+_WORD = re.compile(r"\w+")
+
+
+def _fold(text: object) -> str:
+    decomposed = unicodedata.normalize("NFKD", str(text))
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).casefold().strip()
+
+
+def listing_shingles(fields: Mapping[str, object]) -> set[str]:
+    shingles: set[str] = set()
+    for key in ("brand", "model", "year", "city"):
+        if fields.get(key):
+            shingles.add(f"{key}:{_fold(fields[key])}")
+    if fields.get("mileage_km") is not None:
+        shingles.add(f"km:{int(fields['mileage_km']) // MILEAGE_BUCKET_KM}")
+    price = fields.get("price_brl") or fields.get("price")
+    if price:
+        shingles.add(f"price:{round(float(price) / PRICE_BUCKET_BRL)}")
+    for photo in fields.get("photos") or []:
+        basename = urlparse(str(photo)).path.rsplit("/", 1)[-1]
+        if basename:
+            shingles.add(f"photo:{basename.lower()}")
+    words = _WORD.findall(_fold(fields.get("title") or ""))
+    for index in range(max(len(words) - 2, 0)):
+        shingles.add("title:" + " ".join(words[index : index + 3]))
+    return shingles
+
+
+def minhash_signature(shingles: Iterable[str]) -> list[int]:
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=4).digest(), "big") for shingle in shingles),
+        dtype=np.uint64,
+    )
+    if hashes.size == 0:
+        return [int(_PRIME)] * NUM_PERMUTATIONS
+    permuted = (_A[:, None] * hashes[None, :] + _B[:, None]) % _PRIME
+    return permuted.min(axis=1).tolist()
+
+
+def band_keys(signature: Sequence[int]) -> list[str]:
+    keys = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS_PER_BAND : (band + 1) * ROWS_PER_BAND]
+        digest = hashlib.blake2b(",".join(map(str, rows)).encode(), digest_size=8).hexdigest()
+        keys.append(f"{band:02d}:{digest}")
+    return keys
+
+
+def estimated_similarity(left: Sequence[int], right: Sequence[int]) -> float:
+    return float(np.mean(np.asarray(left) == np.asarray(right)))
+
+
+def _compatible(listing: NormalizedListing, candidate) -> bool:
+    if _fold(listing.brand or "") != _fold(candidate.brand or "") or _fold(listing.model or "") != _fold(candidate.model or ""):
+        return False
+    if listing.year and candidate.year and listing.year != candidate.year:
+        return False
+    if listing.price_brl and candidate.price_brl:
+        return abs(listing.price_brl - candidate.price_brl) / max(listing.price_brl, candidate.price_brl) <= PRICE_TOLERANCE
+    return True
+
+
+def assign_duplicate_cluster(db: Session, listing: NormalizedListing, title: Optional[str] = None) -> Optional[int]:
+    """Fingerprint a flushed listing, index its LSH buckets and link it to an existing cluster.
+
+    Candidates come only from rows sharing at least one band bucket, so the cost does not
+    depend on table size. Only active listings outside the listing's own cluster are candidates,
+    and a listing that other rows already point at stays canonical. Returns the canonical
+    listing id, or None when the listing is unique or canonical.
+    """
+    fields = {
+        "brand": listing.brand,
+        "model": listing.model,
+        "year": listing.year,
+        "city": listing.city,
+        "mileage_km": listing.mileage_km,
+        "price_brl": listing.price_brl,
+        "photos": listing.photos,
+        "title": title,
+    }
+    signature = minhash_signature(listing_shingles(fields))
+    keys = band_keys(signature)
+
+    candidate_ids = select(ListingLshBucket.listing_id).where(
+        ListingLshBucket.bucket_key.in_(keys), ListingLshBucket.listing_id != listing.id
+    )
+    candidates = db.execute(
+        select(
+            NormalizedListing.id,
+            NormalizedListing.brand,
+            NormalizedListing.model,
+            NormalizedListing.year,
+            NormalizedListing.price_brl,
+            NormalizedListing.canonical_listing_id,
+            ListingFingerprint.signature,
+        )
+        .join(ListingFingerprint, ListingFingerprint.listing_id == NormalizedListing.id)
+        .where(
+            NormalizedListing.id.in_(candidate_ids),
+            NormalizedListing.status == LISTING_STATUS_ACTIVE,
+            or_(NormalizedListing.canonical_listing_id.is_(None), NormalizedListing.canonical_listing_id != listing.id),
+        )
+    ).all()
+
+    best = None
+    best_similarity = SIMILARITY_THRESHOLD
+    for candidate in candidates:
+        similarity = estimated_similarity(signature, candidate.signature)
+        if similarity >= best_similarity and _compatible(listing, candidate):
+            best, best_similarity = candidate, similarity
+
+    db.execute(delete(ListingLshBucket).where(ListingLshBucket.listing_id == listing.id))
+    db.execute(delete(ListingFingerprint).where(ListingFingerprint.listing_id == listing.id))
+    db.add(ListingFingerprint(listing_id=listing.id, signature=signature))
+    db.execute(insert(ListingLshBucket), [{"bucket_key": key, "listing_id": listing.id} for key in keys])
+
+    is_canonical = db.execute(
+        select(NormalizedListing.id).where(NormalizedListing.canonical_listing_id == listing.id).limit(1)
+    ).first()
+    if is_canonical or best is None:
+        listing.canonical_listing_id = None
+    else:
+        listing.canonical_listing_id = best.canonical_listing_id or best.id
+    return listing.canonical_listing_id
+
+
+def reelect_canonicals(db: Session) -> list[int]:
+    """Hand every cluster whose canonical listing went inactive to its oldest active member.
+
+    The old canonical and the rest of the cluster are repointed at the new one, so feeds that
+    show only canonical rows keep showing the car. Returns the ids of the promoted listings.
+    """
+    inactive = select(NormalizedListing.id).where(NormalizedListing.status == LISTING_STATUS_INACTIVE)
+    clusters = db.execute(
+        select(NormalizedListing.canonical_listing_id, func.min(NormalizedListing.id))
+        .where(NormalizedListing.status == LISTING_STATUS_ACTIVE, NormalizedListing.canonical_listing_id.in_(inactive))
+        .group_by(NormalizedListing.canonical_listing_id)
+    ).all()
+    now = dt.datetime.utcnow()
+    for old_id, new_id in clusters:
+        db.execute(
+            update(NormalizedListing)
+            .where(or_(NormalizedListing.id == old_id, NormalizedListing.canonical_listing_id == old_id))
+            .values(
+                canonical_listing_id=case((NormalizedListing.id == new_id, None), else_=new_id),
+                updated_at=now,
+            )
+            .execution_options(synchronize_session=False)
+        )
+    return [new_id for _, new_id in clusters]
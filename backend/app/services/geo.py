@@ -0,0 +1,143 @@
+import csv
+import math
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Optional
+
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+
+from app.models.listing import LISTING_STATUS_ACTIVE, NormalizedListing
+
+GEOHASH_PRECISION = 7
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = 111.32
+MAX_COVERING_CELLS = 16
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_GAZETTEER_PATH = Path(__file__).resolve().parent.parent / "data" / "br_cities.csv"
+
+
+def encode_geohash(lat: float, lng: float, precision: int = GEOHASH_PRECISION) -> str:
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True
+    while len(chars) < precision:
+        bounds, coordinate = (lng_range, lng) if even else (lat_range, lat)
+        mid = (bounds[0] + bounds[1]) / 2
+        value <<= 1
+        if coordinate >= mid:
+            value |= 1
+            bounds[0] = mid
+        else:
+            bounds[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits = 0
+            value = 0
+    return "".join(chars)
+
+
+def _cell_size_degrees(precision: int) -> tuple[float, float]:
+    total_bits = precision * 5
+    lng_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lng_bits)
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lng2 - lng1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def covering_prefixes(lat: float, lng: float, radius_km: float, max_cells: int = MAX_COVERING_CELLS) -> list[str]:
+    """Geohash prefixes whose cells cover the circle's bounding box, at the finest precision within max_cells."""
+    d_lat = radius_km / KM_PER_DEGREE
+    d_lng = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(lat)), 0.01))
+    min_lat, max_lat = max(lat - d_lat, -90.0), min(lat + d_lat, 90.0)
+    min_lng, max_lng = max(lng - d_lng, -180.0), min(lng + d_lng, 180.0)
+
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        cell_lat, cell_lng = _cell_size_degrees(precision)
+        rows = math.floor(max_lat / cell_lat) - math.floor(min_lat / cell_lat) + 1
+        cols = math.floor(max_lng / cell_lng) - math.floor(min_lng / cell_lng) + 1
+        if rows * cols > max_cells and precision > 1:
+            continue
+        prefixes = set()
+        for row in range(rows):
+            point_lat = min(min_lat + row * cell_lat, max_lat)
+            for col in range(cols):
+                point_lng = min(min_lng + col * cell_lng, max_lng)
+                prefixes.add(encode_geohash(point_lat, point_lng, precision))
+            prefixes.add(encode_geohash(point_lat, max_lng, precision))
+        for col in range(cols):
+            prefixes.add(encode_geohash(max_lat, min(min_lng + col * cell_lng, max_lng), precision))
+        prefixes.add(encode_geohash(max_lat, max_lng, precision))
+        return sorted(prefixes)
+    return [""]
+
+
+def _place_key(city: str, state: str) -> tuple[str, str]:
+    decomposed = unicodedata.normalize("NFKD", city)
+    folded = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(folded.casefold().split()), state.strip().upper()
+
+
+@lru_cache
+def _gazetteer() -> dict[tuple[str, str], tuple[float, float]]:
+    with _GAZETTEER_PATH.open(encoding="utf-8") as handle:
+        return {_place_key(row["city"], row["state"]): (float(row["lat"]), float(row["lng"])) for row in csv.DictReader(handle)}
+
+
+def geocode_city(city: Optional[str], state: Optional[str]) -> Optional[tuple[float, float]]:
+    """Offline lookup of a Brazilian city centroid; None when the place is not in the gazetteer."""
+    if not city or not state:
+        return None
+    return _gazetteer().get(_place_key(city, state))
+
+
+def resolve_coordinates(
+    lat: Optional[float], lng: Optional[float], city: Optional[str], state: Optional[str]
+) -> Optional[tuple[float, float]]:
+    """Prefer coordinates sent by the marketplace, falling back to the city centroid."""
+    if lat is not None and lng is not None:
+        return float(lat), float(lng)
+    return geocode_city(city, state)
+
+
+def nearby_listings(
+    db: Session, columns: tuple, lat: float, lng: float, radius_km: float, limit: int
+) -> list[tuple[Any, float]]:
+    """Listings within radius_km, nearest first, as (row mapping, distance) pairs.
+
+    The geohash prefixes narrow the scan to a handful of index ranges; haversine then drops
+    the corners of the covering cells that fall outside the circle. Prefixes are matched with
+    LIKE rather than a range ending in a sentinel character, which only holds under byte
+    ordering; on Postgres the index uses varchar_pattern_ops so LIKE can use it under any
+    collation.
+    """
+    prefixes = covering_prefixes(lat, lng, radius_km)
+    ranges = [NormalizedListing.geohash.like(f"{prefix}%") for prefix in prefixes if prefix]
+    stmt = select(*columns, NormalizedListing.lat, NormalizedListing.lng).where(
+        NormalizedListing.status == LISTING_STATUS_ACTIVE,
+        NormalizedListing.geohash.is_not(None),
+        NormalizedListing.canonical_listing_id.is_(None),
+    )
+    if ranges:
+        stmt = stmt.where(or_(*ranges))
+    matches = []
+    for row in db.execute(stmt).mappings():
+        distance = haversine_km(lat, lng, row["lat"], row["lng"])
+        if distance <= radius_km:
+            matches.append((row, distance))
+    matches.sort(key=lambda match: match[1])
+    return matches[:limit]
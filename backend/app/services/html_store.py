@@ -0,0 +1,240 @@
+import datetime as dt
+import importlib
+import logging
+import mmap
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Mapping, Optional
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.models.listing import HtmlPage, ListingSource, NormalizedListing
+
+from .geo import encode_geohash, geocode_city
+from .listing_refresh import refresh_listing_derivatives
+from .normalization import normalize_listing_fields
+from .pricing import apply_markup
+
+logger = logging.getLogger(__name__)
+
+MAX_PACK_BYTES = 512 * 1024 * 1024
+REPARSE_TASK_PAGES = 500
+
+# Parsers are referenced by dotted path so pool workers import them, not the parent process.
+# Only sources listed here get their pages stored.
+PAGE_PARSERS = {
+    "olx": "app.connectors.olx:parse_listing_detail",
+    "mercadolivre": "app.connectors.mercadolivre:parse_listing_detail",
+    "mercado_livre": "app.connectors.mercadolivre:parse_listing_detail",
+}
+
+REPARSED_FIELDS = (
+    "brand",
+    "model",
+    "trim",
+    "title",
+    "year",
+    "mileage_km",
+    "city",
+    "state",
+    "photos",
+    "url",
+)
+
+
+class HtmlPackWriter:
+    """Appends zlib-compressed detail pages to per-source pack files and buffers their index rows.
+
+    Connectors call `put` for every fetched page; the ingest job calls `flush` to write the
+    html_pages rows in the same transaction as the raw listings.
+    """
+
+    def __init__(
+        self, source_name: str, root: Optional[Path] = None, max_pack_bytes: int = MAX_PACK_BYTES
+    ) -> None:
+        self.source_name = source_name
+        self.root = Path(root or get_settings().html_store_dir)
+        self.max_pack_bytes = max_pack_bytes
+        self._pending: list[dict[str, Any]] = []
+        self._pack: Optional[Path] = None
+
+    def _current_pack(self) -> Path:
+        if self._pack is None or self._pack.stat().st_size >= self.max_pack_bytes:
+            directory = self.root / self.source_name
+            directory.mkdir(parents=True, exist_ok=True)
+            stamp = dt.datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+            self._pack = directory / f"pack-{stamp}.zpack"
+            self._pack.touch()
+        return self._pack
+
+    def put(self, external_id: Optional[str], url: str, html: str) -> None:
+        pack = self._current_pack()
+        blob = zlib.compress(html.encode("utf-8"), 6)
+        with pack.open("ab") as handle:
+            offset = handle.tell()
+            handle.write(blob)
+        self._pending.append(
+            {
+                "source_name": self.source_name,
+                "external_id": external_id,
+                "url": url,
+                "pack": pack.relative_to(self.root).as_posix(),
+                "offset": offset,
+                "length": len(blob),
+                "fetched_at": dt.datetime.utcnow(),
+            }
+        )
+
+    def flush(self, db: Session) -> int:
+        pending, self._pending = self._pending, []
+        if pending:
+            db.execute(insert(HtmlPage), pending)
+        return len(pending)
+
+
+class HtmlPackReader:
+    """Random access to one pack file through mmap; pages are sliced out without reading the file."""
+
+    def __init__(self, path: Path) -> None:
+        self._handle = path.open("rb")
+        self._map = mmap.mmap(self._handle.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def read(self, offset: int, length: int) -> str:
+        return zlib.decompress(self._map[offset : offset + length]).decode("utf-8")
+
+    def close(self) -> None:
+        self._map.close()
+        self._handle.close()
+
+    def __enter__(self) -> "HtmlPackReader":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+def load_page_parser(dotted_path: str) -> Callable[[str], Mapping]:
+    module_name, _, attribute = dotted_path.partition(":")
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def _reparse_task(
+    task: tuple[str, str, list[tuple[str, int, int]]],
+) -> tuple[list[tuple[str, dict]], int]:
+    pack_path, parser_path, entries = task
+    parser = load_page_parser(parser_path)
+    parsed_pages, failures = [], 0
+    with HtmlPackReader(Path(pack_path)) as reader:
+        for external_id, offset, length in entries:
+            try:
+                parsed_pages.append((external_id, dict(parser(reader.read(offset, length)))))
+            except Exception:  # noqa: BLE001 - one bad page must not abort the pack
+                failures += 1
+    return parsed_pages, failures
+
+
+def _listing_changes(parsed: Mapping) -> dict[str, Any]:
+    fields = normalize_listing_fields(parsed)
+    changes = {field: fields[field] for field in REPARSED_FIELDS if fields.get(field) is not None}
+    if fields.get("price"):
+        changes.update(
+            price_brl=fields["price"],
+            supplier_price_brl=fields["price"],
+            final_price_brl=apply_markup(fields["price"]),
+        )
+    return changes
+
+
+@dataclass
+class ReparseResult:
+    listing_ids: list[int] = field(default_factory=list)
+    # States the updated listings were in before or after, whose feeds changed.
+    regions: set[Optional[str]] = field(default_factory=set)
+
+
+def _refresh_derived_fields(db: Session, ids: list[int], places: Mapping[int, tuple], result: ReparseResult) -> None:
+    """Redo what normalization derives from the reparsed columns, on the same path as a crawl.
+
+    Coordinates of a listing whose city or state changed are re-geocoded, and cleared when the
+    new place is not in the gazetteer rather than left pointing at the old one.
+    """
+    listings = db.execute(
+        select(NormalizedListing).where(NormalizedListing.id.in_(ids)).execution_options(populate_existing=True)
+    ).scalars()
+    for listing in listings:
+        result.listing_ids.append(listing.id)
+        result.regions.update((places[listing.id][1], listing.state))
+        if places.get(listing.id) != (listing.city, listing.state):
+            coordinates = geocode_city(listing.city, listing.state)
+            listing.lat, listing.lng = coordinates or (None, None)
+            listing.geohash = encode_geohash(*coordinates) if coordinates else None
+        db.flush()
+        refresh_listing_derivatives(db, listing, listing.price_brl)
+
+
+def reparse_stored_pages(
+    db: Session,
+    source_name: str,
+    root: Optional[Path] = None,
+    parser_path: Optional[str] = None,
+    max_workers: Optional[int] = None,
+) -> ReparseResult:
+    """Re-extract every listing of a source from its latest stored page and bulk-update the rows.
+
+    Geohash and search index entries of the updated listings are refreshed in the same session;
+    the result names them so the caller can drop cached responses after committing.
+    """
+    root = Path(root or get_settings().html_store_dir)
+    if parser_path is None and source_name not in PAGE_PARSERS:
+        raise ValueError(f"No stored-page parser registered for {source_name!r}")
+    parser_path = parser_path or PAGE_PARSERS[source_name]
+    latest = (
+        select(HtmlPage.external_id, HtmlPage.pack, HtmlPage.offset, HtmlPage.length)
+        .where(
+            HtmlPage.source_name == source_name,
+            HtmlPage.external_id.is_not(None),
+            HtmlPage.id.in_(
+                select(func.max(HtmlPage.id))
+                .where(HtmlPage.source_name == source_name)
+                .group_by(HtmlPage.external_id)
+            ),
+        )
+        .order_by(HtmlPage.pack, HtmlPage.offset)
+    )
+    tasks: list[tuple[str, str, list[tuple[str, int, int]]]] = []
+    for page in db.execute(latest):
+        pack_path = str(root / page.pack)
+        if not tasks or tasks[-1][0] != pack_path or len(tasks[-1][2]) >= REPARSE_TASK_PAGES:
+            tasks.append((pack_path, parser_path, []))
+        tasks[-1][2].append((page.external_id, page.offset, page.length))
+    if not tasks:
+        return ReparseResult()
+
+    listing_ids, places = {}, {}
+    for row in db.execute(
+        select(NormalizedListing.external_id, NormalizedListing.id, NormalizedListing.city, NormalizedListing.state)
+        .join(ListingSource, ListingSource.id == NormalizedListing.source_id)
+        .where(ListingSource.name == source_name)
+    ):
+        listing_ids[row.external_id] = row.id
+        places[row.id] = (row.city, row.state)
+    result = ReparseResult()
+    failures = 0
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        for parsed_pages, task_failures in pool.map(_reparse_task, tasks):
+            failures += task_failures
+            changes = [
+                {"id": listing_ids[external_id], **_listing_changes(parsed)}
+                for external_id, parsed in parsed_pages
+                if external_id in listing_ids
+            ]
+            if changes:
+                db.execute(update(NormalizedListing), changes)
+                _refresh_derived_fields(db, [change["id"] for change in changes], places, result)
+    if failures:
+        logger.warning("Reparse of %s skipped %s pages the parser rejected", source_name, failures)
+    return result
@@ -0,0 +1,26 @@
+import datetime as dt
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.listing import NormalizedListing
+
+from .dedup import assign_duplicate_cluster
+from .price_history import record_price
+from .search_index import index_listing_text
+
+
+def refresh_listing_derivatives(
+    db: Session,
+    listing: NormalizedListing,
+    price: Optional[float],
+    observed_at: Optional[dt.datetime] = None,
+) -> None:
+    """Redo what normalization derives from a flushed listing's scraped columns.
+
+    Shared by crawl normalization and stored-page reparses: price history, the duplicate
+    cluster and the search index. Scoring and alert matching run per batch in the caller.
+    """
+    record_price(db, listing, price, observed_at)
+    assign_duplicate_cluster(db, listing, title=listing.title)
+    index_listing_text(db, listing)
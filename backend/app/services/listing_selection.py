@@ -1,10 +1,9 @@
 from typing import Optional
 
-from sqlalchemy import asc, select
+from sqlalchemy import asc, func, select
 from sqlalchemy.orm import Session
 
-from app.models.listing import NormalizedListing
-
+from app.models.listing import LISTING_STATUS_ACTIVE, NormalizedListing, SellerStats
 
 DEFAULT_MIN_REPUTATION = 0.7
 
@@ -12,10 +11,22 @@ DEFAULT_MIN_REPUTATION = 0.7
 def select_cheapest_with_reputation(
     db: Session, min_reputation: float = DEFAULT_MIN_REPUTATION
 ) -> Optional[NormalizedListing]:
+    """Cheapest active canonical listing whose seller's reliability score meets the bound.
+
+    Same rule as the market snapshot's `cheapest` over `mask(min_reliability=...)`, read straight
+    from the database for when the snapshot is not built yet.
+    """
+    price = func.coalesce(NormalizedListing.final_price_brl, NormalizedListing.price_brl)
     stmt = (
         select(NormalizedListing)
-        .where(NormalizedListing.seller_reputation >= min_reputation)
-        .order_by(asc(NormalizedListing.price_brl), asc(NormalizedListing.id))
+        .join(SellerStats, SellerStats.seller_id == NormalizedListing.seller_id)
+        .where(
+            NormalizedListing.status == LISTING_STATUS_ACTIVE,
+            NormalizedListing.canonical_listing_id.is_(None),
+            SellerStats.reliability_score >= min_reputation,
+            price.is_not(None),
+        )
+        .order_by(asc(price), asc(NormalizedListing.id))
+        .limit(1)
     )
     return db.execute(stmt).scalars().first()
-
@@ -0,0 +1,350 @@
+import datetime as dt
+import logging
+import threading
+import time
+from dataclasses import dataclass, fields
+from typing import Callable, Iterable, Optional, Sequence
+
+# NumPy loads with this module, so API code imports it lazily (see test_startup_imports).
+import numpy as np
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.models.listing import LISTING_STATUS_ACTIVE, NormalizedListing, SellerStats, photo_count
+
+from .pricing import price_deviations
+
+logger = logging.getLogger(__name__)
+
+MISSING_CODE = -1
+DEFAULT_CHUNK_SIZE = 10_000
+# A transaction that began before the last refresh can commit rows stamped slightly older
+# than the watermark; re-reading this window picks them up. Re-applied rows are idempotent.
+REFRESH_OVERLAP = dt.timedelta(seconds=60)
+
+
+class Vocabulary:
+    """Stable integer codes for one string column, in first-seen order. Codes are never reused."""
+
+    def __init__(self) -> None:
+        self._codes: dict[str, int] = {}
+
+    def encode(self, value: Optional[str]) -> int:
+        if value is None:
+            return MISSING_CODE
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self._codes)
+        return code
+
+    def lookup(self, value: str) -> Optional[int]:
+        return self._codes.get(value)
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+
+@dataclass(frozen=True)
+class SnapshotColumns:
+    """Parallel arrays sorted by listing id; NaN marks an unknown number, MISSING_CODE an unknown string."""
+
+    ids: np.ndarray
+    price: np.ndarray
+    year: np.ndarray
+    mileage_km: np.ndarray
+    state: np.ndarray
+    brand: np.ndarray
+    model: np.ndarray
+    seller_type: np.ndarray
+    has_photos: np.ndarray
+    reliability: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def take(self, selector: np.ndarray) -> "SnapshotColumns":
+        return SnapshotColumns(**{name: values[selector] for name, values in self._arrays()})
+
+    def _arrays(self) -> Iterable[tuple[str, np.ndarray]]:
+        return ((field.name, getattr(self, field.name)) for field in fields(self))
+
+
+def _snapshot_query():
+    # Price follows the alert matcher: the marked-up price when known, the supplier price otherwise.
+    return select(
+        NormalizedListing.id,
+        NormalizedListing.status,
+        NormalizedListing.canonical_listing_id,
+        func.coalesce(NormalizedListing.final_price_brl, NormalizedListing.price_brl).label(
+            "price"
+        ),
+        NormalizedListing.year,
+        NormalizedListing.mileage_km,
+        NormalizedListing.state,
+        NormalizedListing.brand,
+        NormalizedListing.model,
+        NormalizedListing.seller_type,
+        (photo_count(NormalizedListing.photos) > 0).label(
+            "has_photos"
+        ),
+        SellerStats.reliability_score,
+        NormalizedListing.updated_at,
+        SellerStats.updated_at.label("seller_updated_at"),
+    ).outerjoin(SellerStats, SellerStats.seller_id == NormalizedListing.seller_id)
+
+
+def _is_live(row) -> bool:
+    return row.status == LISTING_STATUS_ACTIVE and row.canonical_listing_id is None
+
+
+class MarketSnapshot:
+    """Active canonical listings as NumPy columns, built with one query and refreshed by `updated_at`.
+
+    Listings or seller stats touched since the watermark are re-read; rows that went inactive or
+    became duplicates drop out, new ones are merged in by id. Each refresh publishes a new
+    SnapshotColumns, so readers holding the previous one are never affected by a refresh.
+    """
+
+    def __init__(self, ttl_seconds: int, chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.chunk_size = chunk_size
+        self.states = Vocabulary()
+        self.brands = Vocabulary()
+        self.models = Vocabulary()
+        self.seller_types = Vocabulary()
+        self._columns: Optional[SnapshotColumns] = None
+        self._watermark: Optional[dt.datetime] = None
+        self._refreshed_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        self._refreshed_at = None
+
+    def get(self, db: Session, wait: bool = True) -> Optional[SnapshotColumns]:
+        """Current columns, refreshed first when older than the TTL.
+
+        With `wait=False` the caller never queues behind a refresh running on another thread:
+        it gets the previous columns, or None while the first build is still in progress.
+        """
+        if (
+            self._refreshed_at is not None
+            and time.monotonic() - self._refreshed_at < self.ttl_seconds
+        ):
+            return self._columns
+        if not self._lock.acquire(blocking=wait):
+            return self._columns
+        try:
+            if (
+                self._refreshed_at is None
+                or time.monotonic() - self._refreshed_at >= self.ttl_seconds
+            ):
+                self.refresh(db)
+            return self._columns
+        finally:
+            self._lock.release()
+
+    def refresh(self, db: Session) -> SnapshotColumns:
+        """Full build on first use, a delta merge afterwards."""
+        if self._columns is None or self._watermark is None:
+            stmt = _snapshot_query().where(
+                NormalizedListing.status == LISTING_STATUS_ACTIVE,
+                NormalizedListing.canonical_listing_id.is_(None),
+            )
+            columns, _ = self._read(db, stmt)
+            order = np.argsort(columns.ids, kind="stable")
+            self._columns = columns.take(order)
+        else:
+            since = self._watermark - REFRESH_OVERLAP
+            stmt = _snapshot_query().where(
+                or_(NormalizedListing.updated_at >= since, SellerStats.updated_at >= since)
+            )
+            delta, live = self._read(db, stmt)
+            self._columns = self._merge(self._columns, delta, live)
+        self._refreshed_at = time.monotonic()
+        return self._columns
+
+    def _read(self, db: Session, stmt) -> tuple[SnapshotColumns, np.ndarray]:
+        rows = [
+            row
+            for chunk in db.execute(stmt.execution_options(yield_per=self.chunk_size)).partitions()
+            for row in chunk
+        ]
+        for row in rows:
+            for stamp in (row.updated_at, row.seller_updated_at):
+                if stamp is not None and (self._watermark is None or stamp > self._watermark):
+                    self._watermark = stamp
+        if self._watermark is None:
+            # An empty table still needs a watermark, or every refresh would be a full build.
+            self._watermark = dt.datetime.utcnow()
+        columns = SnapshotColumns(
+            ids=np.fromiter((row.id for row in rows), dtype=np.int64, count=len(rows)),
+            price=np.array([row.price for row in rows], dtype=np.float64),
+            year=np.array([row.year for row in rows], dtype=np.float64),
+            mileage_km=np.array([row.mileage_km for row in rows], dtype=np.float64),
+            state=np.fromiter(
+                (self.states.encode(row.state) for row in rows), dtype=np.int32, count=len(rows)
+            ),
+            brand=np.fromiter(
+                (self.brands.encode(row.brand) for row in rows), dtype=np.int32, count=len(rows)
+            ),
+            model=np.fromiter(
+                (self.models.encode(row.model) for row in rows), dtype=np.int32, count=len(rows)
+            ),
+            seller_type=np.fromiter(
+                (self.seller_types.encode(row.seller_type) for row in rows),
+                dtype=np.int32,
+                count=len(rows),
+            ),
+            has_photos=np.fromiter(
+                (bool(row.has_photos) for row in rows), dtype=bool, count=len(rows)
+            ),
+            reliability=np.array([row.reliability_score for row in rows], dtype=np.float64),
+        )
+        live = np.fromiter((_is_live(row) for row in rows), dtype=bool, count=len(rows))
+        return columns, live
+
+    @staticmethod
+    def _merge(
+        current: SnapshotColumns, delta: SnapshotColumns, live: np.ndarray
+    ) -> SnapshotColumns:
+        if not len(delta):
+            return current
+        positions = np.searchsorted(current.ids, delta.ids)
+        clipped = np.minimum(positions, max(len(current) - 1, 0))
+        found = (
+            (positions < len(current)) & (current.ids[clipped] == delta.ids)
+            if len(current)
+            else np.zeros(len(delta), bool)
+        )
+
+        keep = np.ones(len(current), dtype=bool)
+        keep[positions[found & ~live]] = False
+        overwrite = found & live
+        append = ~found & live
+
+        merged = {}
+        for name, values in current._arrays():
+            values = values.copy()
+            values[positions[overwrite]] = getattr(delta, name)[overwrite]
+            merged[name] = np.concatenate([values[keep], getattr(delta, name)[append]])
+        result = SnapshotColumns(**merged)
+        # New listings normally carry the highest ids, so a sort is only needed for the odd backfill.
+        if append.any() and len(result) > 1 and not np.all(result.ids[1:] > result.ids[:-1]):
+            result = result.take(np.argsort(result.ids, kind="stable"))
+        return result
+
+    def mask(
+        self,
+        columns: SnapshotColumns,
+        state: Optional[str] = None,
+        brand: Optional[str] = None,
+        model: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        min_year: Optional[int] = None,
+        max_year: Optional[int] = None,
+        max_mileage_km: Optional[int] = None,
+        min_reliability: Optional[float] = None,
+    ) -> np.ndarray:
+        """Boolean mask of listings meeting every given criterion.
+
+        As in the alert matcher, a bound on a value the listing does not report is never met:
+        comparisons against NaN are False.
+        """
+        selected = np.ones(len(columns), dtype=bool)
+        for vocabulary, codes, value in (
+            (self.states, columns.state, state),
+            (self.brands, columns.brand, brand),
+            (self.models, columns.model, model),
+        ):
+            if value is not None:
+                code = vocabulary.lookup(value)
+                if code is None:
+                    return np.zeros(len(columns), dtype=bool)
+                selected &= codes == code
+        for values, bound, keep in (
+            (columns.price, min_price, np.greater_equal),
+            (columns.price, max_price, np.less_equal),
+            (columns.year, min_year, np.greater_equal),
+            (columns.year, max_year, np.less_equal),
+            (columns.mileage_km, max_mileage_km, np.less_equal),
+            (columns.reliability, min_reliability, np.greater_equal),
+        ):
+            if bound is not None:
+                selected &= keep(values, bound)
+        return selected
+
+
+def segment_medians(columns: SnapshotColumns) -> np.ndarray:
+    """Median price of each listing's (state, brand, model) segment, NaN where no price is known."""
+    medians = np.full(len(columns), np.nan)
+    priced = np.flatnonzero(~np.isnan(columns.price))
+    if not len(priced):
+        return medians
+    # Pack the three codes into one int64 key (shifted past MISSING_CODE) so a single sort groups them.
+    brand_span = np.int64(columns.brand.max(initial=0)) + 2
+    model_span = np.int64(columns.model.max(initial=0)) + 2
+    segment = (
+        ((columns.state[priced].astype(np.int64) + 1) * brand_span + columns.brand[priced] + 1)
+        * model_span
+        + columns.model[priced]
+        + 1
+    )
+    price = columns.price[priced]
+    # Price ranks folded into the key give one unstable integer argsort; lexsort and stable
+    # sorts are several times slower at a million rows.
+    price_rank = np.empty(len(price), dtype=np.int64)
+    price_rank[np.argsort(price)] = np.arange(len(price))
+    if segment.max() >= np.iinfo(np.int64).max // len(price):
+        segment = np.unique(segment, return_inverse=True)[1].ravel().astype(np.int64)
+    order = np.argsort(segment * len(price) + price_rank)
+    sorted_segment = segment[order]
+    sorted_price = price[order]
+    first = np.r_[True, sorted_segment[1:] != sorted_segment[:-1]]
+    starts = np.flatnonzero(first)
+    counts = np.diff(np.r_[starts, len(sorted_segment)])
+    per_group = (sorted_price[starts + (counts - 1) // 2] + sorted_price[starts + counts // 2]) / 2
+    medians[priced[order]] = per_group[np.cumsum(first) - 1]
+    return medians
+
+
+def discount_scores(columns: SnapshotColumns, medians: Optional[np.ndarray] = None) -> np.ndarray:
+    """Vectorized `opportunity_score`: discount to the segment median, NaN when it cannot be scored."""
+    medians = segment_medians(columns) if medians is None else medians
+    return np.round(-price_deviations(columns.price, medians), 4)
+
+
+def cheapest(columns: SnapshotColumns, selected: np.ndarray, limit: int = 1) -> Sequence[int]:
+    """Ids of the `limit` cheapest selected listings, ties broken by id."""
+    candidates = np.flatnonzero(selected & ~np.isnan(columns.price))
+    if not len(candidates):
+        return []
+    if len(candidates) > limit:
+        # np.partition finds the price cutoff in O(n), so only the cheapest few get sorted.
+        cutoff = np.partition(columns.price[candidates], limit - 1)[limit - 1]
+        candidates = candidates[columns.price[candidates] <= cutoff]
+    order = np.lexsort((columns.ids[candidates], columns.price[candidates]))[:limit]
+    return columns.ids[candidates[order]].tolist()
+
+
+_snapshot: Optional[MarketSnapshot] = None
+
+
+def get_market_snapshot() -> MarketSnapshot:
+    global _snapshot
+    if _snapshot is None:
+        _snapshot = MarketSnapshot(get_settings().market_snapshot_refresh_seconds)
+    return _snapshot
+
+
+def warm_market_snapshot(session_factory: Callable[[], Session]) -> None:
+    """Run the full build outside any request, so the first chat does not pay for it."""
+    started = time.perf_counter()
+    try:
+        with session_factory() as db:
+            columns = get_market_snapshot().get(db)
+    except Exception:  # noqa: BLE001 - the first request retries the build
+        logger.exception("Market snapshot warm-up failed")
+        return
+    logger.info("Market snapshot warmed with %s listings in %.1fs", len(columns), time.perf_counter() - started)
@@ -1,4 +1,4 @@
-from typing import Dict, Optional
+from typing import Any, Dict, List, Optional
 
 
 COMMON_BRANDS = {
@@ -15,6 +15,15 @@ def normalize_brand(raw_brand: Optional[str]) -> Optional[str]:
     return COMMON_BRANDS.get(key, raw_brand.title())
 
 
+def normalize_photos(raw_photos: Any) -> List[str]:
+    """Photos as a list of URLs; connectors have sent null, a bare URL or a dict here."""
+    if isinstance(raw_photos, str):
+        return [raw_photos] if raw_photos else []
+    if isinstance(raw_photos, (list, tuple)):
+        return [photo for photo in raw_photos if photo]
+    return []
+
+
 def normalize_listing_fields(raw: Dict) -> Dict:
     brand = normalize_brand(raw.get("brand"))
     model = raw.get("model")
@@ -22,12 +31,16 @@ def normalize_listing_fields(raw: Dict) -> Dict:
         "external_id": raw.get("id") or raw.get("external_id"),
         "brand": brand,
         "model": model.title() if isinstance(model, str) else model,
+        "title": raw.get("title"),
+        "description": raw.get("description"),
         "trim": raw.get("trim"),
         "year": int(raw["year"]) if raw.get("year") else None,
         "mileage_km": raw.get("mileage_km"),
         "price": float(raw.get("price")) if raw.get("price") else None,
         "city": raw.get("city"),
         "state": raw.get("state"),
+        "lat": raw.get("lat"),
+        "lng": raw.get("lng"),
         "seller_type": raw.get("seller_type", "private"),
         "seller_id": raw.get("seller_id"),
         "seller_origin": raw.get("seller_origin"),
@@ -36,7 +49,7 @@ def normalize_listing_fields(raw: Dict) -> Dict:
         "seller_cancellations": raw.get("seller_cancellations"),
         "seller_response_time_hours": raw.get("seller_response_time_hours"),
         "seller_completed_sales": raw.get("seller_completed_sales"),
-        "photos": raw.get("photos", []),
+        "photos": normalize_photos(raw.get("photos")),
         "url": raw.get("url"),
         "seller_id": raw.get("seller_id"),
         "seller_reputation": raw.get("seller_reputation"),
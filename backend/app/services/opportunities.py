@@ -0,0 +1,140 @@
+import datetime as dt
+from typing import Iterator, Optional, Sequence
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.models.listing import LISTING_STATUS_ACTIVE, MarketStats, NormalizedListing, photo_count
+
+from .pricing import compute_regional_market_stats, opportunity_badges, price_deviations
+from .trust import listing_ages_hours, trust_badges
+
+ANY = "*"
+DEFAULT_CHUNK_SIZE = 1000
+
+
+class RegionMarketStats:
+    """MarketStats of one region held in memory so scoring a listing never queries the database."""
+
+    def __init__(self, rows: list[MarketStats], fallback: Optional[MarketStats] = None) -> None:
+        self._by_segment = {(row.brand, row.model): row for row in rows}
+        self._fallback = fallback
+
+    @classmethod
+    def load(cls, db: Session, region_key: str, with_fallback: bool = True) -> "RegionMarketStats":
+        """Stored stats of a region; without a region-wide row, `with_fallback` computes one from listings."""
+        rows = list(db.execute(select(MarketStats).where(MarketStats.region_key == region_key)).scalars())
+        fallback = None
+        if with_fallback and not any(row.brand == ANY and row.model == ANY for row in rows):
+            fallback = compute_regional_market_stats(db, region_key=region_key)
+        return cls(rows, fallback)
+
+    def lookup(self, brand: Optional[str], model: Optional[str]) -> Optional[MarketStats]:
+        for key in ((brand, model), (brand, ANY), (ANY, ANY)):
+            found = self._by_segment.get(key)
+            if found:
+                return found
+        return self._fallback
+
+
+def opportunity_score(price: Optional[float], stats: Optional[MarketStats]) -> Optional[float]:
+    """Discount against the segment median: 0.15 means 15% below the market."""
+    if not price or stats is None or not stats.median_price:
+        return None
+    return round((stats.median_price - price) / stats.median_price, 4)
+
+
+def score_columns(
+    prices: Sequence[Optional[float]],
+    stats: Sequence[Optional[MarketStats]],
+    seller_types: Sequence[Optional[str]],
+    has_photos: Sequence[bool],
+    created_at: Sequence[Optional[dt.datetime]],
+    now: dt.datetime,
+) -> list[dict]:
+    """Opportunity score and both badges for a batch, as `opportunity_score` and the scalar badges give them."""
+    import numpy as np
+
+    medians = [row.median_price if row else None for row in stats]
+    p25s = [row.p25 if row else None for row in stats]
+    deviations = price_deviations(prices, medians)
+    # Rounded like opportunity_score; the trust signal reads the rounded value, as it always has.
+    scores = np.round(-deviations, 4)
+    opportunity = opportunity_badges(prices, medians, p25s)
+    trust = trust_badges(seller_types, has_photos, -scores, listing_ages_hours(created_at, now))
+    return [
+        {
+            "opportunity_score": None if np.isnan(score) else float(score),
+            "opportunity_badge": opportunity_badge,
+            "trust_badge": trust_badge,
+        }
+        for score, opportunity_badge, trust_badge in zip(scores, opportunity, trust, strict=True)
+    ]
+
+
+def score_listings(db: Session, listings: Sequence[NormalizedListing], now: Optional[dt.datetime] = None) -> None:
+    """Stamp score and badges on freshly normalized listings from their regions' stored market stats.
+
+    No region-wide fallback is computed here; the nightly pass fills in segments without stats.
+    """
+    now = now or dt.datetime.utcnow()
+    markets = {
+        region: RegionMarketStats.load(db, region, with_fallback=False)
+        for region in {listing.state for listing in listings if listing.state}
+    }
+    stats = [
+        markets[listing.state].lookup(listing.brand, listing.model) if listing.state else None for listing in listings
+    ]
+    results = score_columns(
+        [listing.final_price_brl for listing in listings],
+        stats,
+        [listing.seller_type for listing in listings],
+        [bool(listing.photos) for listing in listings],
+        [listing.created_at for listing in listings],
+        now,
+    )
+    for listing, result in zip(listings, results, strict=True):
+        for key, value in result.items():
+            setattr(listing, key, value)
+
+
+def _stream_region(db: Session, region_key: str, chunk_size: int) -> Iterator[list]:
+    # Only the scoring inputs are selected: photos are reduced to a flag in SQL and the text
+    # columns never leave the database. yield_per streams through a server-side cursor.
+    stmt = (
+        select(
+            NormalizedListing.id,
+            NormalizedListing.brand,
+            NormalizedListing.model,
+            NormalizedListing.final_price_brl,
+            NormalizedListing.seller_type,
+            (photo_count(NormalizedListing.photos) > 0).label("has_photos"),
+            NormalizedListing.created_at,
+        )
+        .where(NormalizedListing.status == LISTING_STATUS_ACTIVE, NormalizedListing.state == region_key)
+        .execution_options(yield_per=chunk_size)
+    )
+    yield from db.execute(stmt).partitions()
+
+
+def score_region_opportunities(db: Session, region_key: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """Score every listing of a region chunk by chunk and write scores and badges back in bulk.
+
+    Nothing is committed here; the server-side cursor must stay open until the last chunk.
+    """
+    market = RegionMarketStats.load(db, region_key)
+    now = dt.datetime.utcnow()
+    scored = 0
+    for chunk in _stream_region(db, region_key, chunk_size):
+        segments = {segment: market.lookup(*segment) for segment in {(row.brand, row.model) for row in chunk}}
+        results = score_columns(
+            [row.final_price_brl for row in chunk],
+            [segments[(row.brand, row.model)] for row in chunk],
+            [row.seller_type for row in chunk],
+            [row.has_photos for row in chunk],
+            [row.created_at for row in chunk],
+            now,
+        )
+        db.execute(update(NormalizedListing), [{"id": row.id, **result} for row, result in zip(chunk, results, strict=True)])
+        scored += len(results)
+    return scored
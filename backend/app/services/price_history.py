@@ -0,0 +1,152 @@
+import datetime as dt
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+import numpy as np
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.models.listing import ListingPriceDrop, ListingPriceHistory, NormalizedListing
+
+PRICE_CHANGE_TOLERANCE_BRL = 1.0
+DROP_WINDOW_DAYS = 7
+MIN_DROP = 0.05
+
+
+@dataclass
+class PriceDrop:
+    listing_id: int
+    previous_price: float
+    current_price: float
+    drop: float
+
+
+def record_price(
+    db: Session,
+    listing: NormalizedListing,
+    price: Optional[float],
+    observed_at: Optional[dt.datetime] = None,
+) -> bool:
+    """Append a history point only when the price changed, and refresh the listing's price_trend.
+
+    Unchanged recrawls write nothing, so the table grows with price changes rather than crawls.
+    `price_trend` is the relative change since the first observed price (-0.08 is 8% cheaper).
+    """
+    if not price:
+        return False
+    recent = db.execute(
+        select(ListingPriceHistory.price_brl)
+        .where(ListingPriceHistory.listing_id == listing.id)
+        .order_by(ListingPriceHistory.observed_at.desc(), ListingPriceHistory.id.desc())
+        .limit(1)
+    ).scalar()
+    if recent is not None and abs(recent - price) < PRICE_CHANGE_TOLERANCE_BRL:
+        return False
+
+    db.add(
+        ListingPriceHistory(
+            listing_id=listing.id, price_brl=price, observed_at=observed_at or dt.datetime.utcnow()
+        )
+    )
+    if recent is None:
+        listing.price_trend = 0.0
+    else:
+        first = db.execute(
+            select(ListingPriceHistory.price_brl)
+            .where(ListingPriceHistory.listing_id == listing.id)
+            .order_by(ListingPriceHistory.observed_at, ListingPriceHistory.id)
+            .limit(1)
+        ).scalar()
+        listing.price_trend = round((price - first) / first, 4)
+    return True
+
+
+def detect_price_drops(
+    db: Session,
+    listing_ids: Iterable[int],
+    window_days: int = DROP_WINDOW_DAYS,
+    min_drop: float = MIN_DROP,
+    now: Optional[dt.datetime] = None,
+) -> list[PriceDrop]:
+    """Compare each listing's current price with the price in effect window_days ago, in one pass."""
+    listing_ids = list(set(listing_ids))
+    if not listing_ids:
+        return []
+    rows = db.execute(
+        select(
+            ListingPriceHistory.listing_id,
+            ListingPriceHistory.price_brl,
+            ListingPriceHistory.observed_at,
+        )
+        .where(ListingPriceHistory.listing_id.in_(listing_ids))
+        .order_by(
+            ListingPriceHistory.listing_id, ListingPriceHistory.observed_at, ListingPriceHistory.id
+        )
+    ).all()
+    if not rows:
+        return []
+
+    cutoff = (now or dt.datetime.utcnow()) - dt.timedelta(days=window_days)
+    ids = np.fromiter((row.listing_id for row in rows), dtype=np.int64, count=len(rows))
+    prices = np.fromiter((row.price_brl for row in rows), dtype=float, count=len(rows))
+    before_window = np.fromiter(
+        (row.observed_at <= cutoff for row in rows), dtype=bool, count=len(rows)
+    )
+
+    starts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+    ends = np.r_[starts[1:], len(rows)] - 1
+    # Reference point: the last change at or before the cutoff, or the first point of a newer listing.
+    positions = np.where(before_window, np.arange(len(rows)), -1)
+    reference = np.maximum(np.maximum.reduceat(positions, starts), starts)
+
+    previous = prices[reference]
+    current = prices[ends]
+    drops = (previous - current) / previous
+    return [
+        PriceDrop(
+            listing_id=int(ids[end]),
+            previous_price=float(prev),
+            current_price=float(cur),
+            drop=round(float(drop), 4),
+        )
+        for end, prev, cur, drop in zip(ends, previous, current, drops, strict=True)
+        if drop >= min_drop
+    ]
+
+
+def record_price_drops(
+    db: Session, crawl_run_id: int, drops: Iterable[PriceDrop], detected_at: Optional[dt.datetime] = None
+) -> int:
+    """Store newly seen drops, attributed to the crawl run that first found them.
+
+    A drop is identified by (listing, previous price, current price): a price that stays down
+    over later runs is the same drop and is not stored again, while a further cut is new.
+    """
+    drops = list(drops)
+    if not drops:
+        return 0
+    recorded = {
+        (row.listing_id, row.previous_price_brl, row.current_price_brl)
+        for row in db.execute(
+            select(
+                ListingPriceDrop.listing_id,
+                ListingPriceDrop.previous_price_brl,
+                ListingPriceDrop.current_price_brl,
+            ).where(ListingPriceDrop.listing_id.in_({drop.listing_id for drop in drops}))
+        )
+    }
+    rows = [
+        {
+            "listing_id": drop.listing_id,
+            "crawl_run_id": crawl_run_id,
+            "previous_price_brl": drop.previous_price,
+            "current_price_brl": drop.current_price,
+            "drop_ratio": drop.drop,
+            "detected_at": detected_at or dt.datetime.utcnow(),
+        }
+        for drop in drops
+        if (drop.listing_id, drop.previous_price, drop.current_price) not in recorded
+    ]
+    if rows:
+        db.execute(insert(ListingPriceDrop), rows)
+    return len(rows)
@@ -1,10 +1,13 @@
 import statistics
-from typing import Iterable, Literal, Optional, Sequence
+from typing import TYPE_CHECKING, Iterable, Literal, Optional, Sequence
 
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from app.models.listing import MarketStats, NormalizedListing
+from app.models.listing import LISTING_STATUS_ACTIVE, MarketStats, NormalizedListing
+
+if TYPE_CHECKING:
+    import numpy as np
 
 
 Category = Literal["popular", "mid", "premium", "rare"]
@@ -36,7 +39,9 @@ def _percentile(values: Sequence[float], percentile: float) -> Optional[float]:
 def compute_regional_market_stats(
     db: Session, region_key: str, brand: Optional[str] = None, model: Optional[str] = None
 ) -> Optional[MarketStats]:
-    stmt = select(NormalizedListing.price_brl).where(NormalizedListing.state == region_key)
+    stmt = select(NormalizedListing.price_brl).where(
+        NormalizedListing.status == LISTING_STATUS_ACTIVE, NormalizedListing.state == region_key
+    )
     if brand:
         stmt = stmt.where(NormalizedListing.brand == brand)
     if model:
@@ -75,3 +80,40 @@ def detect_opportunity(price_brl: float, market: Optional[MarketStats]) -> Optio
     if not market:
         return None
     return compute_opportunity_badge(price_brl, median=market.median_price, p25=market.p25)
+
+
+def price_deviations(
+    prices: Sequence[Optional[float]], medians: Sequence[Optional[float]]
+) -> "np.ndarray":
+    """Relative distance of each price from its segment median: -0.15 is 15% below the market.
+
+    NaN where the price is missing or zero or the median is missing or zero, the rows
+    `opportunity_score` leaves unscored.
+    """
+    import numpy as np
+
+    prices = np.asarray(prices, dtype=np.float64)
+    medians = np.asarray(medians, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        deviations = (prices - medians) / medians
+    deviations[np.isnan(prices) | (prices == 0) | np.isnan(medians) | (medians == 0)] = np.nan
+    return deviations
+
+
+def opportunity_badges(
+    prices: Sequence[Optional[float]],
+    medians: Sequence[Optional[float]],
+    p25s: Sequence[Optional[float]],
+) -> "np.ndarray":
+    """`compute_opportunity_badge` over column arrays, with None or NaN for unknown values."""
+    import numpy as np
+
+    prices = np.asarray(prices, dtype=np.float64)
+    medians = np.asarray(medians, dtype=np.float64)
+    p25s = np.asarray(p25s, dtype=np.float64)
+    known = ~(np.isnan(prices) | np.isnan(medians) | np.isnan(p25s))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        discount = np.where(medians != 0, (medians - prices) / medians, 0.0)
+    badges = np.full(len(prices), None, dtype=object)
+    badges[known & ((prices <= p25s) | (discount >= 0.1))] = "Selected by AXIS"
+    return badges
@@ -0,0 +1,133 @@
+import datetime as dt
+import gzip
+import json
+import shutil
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Optional
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session, aliased
+
+from app.core.config import get_settings
+from app.models.listing import RawListing, RawPayloadArchive
+
+MAX_SEGMENT_BYTES = 256 * 1024 * 1024
+DEFAULT_BATCH_SIZE = 1000
+
+
+def _partition(archive_dir: Path, day: dt.date) -> Path:
+    return archive_dir / f"fetched_date={day.isoformat()}"
+
+
+def _open_segment(archive_dir: Path, day: dt.date) -> Path:
+    """Current segment of a day's partition, rolling over to a new file past MAX_SEGMENT_BYTES."""
+    partition = _partition(archive_dir, day)
+    partition.mkdir(parents=True, exist_ok=True)
+    segments = sorted(partition.glob("segment-*.ndjson.gz"))
+    if segments and segments[-1].stat().st_size < MAX_SEGMENT_BYTES:
+        return segments[-1]
+    return partition / f"segment-{len(segments):05d}.ndjson.gz"
+
+
+def _write_member(archive_dir: Path, day: dt.date, rows: list[RawListing]) -> list[dict[str, Any]]:
+    # Each batch becomes one gzip member appended to the segment. Concatenated members are still a
+    # valid .gz file for zcat, while (offset, length) lets a single member be read back on its own.
+    segment = _open_segment(archive_dir, day)
+    body = "".join(json.dumps(row.raw_payload, separators=(",", ":"), default=str) + "\n" for row in rows)
+    member = gzip.compress(body.encode("utf-8"))
+    with segment.open("ab") as handle:
+        offset = handle.tell()
+        handle.write(member)
+    relative = segment.relative_to(archive_dir).as_posix()
+    return [
+        {
+            "raw_id": row.id,
+            "source_id": row.source_id,
+            "external_id": row.external_id,
+            "fetched_at": row.fetched_at,
+            "segment": relative,
+            "offset": offset,
+            "length": len(member),
+            "line": line,
+        }
+        for line, row in enumerate(rows)
+    ]
+
+
+def archive_superseded_payloads(
+    db: Session,
+    archive_dir: Optional[Path] = None,
+    older_than: Optional[dt.datetime] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> int:
+    """Move every payload that has a newer crawl of the same (source, external_id) to cold storage.
+
+    Only the latest payload per listing stays in raw_listings. Rows younger than the hot retention
+    window are left alone so queued normalization jobs still find them.
+    """
+    settings = get_settings()
+    archive_dir = Path(archive_dir or settings.raw_archive_dir)
+    older_than = older_than or dt.datetime.utcnow() - dt.timedelta(hours=settings.raw_hot_retention_hours)
+    newer = aliased(RawListing)
+    superseded = (
+        select(RawListing)
+        .where(
+            RawListing.fetched_at < older_than,
+            select(newer.id)
+            .where(
+                newer.source_id == RawListing.source_id,
+                newer.external_id == RawListing.external_id,
+                newer.id > RawListing.id,
+            )
+            .exists(),
+        )
+        .order_by(RawListing.id)
+        .limit(batch_size)
+    )
+
+    archived = 0
+    while True:
+        rows = db.execute(superseded).scalars().all()
+        if not rows:
+            return archived
+        by_day: dict[dt.date, list[RawListing]] = defaultdict(list)
+        for row in rows:
+            by_day[row.fetched_at.date()].append(row)
+        index_rows = [entry for day, day_rows in by_day.items() for entry in _write_member(archive_dir, day, day_rows)]
+        db.execute(insert(RawPayloadArchive), index_rows)
+        db.execute(delete(RawListing).where(RawListing.id.in_([row.id for row in rows])))
+        db.commit()
+        db.expunge_all()
+        archived += len(rows)
+
+
+def purge_archive(db: Session, archive_dir: Optional[Path] = None, retention_days: Optional[int] = None) -> int:
+    """Drop archived payloads past retention: index rows in one DELETE, segments by whole partition."""
+    settings = get_settings()
+    archive_dir = Path(archive_dir or settings.raw_archive_dir)
+    cutoff = dt.date.today() - dt.timedelta(days=retention_days or settings.raw_archive_retention_days)
+    result = db.execute(
+        delete(RawPayloadArchive).where(RawPayloadArchive.fetched_at < dt.datetime.combine(cutoff, dt.time.min))
+    )
+    db.commit()
+    for partition in archive_dir.glob("fetched_date=*"):
+        if dt.date.fromisoformat(partition.name.split("=", 1)[1]) < cutoff:
+            shutil.rmtree(partition)
+    return result.rowcount
+
+
+def load_raw_payload(db: Session, raw_id: int, archive_dir: Optional[Path] = None) -> Optional[dict]:
+    """Payload of a raw listing whether it is still hot or already archived."""
+    raw = db.get(RawListing, raw_id)
+    if raw is not None:
+        return raw.raw_payload
+    entry = db.get(RawPayloadArchive, raw_id)
+    if entry is None:
+        return None
+    segment = Path(archive_dir or get_settings().raw_archive_dir) / entry.segment
+    with segment.open("rb") as handle:
+        handle.seek(entry.offset)
+        member = handle.read(entry.length)
+    lines = gzip.decompress(member).decode("utf-8").splitlines()
+    return json.loads(lines[entry.line])
@@ -4,11 +4,10 @@ from typing import Dict, Optional
 from sqlalchemy.orm import Session
 
 from app.models.listing import NormalizedListing
-from app.schemas.listing import AxisBotReply
-from .ai_provider import AIProvider, MockProvider
-from .listing_selection import select_cheapest_with_reputation
-from .pricing import compute_regional_market_stats, detect_opportunity
-from .trust import TrustSignals, trust_badge
+from app.schemas.listing import AxisBotReply, ListingOut
+from .ai_cache import build_ai_provider
+from .ai_provider import AIProvider
+from .listing_selection import DEFAULT_MIN_REPUTATION, select_cheapest_with_reputation
 
 
 class AxisBotSession:
@@ -20,7 +19,7 @@ class AxisBotSession:
 
 class AxisBotService:
     def __init__(self, ai_provider: Optional[AIProvider] = None) -> None:
-        self.ai_provider = ai_provider or MockProvider()
+        self.ai_provider = ai_provider or build_ai_provider()
         self.sessions: Dict[str, AxisBotSession] = {}
 
     def start_session(self, query: str) -> str:
@@ -43,18 +42,26 @@ class AxisBotService:
         response_text = self.ai_provider.chat(messages)
 
         listing = self._pick_listing(db)
-        badge = None
+        listing_out = None
         if listing:
-            market = compute_regional_market_stats(
-                db, region_key=listing.state or "*", brand=listing.brand, model=listing.model
+            # Badges are stamped at normalization and by the nightly scoring job.
+            listing_out = ListingOut.model_validate(listing).model_copy(
+                update={"badge": listing.opportunity_badge or listing.trust_badge}
             )
-            badge = detect_opportunity(listing.final_price_brl or listing.price_brl or 0, market)
-            badge = badge or trust_badge(TrustSignals(seller_type=listing.seller_type, has_photos=bool(listing.photos)))
 
         return AxisBotReply(
             reply=f"{response_text}. Selecionamos uma opção premium para você.",
-            listing=listing,
+            listing=listing_out,
         )
 
     def _pick_listing(self, db: Session) -> Optional[NormalizedListing]:
-        return select_cheapest_with_reputation(db)
+        # Imported here: the snapshot pulls in NumPy, which API startup defers.
+        from .market_snapshot import cheapest, get_market_snapshot
+
+        snapshot = get_market_snapshot()
+        columns = snapshot.get(db, wait=False)
+        if columns is None:
+            # The startup warm-up is still building the snapshot; chats do not queue behind it.
+            return select_cheapest_with_reputation(db, min_reputation=DEFAULT_MIN_REPUTATION)
+        ids = cheapest(columns, snapshot.mask(columns, min_reliability=DEFAULT_MIN_REPUTATION))
+        return db.get(NormalizedListing, ids[0]) if ids else None
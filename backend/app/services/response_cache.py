@@ -0,0 +1,151 @@
+import logging
+import time
+from functools import lru_cache
+from typing import Iterable, Optional
+
+import redis
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+LISTING_ROUTE = "listing"
+OPPORTUNITIES_ROUTE = "opportunities"
+
+
+class SharedResponseCache:
+    """Encoded API responses in Redis, each stored next to the ETag it was built with.
+
+    A hit answers the request (or its 304) without touching the database. Workers drop entries
+    after their writes commit; the TTL bounds staleness for writes that do not invalidate.
+    Entries put with a `group` are also listed in that group's set so they can be dropped
+    together, e.g. every cached detail page of one region.
+
+    After a failed read or write the request path skips Redis for `backoff_seconds`, so an outage
+    costs one failed connect per back-off window instead of one per request. Invalidation always
+    tries Redis: it runs in workers, and skipping it could leave stale entries behind.
+    """
+
+    def __init__(
+        self,
+        client: redis.Redis,
+        ttl_seconds: int,
+        prefix: str = "resp",
+        backoff_seconds: float = 5.0,
+    ) -> None:
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+        self.backoff_seconds = backoff_seconds
+        self._retry_at = 0.0
+
+    def _available(self) -> bool:
+        return time.monotonic() >= self._retry_at
+
+    def _back_off(self, action: str, exc: redis.RedisError) -> None:
+        self._retry_at = time.monotonic() + self.backoff_seconds
+        logger.warning(
+            "Response cache %s failed, bypassing it for %.0fs: %s", action, self.backoff_seconds, exc
+        )
+
+    def _key(self, route: str, params: str) -> str:
+        return f"{self.prefix}:{route}:{params}"
+
+    def _group_key(self, group: str) -> str:
+        return f"{self.prefix}:group:{group}"
+
+    def get(self, route: str, params: str) -> Optional[tuple[str, bytes]]:
+        if not self._available():
+            return None
+        try:
+            value = self.client.get(self._key(route, params))
+        except redis.RedisError as exc:
+            self._back_off("read", exc)
+            return None
+        if value is None:
+            return None
+        etag, _, body = value.partition(b"\n")
+        return etag.decode(), body
+
+    def put(self, route: str, params: str, etag: str, body: bytes, group: Optional[str] = None) -> None:
+        if not self._available():
+            return
+        key = self._key(route, params)
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            pipe.set(key, etag.encode() + b"\n" + body, ex=self.ttl_seconds)
+            if group is not None:
+                pipe.sadd(self._group_key(group), key)
+                pipe.expire(self._group_key(group), self.ttl_seconds)
+            pipe.execute()
+        except redis.RedisError as exc:
+            self._back_off("write", exc)
+
+    def invalidate(self, entries: Iterable[tuple[str, str]], groups: Iterable[str] = ()) -> None:
+        """Drop the given (route, params) entries and every entry of the given groups in one round trip."""
+        keys = [self._key(route, params) for route, params in entries]
+        group_keys = [self._group_key(group) for group in set(groups)]
+        if not keys and not group_keys:
+            return
+        try:
+            grouped = []
+            if group_keys:
+                pipe = self.client.pipeline(transaction=False)
+                for group_key in group_keys:
+                    pipe.smembers(group_key)
+                grouped = [key for members in pipe.execute() for key in members]
+            self.client.delete(*keys, *grouped, *group_keys)
+        except redis.RedisError as exc:
+            logger.warning("Response cache invalidation failed: %s", exc)
+
+
+@lru_cache
+def get_response_cache() -> Optional[SharedResponseCache]:
+    settings = get_settings()
+    if not settings.response_cache_enabled:
+        return None
+    return SharedResponseCache(
+        redis.Redis.from_url(
+            settings.redis_url,
+            socket_connect_timeout=settings.response_cache_timeout_seconds,
+            socket_timeout=settings.response_cache_timeout_seconds,
+        ),
+        settings.response_cache_ttl_seconds,
+        backoff_seconds=settings.response_cache_backoff_seconds,
+    )
+
+
+def region_group(region_key: Optional[str]) -> str:
+    """Group of the cached detail pages of listings in one region (the listing's state)."""
+    return f"{LISTING_ROUTE}:{region_key or ''}"
+
+
+def invalidate_listing_responses(
+    listing_ids: Iterable[int], regions: Iterable[Optional[str]] = ()
+) -> None:
+    """Drop cached detail pages of the listings and the opportunities feeds of their regions.
+
+    Callers pass every region a listing was in before and after the write, collected over a
+    whole batch, so one call covers a crawl run.
+    """
+    cache = get_response_cache()
+    if cache is None:
+        return
+    entries = [(LISTING_ROUTE, str(listing_id)) for listing_id in listing_ids]
+    entries += [(OPPORTUNITIES_ROUTE, region) for region in set(regions) if region]
+    cache.invalidate(entries)
+
+
+def invalidate_region_responses(region_key: str) -> None:
+    """Drop a region's feed and every cached detail page in it, for writes that touch the whole region."""
+    cache = get_response_cache()
+    if cache is None:
+        return
+    cache.invalidate([(OPPORTUNITIES_ROUTE, region_key)], groups=[region_group(region_key)])
+
+
+def invalidate_feed_responses(region_key: str) -> None:
+    cache = get_response_cache()
+    if cache is None:
+        return
+    cache.invalidate([(OPPORTUNITIES_ROUTE, region_key)])
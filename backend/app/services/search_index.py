@@ -0,0 +1,164 @@
+import base64
+import json
+import re
+import unicodedata
+import weakref
+from dataclasses import dataclass
+from typing import Any, Mapping, Optional
+
+from sqlalchemy import (
+    Float,
+    Integer,
+    String,
+    and_,
+    cast,
+    func,
+    literal,
+    literal_column,
+    or_,
+    select,
+    text,
+)
+from sqlalchemy.orm import Session
+
+from app.models.listing import LISTING_STATUS_ACTIVE, NormalizedListing
+
+FTS_TABLE = "listing_search"
+TEXT_SEARCH_CONFIG = "portuguese"
+# bm25 column weights for brand, model, trim, title, description
+FTS_WEIGHTS = (10.0, 10.0, 4.0, 2.0, 1.0)
+
+_WORD = re.compile(r"\w+")
+_fts_ready: "weakref.WeakSet" = weakref.WeakSet()
+
+
+@dataclass
+class SearchPage:
+    items: list[Mapping[str, Any]]
+    next_cursor: Optional[str]
+
+
+def encode_cursor(score: float, listing_id: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps([score, listing_id]).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[float, int]:
+    try:
+        score, listing_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(score), int(listing_id)
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Invalid search cursor") from exc
+
+
+def _is_sqlite(db: Session) -> bool:
+    return db.get_bind().dialect.name == "sqlite"
+
+
+def _ensure_fts_table(db: Session) -> None:
+    # Postgres keeps its tsvector in a generated column (see migration 0007); SQLite gets an FTS5
+    # table keyed by listing id, created on first use so local databases need no migration step.
+    engine = db.get_bind()
+    if engine in _fts_ready:
+        return
+    db.execute(
+        text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            "brand, model, trim, title, description, tokenize='unicode61 remove_diacritics 2')"
+        )
+    )
+    _fts_ready.add(engine)
+
+
+def index_listing_text(db: Session, listing: NormalizedListing) -> None:
+    """Refresh the text index entry of a flushed listing (a no-op on Postgres)."""
+    if not _is_sqlite(db):
+        return
+    _ensure_fts_table(db)
+    db.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :id"), {"id": listing.id})
+    db.execute(
+        text(
+            f"INSERT INTO {FTS_TABLE} (rowid, brand, model, trim, title, description) "
+            "VALUES (:id, :brand, :model, :trim, :title, :description)"
+        ),
+        {
+            "id": listing.id,
+            "brand": listing.brand,
+            "model": listing.model,
+            "trim": listing.trim,
+            "title": listing.title,
+            "description": listing.description,
+        },
+    )
+
+
+def rebuild_search_index(db: Session) -> int:
+    if not _is_sqlite(db):
+        return 0
+    _ensure_fts_table(db)
+    db.execute(text(f"DELETE FROM {FTS_TABLE}"))
+    result = db.execute(
+        text(
+            f"INSERT INTO {FTS_TABLE} (rowid, brand, model, trim, title, description) "
+            "SELECT id, brand, model, trim, title, description FROM normalized_listings"
+        )
+    )
+    return result.rowcount
+
+
+def _terms(query: str) -> list[str]:
+    decomposed = unicodedata.normalize("NFKD", query)
+    folded = "".join(ch for ch in decomposed if not unicodedata.combining(ch)).casefold()
+    return _WORD.findall(folded)
+
+
+def _sqlite_matches(db: Session, terms: list[str]):
+    _ensure_fts_table(db)
+    # Every term must match; the last one is a prefix so results show up while the user types.
+    match = " ".join(f'"{term}"' for term in terms) + "*"
+    weights = ", ".join(str(weight) for weight in FTS_WEIGHTS)
+    return (
+        text(f"SELECT rowid AS listing_id, -bm25({FTS_TABLE}, {weights}) AS score FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match")
+        .bindparams(match=match)
+        .columns(listing_id=Integer, score=Float)
+        .subquery("matches")
+    )
+
+
+def _postgres_matches(query: str):
+    tsquery = func.websearch_to_tsquery(TEXT_SEARCH_CONFIG, query)
+    vector = literal_column("normalized_listings.search_vector")
+    document = literal_column("normalized_listings.search_document")
+    needle = literal(query.lower(), String)
+    # The query is short and the document long, so typos are matched against the best-matching
+    # part of the document (word_similarity, `<%`), not the whole of it (similarity, `%`).
+    # Cast to double so the score in a cursor compares equal to the one recomputed on the next page.
+    score = cast(func.ts_rank_cd(vector, tsquery) + func.word_similarity(needle, document), Float)
+    return (
+        select(NormalizedListing.id.label("listing_id"), score.label("score"))
+        .where(or_(vector.op("@@")(tsquery), needle.op("<%")(document)))
+        .subquery("matches")
+    )
+
+
+def search_listings(db: Session, columns: tuple, query: str, limit: int, cursor: Optional[str] = None) -> SearchPage:
+    """Rank listings by text relevance with keyset pagination on (score desc, id asc)."""
+    terms = _terms(query)
+    if not terms:
+        return SearchPage(items=[], next_cursor=None)
+    matches = _sqlite_matches(db, terms) if _is_sqlite(db) else _postgres_matches(query)
+
+    stmt = (
+        select(*columns, matches.c.score)
+        .join(matches, matches.c.listing_id == NormalizedListing.id)
+        .where(NormalizedListing.status == LISTING_STATUS_ACTIVE, NormalizedListing.canonical_listing_id.is_(None))
+    )
+    if cursor:
+        after_score, after_id = decode_cursor(cursor)
+        stmt = stmt.where(
+            or_(matches.c.score < after_score, and_(matches.c.score == after_score, NormalizedListing.id > after_id))
+        )
+    rows = db.execute(stmt.order_by(matches.c.score.desc(), NormalizedListing.id).limit(limit + 1)).mappings().all()
+
+    next_cursor = encode_cursor(rows[limit - 1]["score"], rows[limit - 1]["id"]) if len(rows) > limit else None
+    items = [{key: value for key, value in row.items() if key != "score"} for row in rows[:limit]]
+    return SearchPage(items=items, next_cursor=next_cursor)
@@ -0,0 +1,152 @@
+import json
+import logging
+import uuid
+from functools import lru_cache
+from typing import Iterable, Optional
+
+import redis
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.models.listing import Seller, SellerStats
+
+logger = logging.getLogger(__name__)
+
+ALL_ORIGINS = "*"
+STAGING_TTL_SECONDS = 60 * 60
+MEMBER_WIDTH = 12
+
+
+def _member(seller_id: int) -> str:
+    # Zero-padded so Redis' lexicographic tie-break on equal scores is seller_id ascending.
+    return f"{seller_id:0{MEMBER_WIDTH}d}"
+
+
+def _rank_score(reliability_score: Optional[float]) -> float:
+    # Ascending ZRANGE over the negated score matches the database order: best first, nulls last.
+    return float("inf") if reliability_score is None else -reliability_score
+
+
+def seller_stats_entry(stat: SellerStats, seller: Optional[Seller]) -> dict:
+    return {
+        "seller_id": stat.seller_id,
+        "origin": seller.origin if seller else "",
+        "reputation_medal": seller.reputation_medal if seller else None,
+        "reputation_score": seller.reputation_score if seller else None,
+        "cancellations": seller.cancellations if seller else None,
+        "response_time_hours": seller.response_time_hours if seller else None,
+        "completed_sales": seller.completed_sales if seller else stat.completed_sales,
+        "average_price_brl": stat.average_price_brl,
+        "listings_count": stat.listings_count,
+        "problem_rate": stat.problem_rate,
+        "reliability_score": stat.reliability_score,
+    }
+
+
+class SellerLeaderboard:
+    """Per-origin sorted sets of reliability scores plus a hash of serialized rows.
+
+    Rankings follow `top_trusted_sellers`: reliability descending with nulls last, then
+    seller_id ascending.
+
+    Incremental `publish` calls only carry sellers whose stats changed, so the cache is trusted
+    only after a `rebuild` has loaded every seller and set the complete marker; until then `top`
+    sends callers to the database.
+    """
+
+    def __init__(self, client: redis.Redis, prefix: str = "leaderboard:sellers:v2") -> None:
+        self.client = client
+        self.prefix = prefix
+        self.entries_key = f"{prefix}:entries"
+        self.origins_key = f"{prefix}:origins"
+        self.complete_key = f"{prefix}:complete"
+
+    def _ranking_key(self, origin: Optional[str], prefix: Optional[str] = None) -> str:
+        return f"{prefix or self.prefix}:rank:{origin or ALL_ORIGINS}"
+
+    def _write(self, pipe, entries: Iterable[dict], prefix: str) -> set[str]:
+        origins: set[str] = set()
+        for entry in entries:
+            member = _member(entry["seller_id"])
+            score = _rank_score(entry["reliability_score"])
+            pipe.hset(f"{prefix}:entries", member, json.dumps(entry))
+            pipe.zadd(self._ranking_key(None, prefix), {member: score})
+            if entry["origin"]:
+                pipe.zadd(self._ranking_key(entry["origin"], prefix), {member: score})
+                origins.add(entry["origin"])
+        if origins:
+            pipe.sadd(f"{prefix}:origins", *origins)
+        return origins
+
+    def publish(self, entries: Iterable[dict]) -> None:
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            self._write(pipe, entries, self.prefix)
+            pipe.execute()
+        except redis.RedisError as exc:
+            logger.warning("Seller leaderboard publish failed: %s", exc)
+
+    def top(self, limit: int, origin: Optional[str] = None) -> Optional[list[dict]]:
+        """Return the cached ranking, or None when it is incomplete and the caller should read the DB."""
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            pipe.exists(self.complete_key)
+            pipe.zrange(self._ranking_key(origin), 0, limit - 1)
+            complete, members = pipe.execute()
+            if not complete:
+                return None
+            if not members:
+                return []
+            rows = self.client.hmget(self.entries_key, members)
+        except redis.RedisError as exc:
+            logger.warning("Seller leaderboard read failed: %s", exc)
+            return None
+        if any(row is None for row in rows):
+            return None
+        return [json.loads(row) for row in rows]
+
+    def rebuild(self, db: Session) -> int:
+        """Load every seller into staging keys, then swap them in with RENAME in one transaction."""
+        from .seller_stats import top_trusted_sellers
+
+        stats = top_trusted_sellers(db, limit=None)
+        staging = f"{self.prefix}:build:{uuid.uuid4().hex}"
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            origins = self._write(pipe, (seller_stats_entry(stat, stat.seller) for stat in stats), staging)
+            renames = {}
+            if stats:
+                renames[f"{staging}:entries"] = self.entries_key
+                renames[self._ranking_key(None, staging)] = self._ranking_key(None)
+            if origins:
+                renames[f"{staging}:origins"] = self.origins_key
+            for origin in origins:
+                renames[self._ranking_key(origin, staging)] = self._ranking_key(origin)
+            # Staging keys left behind by a failed rebuild expire on their own.
+            for key in renames:
+                pipe.expire(key, STAGING_TTL_SECONDS)
+            pipe.execute()
+            previous = self.client.smembers(self.origins_key)
+
+            swap = self.client.pipeline(transaction=True)
+            swap.delete(
+                self.entries_key,
+                self.origins_key,
+                self._ranking_key(None),
+                *(self._ranking_key(origin) for origin in previous),
+            )
+            for source, target in renames.items():
+                swap.rename(source, target)
+                swap.persist(target)
+            swap.set(self.complete_key, 1)
+            swap.execute()
+        except redis.RedisError as exc:
+            logger.warning("Seller leaderboard rebuild failed: %s", exc)
+            return 0
+        return len(stats)
+
+
+@lru_cache
+def get_seller_leaderboard() -> SellerLeaderboard:
+    settings = get_settings()
+    return SellerLeaderboard(redis.Redis.from_url(settings.redis_url, decode_responses=True))
@@ -1,11 +1,14 @@
+import datetime as dt
 from statistics import mean
 from typing import Iterable, Optional
 
 from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, contains_eager
 
 from app.models.listing import NormalizedListing, Seller, SellerStats
 
+from .seller_leaderboard import SellerLeaderboard, seller_stats_entry
+
 
 def _compute_reliability_score(stats: SellerStats, seller: Seller) -> float:
     base = seller.reputation_score or 0
@@ -19,7 +22,8 @@ def _compute_reliability_score(stats: SellerStats, seller: Seller) -> float:
     return max(0.0, min(1.0, base + medal_bonus + activity_bonus - penalty))
 
 
-def consolidate_seller_stats(db: Session) -> None:
+def consolidate_seller_stats(db: Session, leaderboard: Optional[SellerLeaderboard] = None) -> None:
+    changed: list[dict] = []
     sellers: Iterable[Seller] = db.execute(select(Seller)).scalars().all()
     for seller in sellers:
         listings = db.execute(
@@ -40,6 +44,14 @@ def consolidate_seller_stats(db: Session) -> None:
         if not stats:
             stats = SellerStats(seller_id=seller.id)
             db.add(stats)
+        previous = seller_stats_entry(stats, seller) if stats.id is not None else None
+        # Normalization writes the seller's own columns (medal, score, response time) before this
+        # runs, so `previous` already carries them; a seller row newer than its stats gives it away.
+        seller_changed = (
+            stats.updated_at is not None
+            and seller.updated_at is not None
+            and seller.updated_at > stats.updated_at
+        )
 
         stats.listings_count = len(listings)
         stats.average_price_brl = mean(price_points) if price_points else None
@@ -48,11 +60,24 @@ def consolidate_seller_stats(db: Session) -> None:
             (seller.completed_sales or 1), 1
         )
         stats.reliability_score = _compute_reliability_score(stats, seller)
+        entry = seller_stats_entry(stats, seller)
+        if entry != previous or seller_changed:
+            stats.updated_at = dt.datetime.utcnow()
+            changed.append(entry)
     db.commit()
+    if leaderboard is not None and changed:
+        leaderboard.publish(changed)
 
 
-def top_trusted_sellers(db: Session, limit: int = 10, origin: Optional[str] = None):
-    stmt = select(SellerStats).order_by(SellerStats.reliability_score.desc()).limit(limit)
+def top_trusted_sellers(db: Session, limit: Optional[int] = 10, origin: Optional[str] = None):
+    stmt = (
+        select(SellerStats)
+        .join(SellerStats.seller)
+        .options(contains_eager(SellerStats.seller))
+        .order_by(SellerStats.reliability_score.desc().nulls_last(), SellerStats.seller_id)
+    )
     if origin:
-        stmt = stmt.join(Seller).where(Seller.origin == origin)
+        stmt = stmt.where(Seller.origin == origin)
+    if limit is not None:
+        stmt = stmt.limit(limit)
     return db.execute(stmt).scalars().all()
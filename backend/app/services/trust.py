@@ -1,4 +1,8 @@
-from typing import Optional
+import datetime as dt
+from typing import TYPE_CHECKING, Optional, Sequence
+
+if TYPE_CHECKING:
+    import numpy as np
 
 
 class TrustSignals:
@@ -31,3 +35,36 @@ def trust_badge(signals: TrustSignals) -> Optional[str]:
     if score >= 2:
         return "Selected by AXIS"
     return None
+
+
+# Batch versions take column arrays (None or NaN for unknown values) and give the same badge as
+# `trust_badge` would for each row. NumPy is imported inside them to keep it off API startup.
+
+
+def listing_ages_hours(created_at: Sequence[Optional[dt.datetime]], now: dt.datetime) -> "np.ndarray":
+    """Whole hours since each listing was first stored; NaN when the timestamp is unknown."""
+    import numpy as np
+
+    stamps = np.array(created_at, dtype="datetime64[us]")
+    return np.floor((np.datetime64(now, "us") - stamps) / np.timedelta64(1, "h"))
+
+
+def trust_badges(
+    seller_types: Sequence[Optional[str]],
+    has_photos: Sequence[bool],
+    price_deviations: Optional[Sequence[Optional[float]]] = None,
+    listing_ages_hours: Optional[Sequence[Optional[float]]] = None,
+) -> "np.ndarray":
+    import numpy as np
+
+    seller_types = np.asarray(seller_types, dtype=object)
+    score = np.where(seller_types == "dealer", 2, 0) + np.asarray(has_photos, dtype=bool)
+    if price_deviations is not None:
+        score += np.asarray(price_deviations, dtype=np.float64) < -0.2
+    if listing_ages_hours is not None:
+        score -= np.asarray(listing_ages_hours, dtype=np.float64) < 6
+
+    badges = np.full(len(seller_types), None, dtype=object)
+    badges[score >= 2] = "Selected by AXIS"
+    badges[score >= 3] = "Verified listing"
+    return badges
@@ -0,0 +1,279 @@
+import datetime as dt
+import math
+import re
+import statistics
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.models.listing import LISTING_STATUS_ACTIVE, DepreciationModel, NormalizedListing
+
+from .normalization import normalize_brand
+
+ANY = "*"
+MILEAGE_UNIT_KM = 10_000
+YEAR_BAND = 2
+MILEAGE_BAND_KM = 30_000
+NEAREST_COMPARABLES = 5
+MILEAGE_DISTANCE_KM = 20_000.0
+RIDGE = 1e-3
+MIN_SPREAD = 0.04
+MAX_SPREAD = 0.15
+DEFAULT_SPREAD = 0.05
+
+YEAR_PATTERN = re.compile(r"\b(19[5-9]\d|20\d{2})\b")
+
+
+@dataclass
+class ValuationQuery:
+    brand: Optional[str]
+    model: Optional[str]
+    year: Optional[int]
+    mileage_km: Optional[int]
+    region: Optional[str]
+
+
+@dataclass
+class Valuation:
+    price: float
+    min_price: float
+    max_price: float
+    comparables: int
+    segment: Optional[tuple[str, str, str]]
+
+
+@dataclass(frozen=True)
+class SegmentModel:
+    reference_year: int
+    intercept: float
+    year_coef: float
+    mileage_coef: float
+    residual_std: float
+    sample_size: int
+
+    def predict(self, year: int, mileage_km: Optional[int]) -> float:
+        mileage_units = (mileage_km or 0) / MILEAGE_UNIT_KM
+        return math.exp(self.intercept + self.year_coef * (year - self.reference_year) + self.mileage_coef * mileage_units)
+
+    def adjust(self, price: float, from_year: int, from_mileage: int, to_year: int, to_mileage: int) -> float:
+        """Move a comparable's price to the target car's year and mileage along the fitted curve."""
+        delta = self.year_coef * (to_year - from_year) + self.mileage_coef * (to_mileage - from_mileage) / MILEAGE_UNIT_KM
+        return price * math.exp(delta)
+
+
+def _model_key(model: Optional[str]) -> Optional[str]:
+    return model.lower() if model else model
+
+
+def parse_vehicle_description(description: str) -> tuple[Optional[str], Optional[str], Optional[int]]:
+    year_match = YEAR_PATTERN.search(description or "")
+    tokens = [token for token in re.split(r"[\s,;/]+", description or "") if token and not YEAR_PATTERN.fullmatch(token)]
+    brand = normalize_brand(tokens[0]) if tokens else None
+    model = tokens[1] if len(tokens) > 1 else None
+    return brand, model, int(year_match.group(0)) if year_match else None
+
+
+def fit_depreciation_models(db: Session, min_samples: Optional[int] = None, reference_year: Optional[int] = None) -> int:
+    """Fit log(price) ~ age + mileage for every segment with closed-form batched least squares."""
+    # Only the nightly refit needs NumPy; keeping it out of module scope keeps it off API startup.
+    import numpy as np
+
+    min_samples = min_samples or get_settings().valuation_min_samples
+    reference_year = reference_year or dt.date.today().year
+    rows = db.execute(
+        select(
+            NormalizedListing.state,
+            NormalizedListing.brand,
+            NormalizedListing.model,
+            NormalizedListing.year,
+            NormalizedListing.mileage_km,
+            NormalizedListing.price_brl,
+        ).where(
+            NormalizedListing.status == LISTING_STATUS_ACTIVE,
+            NormalizedListing.price_brl > 0,
+            NormalizedListing.year.is_not(None),
+            NormalizedListing.mileage_km.is_not(None),
+        )
+    ).all()
+    if not rows:
+        return 0
+
+    states = np.array([row.state or ANY for row in rows], dtype=object)
+    brands = np.array([row.brand for row in rows], dtype=object)
+    # Marketplaces spell models differently ("HR-V", "Hr-V"); segments are keyed case-insensitively.
+    models = np.array([_model_key(row.model) for row in rows], dtype=object)
+    features = np.column_stack(
+        [
+            np.ones(len(rows)),
+            np.array([row.year for row in rows], dtype=float) - reference_year,
+            np.array([row.mileage_km for row in rows], dtype=float) / MILEAGE_UNIT_KM,
+        ]
+    )
+    target = np.log(np.array([row.price_brl for row in rows], dtype=float))
+
+    fitted: list[dict] = []
+    now = dt.datetime.utcnow()
+    levels = (
+        (states, brands, models),
+        (np.full(len(rows), ANY, dtype=object), brands, models),
+        (np.full(len(rows), ANY, dtype=object), brands, np.full(len(rows), ANY, dtype=object)),
+    )
+    for region_col, brand_col, model_col in levels:
+        labels = [f"{r}\x1f{b}\x1f{m}" for r, b, m in zip(region_col, brand_col, model_col, strict=True)]
+        segments, groups = np.unique(labels, return_inverse=True)
+        counts = np.bincount(groups, minlength=len(segments))
+
+        gram = np.empty((len(segments), 3, 3))
+        moment = np.empty((len(segments), 3))
+        for i in range(3):
+            moment[:, i] = np.bincount(groups, weights=features[:, i] * target, minlength=len(segments))
+            for j in range(3):
+                gram[:, i, j] = np.bincount(groups, weights=features[:, i] * features[:, j], minlength=len(segments))
+        gram += np.diag([0.0, RIDGE, RIDGE]) * counts[:, None, None]
+        coefs = np.linalg.solve(gram[counts > 0], moment[counts > 0][..., None])[..., 0]
+        full_coefs = np.zeros((len(segments), 3))
+        full_coefs[counts > 0] = coefs
+
+        residuals = target - np.einsum("ij,ij->i", features, full_coefs[groups])
+        sse = np.bincount(groups, weights=residuals**2, minlength=len(segments))
+        residual_std = np.sqrt(sse / np.maximum(counts - 3, 1))
+
+        for index in np.flatnonzero(counts >= min_samples):
+            region_key, brand, model = segments[index].split("\x1f")
+            fitted.append(
+                {
+                    "region_key": region_key,
+                    "brand": brand,
+                    "model": model,
+                    "reference_year": reference_year,
+                    "intercept": float(full_coefs[index, 0]),
+                    "year_coef": float(full_coefs[index, 1]),
+                    "mileage_coef": float(full_coefs[index, 2]),
+                    "residual_std": float(residual_std[index]),
+                    "sample_size": int(counts[index]),
+                    "updated_at": now,
+                }
+            )
+
+    unique_fits = {(fit["region_key"], fit["brand"], fit["model"]): fit for fit in fitted}
+    db.execute(delete(DepreciationModel))
+    if unique_fits:
+        db.execute(insert(DepreciationModel), list(unique_fits.values()))
+    db.commit()
+    get_model_cache().invalidate()
+    return len(unique_fits)
+
+
+class DepreciationModelCache:
+    """Process-local copy of depreciation_models so a lookup never touches the database."""
+
+    def __init__(self, ttl_seconds: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._models: dict[tuple[str, str, str], SegmentModel] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        self._loaded_at = None
+
+    def _ensure_loaded(self, db: Session) -> None:
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl_seconds:
+            return
+        with self._lock:
+            if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl_seconds:
+                return
+            self._models = {
+                (row.region_key, row.brand, _model_key(row.model)): SegmentModel(
+                    reference_year=row.reference_year,
+                    intercept=row.intercept,
+                    year_coef=row.year_coef,
+                    mileage_coef=row.mileage_coef,
+                    residual_std=row.residual_std,
+                    sample_size=row.sample_size,
+                )
+                for row in db.execute(select(DepreciationModel)).scalars()
+            }
+            self._loaded_at = time.monotonic()
+
+    def lookup(
+        self, db: Session, region: Optional[str], brand: str, model: Optional[str]
+    ) -> tuple[Optional[tuple[str, str, str]], Optional[SegmentModel]]:
+        self._ensure_loaded(db)
+        model = _model_key(model) or ANY
+        for key in ((region or ANY, brand, model), (ANY, brand, model), (ANY, brand, ANY)):
+            found = self._models.get(key)
+            if found:
+                return key, found
+        return None, None
+
+
+_model_cache: Optional[DepreciationModelCache] = None
+
+
+def get_model_cache() -> DepreciationModelCache:
+    global _model_cache
+    if _model_cache is None:
+        _model_cache = DepreciationModelCache(get_settings().valuation_cache_seconds)
+    return _model_cache
+
+
+def _nearest_comparables(db: Session, query: ValuationQuery, segment_model: Optional[SegmentModel]) -> list[float]:
+    stmt = select(NormalizedListing.price_brl, NormalizedListing.year, NormalizedListing.mileage_km).where(
+        NormalizedListing.status == LISTING_STATUS_ACTIVE,
+        NormalizedListing.brand == query.brand,
+        NormalizedListing.price_brl > 0,
+        NormalizedListing.year.between(query.year - YEAR_BAND, query.year + YEAR_BAND),
+    )
+    if query.model:
+        stmt = stmt.where(func.lower(NormalizedListing.model) == _model_key(query.model))
+    if query.region:
+        stmt = stmt.where(NormalizedListing.state == query.region)
+    if query.mileage_km is not None:
+        stmt = stmt.where(
+            NormalizedListing.mileage_km.between(query.mileage_km - MILEAGE_BAND_KM, query.mileage_km + MILEAGE_BAND_KM)
+        )
+    target_mileage = query.mileage_km or 0
+    # Rank in SQL so the limit keeps the closest rows, not whichever ones the planner reads first.
+    distance = func.abs(NormalizedListing.year - query.year) + func.abs(
+        func.coalesce(NormalizedListing.mileage_km, target_mileage) - target_mileage
+    ) / MILEAGE_DISTANCE_KM
+    nearest = db.execute(
+        stmt.order_by(distance, NormalizedListing.id).limit(NEAREST_COMPARABLES)
+    ).all()
+    if segment_model is None:
+        return [row.price_brl for row in nearest]
+    return [
+        segment_model.adjust(row.price_brl, row.year, row.mileage_km or target_mileage, query.year, target_mileage)
+        for row in nearest
+    ]
+
+
+def estimate_sale_price(db: Session, query: ValuationQuery) -> Optional[Valuation]:
+    if not query.brand or not query.year:
+        return None
+    segment, segment_model = get_model_cache().lookup(db, query.region, query.brand, query.model)
+    comparables = _nearest_comparables(db, query, segment_model)
+    if segment_model is None and not comparables:
+        return None
+
+    if segment_model is None:
+        price = statistics.median(comparables)
+        spread = DEFAULT_SPREAD
+    else:
+        model_price = segment_model.predict(query.year, query.mileage_km)
+        weight = len(comparables) / (len(comparables) + 3)
+        price = weight * statistics.median(comparables) + (1 - weight) * model_price if comparables else model_price
+        spread = min(max(segment_model.residual_std, MIN_SPREAD), MAX_SPREAD)
+
+    return Valuation(
+        price=round(price, 2),
+        min_price=round(price * math.exp(-spread), 2),
+        max_price=round(price * math.exp(spread), 2),
+        comparables=len(comparables),
+        segment=segment,
+    )
@@ -0,0 +1,140 @@
+from prometheus_client import REGISTRY
+
+from app.services.ai_cache import (
+    CachedProvider,
+    InMemoryResponseCache,
+    RedisResponseCache,
+    message_fingerprint,
+)
+from app.services.ai_provider import AIProvider
+
+
+class CountingProvider(AIProvider):
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def chat(self, messages):
+        self.calls += 1
+        return f"resposta {self.calls}"
+
+
+class OtherProvider(CountingProvider):
+    pass
+
+
+def _lookups(result: str) -> float:
+    return REGISTRY.get_sample_value("axis_ai_cache_lookups_total", {"result": result}) or 0.0
+
+
+def _messages(query: str):
+    return [
+        {"role": "system", "content": "Você é o Axis Bot, um concierge automotivo."},
+        {"role": "user", "content": query},
+    ]
+
+
+def test_cached_provider_serves_repeated_prompts_from_cache():
+    provider = CountingProvider()
+    cached = CachedProvider(provider, InMemoryResponseCache(ttl_seconds=60, max_entries=10))
+    hits, misses = _lookups("hit"), _lookups("miss")
+
+    first = cached.chat(_messages("SUV até 100 mil em SP"))
+    second = cached.chat(_messages("SUV até 100 mil em SP"))
+
+    assert first == second
+    assert provider.calls == 1
+    assert (_lookups("hit") - hits, _lookups("miss") - misses) == (1, 1)
+
+
+def test_cache_keys_are_scoped_to_the_provider():
+    cache = InMemoryResponseCache(ttl_seconds=60, max_entries=10)
+    first, second = CountingProvider(), OtherProvider()
+
+    CachedProvider(first, cache).chat(_messages("SUV até 100 mil em SP"))
+    CachedProvider(second, cache).chat(_messages("SUV até 100 mil em SP"))
+
+    assert (first.calls, second.calls) == (1, 1)
+
+
+def test_fuzzy_fingerprint_ignores_accents_case_and_spacing():
+    strict_a = message_fingerprint(_messages("SUV até 100 mil em SP"))
+    strict_b = message_fingerprint(_messages("  suv ate   100 mil em sp"))
+    fuzzy_a = message_fingerprint(_messages("SUV até 100 mil em SP"), fuzzy=True)
+    fuzzy_b = message_fingerprint(_messages("  suv ate   100 mil em sp"), fuzzy=True)
+
+    assert strict_a != strict_b
+    assert fuzzy_a == fuzzy_b
+
+
+def test_in_memory_cache_expires_and_evicts_least_recent():
+    now = [0.0]
+    cache = InMemoryResponseCache(ttl_seconds=10, max_entries=2, clock=lambda: now[0])
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert cache.get("a") == "1"
+    cache.set("c", "3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+
+    now[0] = 11
+    assert cache.get("a") is None
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.values = {}
+        self.index = {}
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def zpopmin(self, key, count):
+        popped = sorted(self.index.items(), key=lambda item: item[1])[:count]
+        for member, _ in popped:
+            del self.index[member]
+        return popped
+
+    def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+
+
+class FakePipeline:
+    def __init__(self, client: FakeRedis) -> None:
+        self.client = client
+        self.results = []
+
+    def set(self, key, value, ex=None):
+        self.client.values[key] = value
+        self.results.append(True)
+
+    def zremrangebyscore(self, key, low, high):
+        expired = [member for member, score in self.client.index.items() if score <= high]
+        for member in expired:
+            del self.client.index[member]
+        self.results.append(len(expired))
+
+    def zadd(self, key, mapping):
+        self.client.index.update(mapping)
+        self.results.append(len(mapping))
+
+    def zcard(self, key):
+        self.results.append(len(self.client.index))
+
+    def execute(self):
+        return self.results
+
+
+def test_redis_cache_trims_expired_index_members():
+    client = FakeRedis()
+    client.index = {"stale": 0.0}
+    cache = RedisResponseCache(client, ttl_seconds=60, max_entries=2)
+
+    cache.set("fresh", "1")
+
+    assert list(client.index) == ["fresh"]
+    assert cache.get("fresh") == "1"
@@ -0,0 +1,60 @@
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+from app.db.base import Base
+from app.models.listing import Alert, AlertMatch, NormalizedListing
+from app.models.user import User
+from app.services.alerts import AlertIndex, match_new_listings
+
+
+def _listing(external_id: str, **overrides) -> NormalizedListing:
+    fields = {
+        "source_id": 1,
+        "external_id": external_id,
+        "brand": "Honda",
+        "model": "Civic",
+        "year": 2020,
+        "mileage_km": 40000,
+        "final_price_brl": 110000,
+        "state": "SP",
+    }
+    fields.update(overrides)
+    return NormalizedListing(**fields)
+
+
+def _alert(alert_id: int, region_key: str = "SP", **query) -> Alert:
+    return Alert(id=alert_id, user_id=1, region_key=region_key, query_json=query, active=True)
+
+
+def test_index_matches_exact_and_wildcard_segments_with_predicates():
+    index = AlertIndex(
+        [
+            _alert(1, brand="honda", model="civic", max_price=120000),
+            _alert(2, brand="Honda", max_price=100000),
+            _alert(3, region_key="*", min_year=2019),
+            _alert(4, region_key="RJ", brand="Honda"),
+            _alert(5, brand="Toyota"),
+            _alert(6, max_mileage_km=50000),
+        ]
+    )
+
+    assert sorted(index.match(_listing("1"))) == [1, 3, 6]
+    assert index.match(_listing("2", year=None, mileage_km=None, state="MG")) == []
+
+
+def test_match_new_listings_queues_each_pair_once():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.add(User(id=1, email="buyer@example.com", hashed_password="x"))
+        inactive = Alert(id=3, user_id=1, region_key="SP", query_json={}, active=False)
+        db.add_all([_alert(1, brand="Honda"), _alert(2, region_key="*", max_price=90000), inactive])
+        listings = [_listing("1"), _listing("2", final_price_brl=85000), _listing("3", brand="Fiat", model="Argo")]
+        db.add_all(listings)
+        db.flush()
+
+        index = AlertIndex.load(db)
+        assert index.size == 2
+        assert match_new_listings(db, listings, index=index) == 3
+        assert match_new_listings(db, listings, index=index) == 0
+        assert db.scalar(select(func.count()).select_from(AlertMatch)) == 3
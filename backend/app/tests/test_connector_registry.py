@@ -0,0 +1,62 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from app.connectors.example_marketplace import ExampleMarketplaceConnector
+from app.connectors.olx import OLXConnector, build_search_url
+from app.connectors.registry import ConnectorConfig, get_connector_config
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+
+class _Recorder:
+    def __init__(self, region_key: str, limit: int = 30) -> None:
+        self.region_key = region_key
+        self.limit = limit
+
+
+def test_factory_drops_keyword_arguments_the_connector_does_not_take():
+    config = ConnectorConfig(base_url="https://example.com", factory_path=f"{__name__}:_Recorder")
+
+    connector = config.factory(region_key="SP", query_text="suv", limit=5, page_store=None)
+
+    assert (connector.region_key, connector.limit) == ("SP", 5)
+
+
+def test_factory_refuses_to_drop_a_page_store():
+    config = ConnectorConfig(base_url="https://example.com", factory_path=f"{__name__}:_Recorder")
+
+    with pytest.raises(TypeError):
+        config.factory(region_key="SP", page_store=object())
+
+
+def test_olx_builds_the_fetching_connector_with_its_page_store():
+    page_store = object()
+    connector = get_connector_config("olx").factory(
+        region_key="SP", query_text="civic", limit=5, page_store=page_store
+    )
+
+    assert isinstance(connector, OLXConnector)
+    assert (connector.page_store, connector.limit) == (page_store, 5)
+    assert build_search_url("SP", "civic", 2).endswith("/estado-sp?q=civic&o=2")
+
+
+def test_unknown_source_falls_back_to_example_connector():
+    connector = get_connector_config("unknown").factory(region_key="SP", page_store=None)
+
+    assert isinstance(connector, ExampleMarketplaceConnector)
+
+
+def test_loading_registry_does_not_import_connectors():
+    script = (
+        "import sys; from app.connectors.registry import get_connector_config; "
+        "get_connector_config('olx'); "
+        "print(any(name.startswith(('app.connectors.olx', 'app.connectors.mercadolivre')) for name in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+
+    assert result.stdout.strip() == "False"
@@ -0,0 +1,85 @@
+import datetime as dt
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from app.db.base import Base
+from app.models.listing import (
+    LISTING_STATUS_ACTIVE,
+    LISTING_STATUS_INACTIVE,
+    ListingSource,
+    NormalizedListing,
+)
+from app.services.crawl_runs import (
+    finish_crawl_run,
+    mark_listings_seen,
+    start_crawl_run,
+    sweep_unseen_listings,
+)
+
+
+def _crawl(db: Session, source_id: int, seen: list[str], region_key: str = "SP"):
+    run = start_crawl_run(db, source_id, region_key=region_key, query_text="carros")
+    for external_id in seen:
+        listing = db.execute(select(NormalizedListing).where(NormalizedListing.external_id == external_id)).scalars().first()
+        if listing is None:
+            listing = NormalizedListing(source_id=source_id, external_id=external_id, brand="Fiat", model="Argo")
+            db.add(listing)
+        listing.last_seen_run_id = run.id
+    finish_crawl_run(run, len(seen))
+    db.flush()
+    return run
+
+
+def test_sweep_deactivates_listings_missing_from_last_k_runs():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.add(ListingSource(id=1, name="olx", base_url="https://www.olx.com.br"))
+        db.flush()
+
+        _crawl(db, 1, ["sold", "kept", "flaky"])
+        _crawl(db, 1, ["kept"])
+        run = _crawl(db, 1, ["kept", "flaky"])
+        _crawl(db, 1, ["other-region"], region_key="RJ")
+
+        assert sweep_unseen_listings(db, run, missed_runs=3) == []
+        assert [state for _, state in sweep_unseen_listings(db, run, missed_runs=2)] == [None]
+        statuses = {row.external_id: row.status for row in db.execute(select(NormalizedListing)).scalars()}
+
+    assert statuses == {
+        "sold": LISTING_STATUS_INACTIVE,
+        "kept": LISTING_STATUS_ACTIVE,
+        "flaky": LISTING_STATUS_ACTIVE,
+        "other-region": LISTING_STATUS_ACTIVE,
+    }
+
+
+def test_mark_listings_seen_stamps_existing_rows_of_the_run_source_only():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    edited = dt.datetime(2024, 1, 1)
+    with Session(engine) as db:
+        db.add_all(
+            [
+                ListingSource(id=1, name="olx", base_url="https://www.olx.com.br"),
+                ListingSource(id=2, name="webmotors", base_url="https://www.webmotors.com.br"),
+            ]
+        )
+        db.add_all(
+            [
+                NormalizedListing(source_id=1, external_id="a", brand="Fiat", model="Argo", updated_at=edited),
+                NormalizedListing(source_id=2, external_id="a", brand="Fiat", model="Argo", updated_at=edited),
+            ]
+        )
+        db.flush()
+
+        run = start_crawl_run(db, 1, region_key="SP", query_text="carros")
+        assert mark_listings_seen(db, run, ["a", "a", "not-normalized-yet"]) == 1
+        rows = {row.source_id: row for row in db.execute(select(NormalizedListing)).scalars()}
+        db.expire_all()
+
+        assert rows[1].last_seen_run_id == run.id
+        assert rows[1].last_seen_at is not None
+        assert rows[1].updated_at == edited
+        assert rows[2].last_seen_run_id is None
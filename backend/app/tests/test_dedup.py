@@ -0,0 +1,117 @@
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+from app.db.base import Base
+from app.models.listing import LISTING_STATUS_INACTIVE, ListingLshBucket, NormalizedListing
+from app.services.dedup import (
+    BANDS,
+    assign_duplicate_cluster,
+    estimated_similarity,
+    listing_shingles,
+    minhash_signature,
+    reelect_canonicals,
+)
+
+
+def _listing(external_id: str, **overrides) -> NormalizedListing:
+    fields = {
+        "source_id": 1,
+        "external_id": external_id,
+        "brand": "Honda",
+        "model": "Civic",
+        "year": 2019,
+        "mileage_km": 45000,
+        "price_brl": 89000,
+        "city": "São Paulo",
+        "state": "SP",
+        "photos": ["https://images.olx.com/civic-1.jpg", "https://images.olx.com/civic-2.jpg"],
+    }
+    fields.update(overrides)
+    return NormalizedListing(**fields)
+
+
+def _add(db: Session, listing: NormalizedListing, title: str) -> NormalizedListing:
+    db.add(listing)
+    db.flush()
+    assign_duplicate_cluster(db, listing, title=title)
+    return listing
+
+
+def test_minhash_similarity_tracks_shingle_overlap():
+    base = listing_shingles({"brand": "Honda", "model": "Civic", "title": "Honda Civic 2019 EX completo"})
+    same = minhash_signature(base)
+
+    assert estimated_similarity(same, minhash_signature(set(base))) == 1.0
+    assert estimated_similarity(same, minhash_signature({"brand:fiat", "model:uno"})) < 0.2
+
+
+def test_cross_marketplace_copies_share_a_canonical_listing():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        original = _add(db, _listing("IDOLX123"), "Honda Civic 2019 EX completo único dono")
+        copy = _add(
+            db,
+            _listing(
+                "MLB111",
+                source_id=2,
+                price_brl=89500,
+                city="Sao Paulo",
+                photos=["https://http2.mlstatic.com/civic-1.jpg", "https://http2.mlstatic.com/civic-2.jpg"],
+            ),
+            "Honda Civic 2019 EX completo único dono",
+        )
+        other = _add(db, _listing("IDOLX999", model="City", price_brl=60000, year=2015), "Honda City 2015 LX")
+        db.commit()
+
+        assert original.canonical_listing_id is None
+        assert copy.canonical_listing_id == original.id
+        assert other.canonical_listing_id is None
+        buckets = db.execute(select(func.count()).select_from(ListingLshBucket)).scalar_one()
+        assert buckets == 3 * BANDS
+
+
+def test_refingerprinting_replaces_buckets():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        listing = _add(db, _listing("IDOLX123"), "Honda Civic")
+        assign_duplicate_cluster(db, listing, title="Honda Civic")
+        db.commit()
+
+        count = db.execute(select(func.count()).select_from(ListingLshBucket)).scalar_one()
+        assert count == BANDS
+
+
+def test_renormalizing_a_canonical_listing_keeps_its_cluster():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        original = _add(db, _listing("IDOLX123"), "Honda Civic 2019 EX completo único dono")
+        copy = _add(db, _listing("MLB111", source_id=2), "Honda Civic 2019 EX completo único dono")
+        db.flush()
+
+        assert assign_duplicate_cluster(db, original, title="Honda Civic 2019 EX completo único dono") is None
+        assert assign_duplicate_cluster(db, copy, title="Honda Civic 2019 EX completo único dono") == original.id
+
+
+def test_sweeping_the_canonical_listing_promotes_an_active_copy():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        title = "Honda Civic 2019 EX completo único dono"
+        original = _add(db, _listing("IDOLX123"), title)
+        first_copy = _add(db, _listing("MLB111", source_id=2), title)
+        second_copy = _add(db, _listing("WM555", source_id=3), title)
+        original.status = LISTING_STATUS_INACTIVE
+        db.flush()
+
+        assert reelect_canonicals(db) == [first_copy.id]
+        db.expire_all()
+        assert first_copy.canonical_listing_id is None
+        assert second_copy.canonical_listing_id == first_copy.id
+        assert original.canonical_listing_id == first_copy.id
+        assert reelect_canonicals(db) == []
+
+        relisted = _add(db, _listing("IDOLX124"), title)
+        assert relisted.canonical_listing_id == first_copy.id
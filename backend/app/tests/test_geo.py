@@ -0,0 +1,92 @@
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateIndex
+
+from app.api.serialization import LISTING_OUT_COLUMNS
+from app.db.base import Base
+from app.models.listing import NormalizedListing
+from app.services.geo import (
+    covering_prefixes,
+    encode_geohash,
+    geocode_city,
+    haversine_km,
+    nearby_listings,
+    resolve_coordinates,
+)
+
+
+def _listing(external_id: str, city: str, state: str) -> NormalizedListing:
+    lat, lng = geocode_city(city, state)
+    return NormalizedListing(
+        source_id=1,
+        external_id=external_id,
+        brand="Honda",
+        model="Civic",
+        city=city,
+        state=state,
+        lat=lat,
+        lng=lng,
+        geohash=encode_geohash(lat, lng),
+    )
+
+
+def test_encode_geohash_matches_reference_value():
+    assert encode_geohash(57.64911, 10.40744, precision=11) == "u4pruydqqvj"
+
+
+def test_geocode_city_folds_accents_and_case():
+    assert geocode_city("sao paulo", "sp") == geocode_city("São Paulo", "SP")
+    assert geocode_city("Atlantis", "SP") is None
+    assert resolve_coordinates(-23.0, -46.0, "Campinas", "SP") == (-23.0, -46.0)
+
+
+def test_covering_prefixes_contain_every_point_in_radius():
+    lat, lng = geocode_city("São Paulo", "SP")
+    prefixes = covering_prefixes(lat, lng, 30)
+    assert len(prefixes) <= 16
+    for d_lat, d_lng in ((0.25, 0.0), (-0.25, 0.0), (0.0, 0.29), (0.0, -0.29), (0.18, 0.2)):
+        point = (lat + d_lat, lng + d_lng)
+        if haversine_km(lat, lng, *point) <= 30:
+            assert any(encode_geohash(*point).startswith(prefix) for prefix in prefixes)
+
+
+def test_nearby_listings_are_sorted_and_bounded_by_radius():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.add_all(
+            [
+                _listing("1", "Campinas", "SP"),
+                _listing("2", "São Paulo", "SP"),
+                _listing("3", "Rio de Janeiro", "RJ"),
+                _listing("4", "Guarulhos", "SP"),
+            ]
+        )
+        db.commit()
+
+        lat, lng = geocode_city("São Paulo", "SP")
+        matches = nearby_listings(db, LISTING_OUT_COLUMNS, lat, lng, 100, 10)
+
+    assert [row["city"] for row, _ in matches] == ["São Paulo", "Guarulhos", "Campinas"]
+    distances = [distance for _, distance in matches]
+    assert distances == sorted(distances) and distances[-1] <= 100
+
+
+def test_prefix_search_uses_like_and_a_pattern_ops_index():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, sql, *args: statements.append(sql))
+    with Session(engine) as db:
+        db.add(_listing("1", "São Paulo", "SP"))
+        db.commit()
+        lat, lng = geocode_city("São Paulo", "SP")
+        statements.clear()
+
+        assert len(nearby_listings(db, LISTING_OUT_COLUMNS, lat, lng, 30, 10)) == 1
+
+    # A BETWEEN prefix AND prefix || '~' range only works under byte ordering.
+    assert "normalized_listings.geohash LIKE" in statements[0] and "BETWEEN" not in statements[0]
+    index = next(index for index in NormalizedListing.__table__.indexes if index.name == "ix_normalized_listings_geohash")
+    assert "varchar_pattern_ops" in str(CreateIndex(index).compile(dialect=postgresql.dialect()))
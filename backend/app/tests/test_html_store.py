@@ -0,0 +1,124 @@
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from app.db.base import Base
+from app.models.listing import HtmlPage, ListingPriceHistory, ListingSource, NormalizedListing
+from app.services.html_store import HtmlPackReader, HtmlPackWriter, reparse_stored_pages
+from app.services.price_history import record_price
+from app.services.search_index import search_listings
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def _read_fixture(name: str) -> str:
+    return (FIXTURES / name).read_text(encoding="utf-8")
+
+
+def test_pages_round_trip_through_pack_and_index(tmp_path):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    writer = HtmlPackWriter("olx", root=tmp_path)
+    pages = {
+        "IDOLX123": _read_fixture("olx_detail_IDOLX123.html"),
+        "IDOLX456": _read_fixture("olx_detail_IDOLX456.html"),
+    }
+    for external_id, html in pages.items():
+        writer.put(external_id, f"https://www.olx.com/{external_id}", html)
+
+    with Session(engine) as db:
+        assert writer.flush(db) == 2
+        entries = db.execute(select(HtmlPage).order_by(HtmlPage.id)).scalars().all()
+
+    assert len({entry.pack for entry in entries}) == 1
+    assert sum(entry.length for entry in entries) < sum(len(html) for html in pages.values())
+    with HtmlPackReader(tmp_path / entries[1].pack) as reader:
+        assert reader.read(entries[1].offset, entries[1].length) == pages["IDOLX456"]
+
+
+def test_reparse_updates_listings_from_latest_stored_page(tmp_path):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    writer = HtmlPackWriter("olx", root=tmp_path)
+    writer.put("IDOLX123", "https://www.olx.com/IDOLX123", "<html><body>blocked</body></html>")
+    writer.put(
+        "IDOLX123", "https://www.olx.com/IDOLX123", _read_fixture("olx_detail_IDOLX123.html")
+    )
+    writer.put(
+        "IDOLX999", "https://www.olx.com/IDOLX999", _read_fixture("olx_detail_IDOLX456.html")
+    )
+
+    with Session(engine) as db:
+        db.add(ListingSource(id=1, name="olx", base_url="https://www.olx.com.br"))
+        db.add(
+            NormalizedListing(source_id=1, external_id="IDOLX123", brand="Unknown", model="Unknown")
+        )
+        writer.flush(db)
+        db.commit()
+
+        listing_id = db.execute(select(NormalizedListing.id)).scalar_one()
+        reparsed = reparse_stored_pages(db, "olx", root=tmp_path, max_workers=1)
+        assert (reparsed.listing_ids, reparsed.regions) == ([listing_id], {None, "SP"})
+        listing = db.execute(select(NormalizedListing)).scalars().one()
+        found = search_listings(db, (NormalizedListing.id,), "civic", limit=5)
+
+    assert (listing.brand, listing.model, listing.year, listing.price_brl) == (
+        "Honda",
+        "Civic",
+        2019,
+        89000.0,
+    )
+    assert listing.final_price_brl > listing.price_brl
+    assert listing.geohash is not None
+    assert [item["id"] for item in found.items] == [listing_id]
+
+
+def test_reparse_refuses_sources_without_a_page_parser(tmp_path):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db, pytest.raises(ValueError):
+        reparse_stored_pages(db, "webmotors", root=tmp_path)
+
+
+def test_reparse_records_price_and_clears_coordinates_of_an_unknown_new_city(tmp_path):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    writer = HtmlPackWriter("olx", root=tmp_path)
+    writer.put(
+        "IDOLX456",
+        "https://www.olx.com/IDOLX456",
+        _read_fixture("olx_detail_IDOLX456.html").replace("Campinas", "Cidade Sem Cadastro"),
+    )
+
+    with Session(engine) as db:
+        db.add(ListingSource(id=1, name="olx", base_url="https://www.olx.com.br"))
+        listing = NormalizedListing(
+            source_id=1,
+            external_id="IDOLX456",
+            brand="Toyota",
+            model="Corolla",
+            price_brl=90000,
+            city="Campinas",
+            state="SP",
+            lat=-22.9,
+            lng=-47.06,
+            geohash="6gkzm",
+        )
+        db.add(listing)
+        db.flush()
+        record_price(db, listing, 90000)
+        writer.flush(db)
+        db.commit()
+
+        reparse_stored_pages(db, "olx", root=tmp_path, max_workers=1)
+        listing = db.execute(select(NormalizedListing)).scalars().one()
+        prices = db.execute(
+            select(ListingPriceHistory.price_brl).order_by(ListingPriceHistory.id)
+        ).scalars().all()
+
+    assert listing.city == "Cidade Sem Cadastro"
+    assert (listing.lat, listing.lng, listing.geohash) == (None, None, None)
+    assert prices == [90000, 98500]
+    assert listing.price_trend is not None
@@ -0,0 +1,124 @@
+import asyncio
+import logging
+
+import httpx
+import pytest
+import redis
+from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.api import listings
+from app.api.deps import get_async_db
+from app.core.config import get_settings
+from app.core.instrumentation import (
+    RequestMetrics,
+    _current,
+    install_instrumentation,
+    request_metrics_middleware,
+)
+from app.db.base import Base
+from app.models.listing import NormalizedListing
+
+
+async def _build_app() -> FastAPI:
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+    async with session_factory() as db:
+        db.add(
+            NormalizedListing(
+                source_id=1,
+                external_id="1",
+                brand="Honda",
+                model="Civic",
+                price_brl=90000,
+                photos=[],
+            )
+        )
+        await db.commit()
+
+    async def override_db():
+        async with session_factory() as db:
+            yield db
+
+    install_instrumentation()
+    app = FastAPI()
+    app.include_router(listings.router)
+    app.dependency_overrides[get_async_db] = override_db
+    app.middleware("http")(request_metrics_middleware)
+    return app
+
+
+@pytest.fixture(autouse=True)
+def _no_response_cache(monkeypatch):
+    monkeypatch.setattr(listings, "get_response_cache", lambda: None)
+
+
+async def _get(app: FastAPI, path: str) -> httpx.Response:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.get(path)
+
+
+def test_server_timing_header_breaks_down_request():
+    async def scenario():
+        return await _get(await _build_app(), "/v1/listings/1")
+
+    response = asyncio.run(scenario())
+
+    assert response.status_code == 200
+    timing = response.headers["Server-Timing"]
+    assert timing.startswith("total;dur=")
+    assert "db;dur=" in timing and '"1 queries"' in timing
+    assert "serialization;dur=" in timing
+
+
+def test_slow_request_log_includes_slowest_sql(monkeypatch, caplog):
+    monkeypatch.setattr(get_settings(), "slow_request_ms", 0)
+
+    async def scenario():
+        return await _get(await _build_app(), "/v1/listings/1")
+
+    with caplog.at_level(logging.INFO, logger="app.requests"):
+        asyncio.run(scenario())
+
+    record = next(r for r in caplog.records if r.levelno == logging.WARNING)
+    assert record.request_metrics["route"] == "/v1/listings/{listing_id}"
+    assert record.request_metrics["db_queries"] == 1
+    assert record.request_metrics["slowest_sql"][0]["sql"].startswith("SELECT normalized_listings.")
+
+
+def test_sampling_skips_header(monkeypatch):
+    monkeypatch.setattr(get_settings(), "request_metrics_sample_rate", 0.0)
+
+    async def scenario():
+        return await _get(await _build_app(), "/v1/listings/1")
+
+    assert "Server-Timing" not in asyncio.run(scenario()).headers
+
+
+def test_slowest_statements_are_bounded():
+    metrics = RequestMetrics(slow_statements=2)
+    for elapsed, sql in [(1.0, "a"), (5.0, "b"), (3.0, "c"), (0.5, "d")]:
+        metrics.add_query(sql, elapsed)
+
+    assert metrics.db_queries == 4
+    assert metrics.durations_ms["db"] == pytest.approx(9.5)
+    assert [entry["sql"] for entry in metrics.slowest()] == ["b", "c"]
+
+
+def test_redis_commands_are_timed_even_when_they_fail():
+    install_instrumentation()
+    client = redis.Redis(host="127.0.0.1", port=1, socket_connect_timeout=0.2)
+    metrics = RequestMetrics()
+    token = _current.set(metrics)
+    try:
+        with pytest.raises(redis.ConnectionError):
+            client.get("key")
+    finally:
+        _current.reset(token)
+
+    assert metrics.redis_commands == 1
+    assert metrics.durations_ms["redis"] > 0
@@ -1,6 +1,6 @@
 from app.connectors.example_marketplace import ExampleMarketplaceConnector
 from app.connectors.mercadolivre import MercadoLivreConnector
-from app.connectors.olx import OlxConnector
+from app.connectors.olx import OLXConnector
 from app.workers import jobs
 
 
@@ -17,7 +17,7 @@ def test_connector_registry_returns_olx():
     connector = config.factory()
 
     assert config.base_url == "https://www.olx.com.br"
-    assert isinstance(connector, OlxConnector)
+    assert isinstance(connector, OLXConnector)
 
 
 def test_connector_registry_falls_back_to_example():
@@ -2,41 +2,48 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import Session
 
 from app.db.base import Base
-from app.models.listing import NormalizedListing
+from app.models.listing import LISTING_STATUS_INACTIVE, NormalizedListing, Seller, SellerStats
 from app.services.listing_selection import select_cheapest_with_reputation
 
 
-def test_select_listing_filters_by_reputation_and_price():
+def _session() -> Session:
     engine = create_engine("sqlite:///:memory:")
     Base.metadata.create_all(engine)
+    return Session(engine)
 
-    with Session(engine) as db:
+
+def _seller(db: Session, external_id: str, reliability: float) -> Seller:
+    seller = Seller(origin="olx", external_id=external_id)
+    db.add(seller)
+    db.flush()
+    db.add(SellerStats(seller_id=seller.id, reliability_score=reliability))
+    return seller
+
+
+def _listing(external_id: str, price: float, seller: Seller, **overrides) -> NormalizedListing:
+    fields = dict(
+        source_id=1,
+        external_id=external_id,
+        brand="Honda",
+        model="Civic",
+        price_brl=price,
+        seller_id=seller.id,
+    )
+    fields.update(overrides)
+    return NormalizedListing(**fields)
+
+
+def test_select_listing_filters_by_seller_reliability_and_price():
+    with _session() as db:
+        shaky, good, better = _seller(db, "s1", 0.6), _seller(db, "s2", 0.85), _seller(db, "s3", 0.9)
         db.add_all(
             [
-                NormalizedListing(
-                    source_id=1,
-                    external_id="1",
-                    brand="Honda",
-                    model="Civic",
-                    price_brl=90000,
-                    seller_reputation=0.6,
-                ),
-                NormalizedListing(
-                    source_id=1,
-                    external_id="2",
-                    brand="Honda",
-                    model="Civic",
-                    price_brl=120000,
-                    seller_reputation=0.85,
-                ),
-                NormalizedListing(
-                    source_id=1,
-                    external_id="3",
-                    brand="Honda",
-                    model="Civic",
-                    price_brl=100000,
-                    seller_reputation=0.9,
-                ),
+                _listing("1", 90000, shaky),
+                _listing("2", 120000, good),
+                _listing("3", 100000, better),
+                _listing("sold", 95000, better, status=LISTING_STATUS_INACTIVE),
+                _listing("marked-up", 70000, better, final_price_brl=130000),
+                NormalizedListing(source_id=1, external_id="no-seller", brand="Honda", model="Civic", price_brl=1000),
             ]
         )
         db.commit()
@@ -49,30 +56,9 @@ def test_select_listing_filters_by_reputation_and_price():
 
 
 def test_select_listing_handles_price_ties():
-    engine = create_engine("sqlite:///:memory:")
-    Base.metadata.create_all(engine)
-
-    with Session(engine) as db:
-        db.add_all(
-            [
-                NormalizedListing(
-                    source_id=1,
-                    external_id="A",
-                    brand="Ford",
-                    model="Fiesta",
-                    price_brl=80000,
-                    seller_reputation=0.95,
-                ),
-                NormalizedListing(
-                    source_id=1,
-                    external_id="B",
-                    brand="Ford",
-                    model="Fiesta",
-                    price_brl=80000,
-                    seller_reputation=0.9,
-                ),
-            ]
-        )
+    with _session() as db:
+        seller = _seller(db, "s1", 0.95)
+        db.add_all([_listing("A", 80000, seller), _listing("B", 80000, seller)])
         db.commit()
 
         listing = select_cheapest_with_reputation(db, min_reputation=0.8)
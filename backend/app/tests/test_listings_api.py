@@ -0,0 +1,193 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.api import listings
+from app.api.deps import get_async_db
+from app.db.base import Base
+from app.models.listing import MarketStats, NormalizedListing, Seller, SellerStats
+
+
+async def _build_app(extra: tuple = ()) -> FastAPI:
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+
+    async with session_factory() as db:
+        seller = Seller(origin="olx", external_id="s1", reputation_medal="gold", reputation_score=0.9)
+        db.add(seller)
+        await db.flush()
+        db.add_all(
+            [
+                NormalizedListing(
+                    source_id=1,
+                    external_id="1",
+                    brand="Honda",
+                    model="Civic",
+                    price_brl=100000,
+                    final_price_brl=100000,
+                    state="SP",
+                    photos=["https://example.com/a.jpg"],
+                    seller_type="dealer",
+                    opportunity_score=-0.05,
+                    trust_badge="Verified listing",
+                ),
+                NormalizedListing(
+                    source_id=1,
+                    external_id="2",
+                    brand="Honda",
+                    model="Civic",
+                    price_brl=80000,
+                    final_price_brl=80000,
+                    state="SP",
+                    photos=[],
+                    opportunity_score=0.2,
+                    opportunity_badge="Selected by AXIS",
+                ),
+                SellerStats(seller_id=seller.id, reliability_score=0.95, listings_count=2),
+                *extra,
+            ]
+        )
+        await db.commit()
+
+    async def override_db():
+        async with session_factory() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(listings.router)
+    app.dependency_overrides[get_async_db] = override_db
+    return app
+
+
+class _EmptyLeaderboard:
+    def top(self, limit, origin=None):
+        return None
+
+
+@pytest.fixture(autouse=True)
+def _cold_leaderboard(monkeypatch):
+    monkeypatch.setattr(listings, "get_seller_leaderboard", _EmptyLeaderboard)
+
+
+@pytest.fixture(autouse=True)
+def _no_response_cache(monkeypatch):
+    monkeypatch.setattr(listings, "get_response_cache", lambda: None)
+
+
+async def _get(path: str, extra: tuple = ()) -> httpx.Response:
+    app = await _build_app(extra)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.get(path)
+
+
+async def _revalidate(path: str) -> tuple[httpx.Response, httpx.Response]:
+    app = await _build_app()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        first = await client.get(path)
+        return first, await client.get(path, headers={"If-None-Match": first.headers["etag"]})
+
+
+def test_opportunities_uses_async_session():
+    response = asyncio.run(_get("/v1/opportunities?region=SP"))
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["count"] == 2
+    badges = {item["id"]: item["badge"] for item in body["items"]}
+    assert badges[2] == "Selected by AXIS"
+
+
+def test_opportunities_serve_stored_scores_best_first():
+    unscored = NormalizedListing(
+        source_id=1, external_id="3", brand="Fiat", model="Uno", price_brl=1000, final_price_brl=1000, state="SP"
+    )
+    # Per-segment stats rows must neither break the feed nor change the stored badges.
+    stats = (
+        MarketStats(region_key="SP", brand="*", model="*", median_price=120000, p25=110000, p75=130000),
+        MarketStats(region_key="SP", brand="Honda", model="Civic", median_price=90000, p25=85000, p75=95000),
+    )
+
+    response = asyncio.run(_get("/v1/opportunities?region=SP", extra=(unscored, *stats)))
+
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert [(item["id"], item["badge"]) for item in items] == [
+        (2, "Selected by AXIS"),
+        (1, "Verified listing"),
+        (3, None),
+    ]
+    assert "opportunity_score" not in items[0]
+
+
+def test_get_listing_returns_404_for_missing_id():
+    assert asyncio.run(_get("/v1/listings/1")).status_code == 200
+    assert asyncio.run(_get("/v1/listings/999")).status_code == 404
+
+
+def test_trusted_sellers_reads_seller_attributes():
+    response = asyncio.run(_get("/v1/trusted-sellers?origin=olx"))
+
+    assert response.status_code == 200
+    assert response.json()[0]["origin"] == "olx"
+    assert response.json()[0]["reputation_medal"] == "gold"
+
+
+def test_nearby_without_coordinates_returns_empty_page():
+    response = asyncio.run(_get("/v1/listings/nearby?lat=-23.55&lng=-46.63&radius_km=10"))
+
+    assert response.status_code == 200
+    assert response.json() == {"items": [], "count": 0}
+
+
+def test_listing_detail_answers_304_for_matching_etag():
+    first, second = asyncio.run(_revalidate("/v1/listings/1"))
+
+    assert first.status_code == 200
+    assert first.headers["cache-control"] == "public, max-age=60"
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["etag"] == first.headers["etag"]
+
+
+def test_opportunities_answers_304_for_matching_etag():
+    first, second = asyncio.run(_revalidate("/v1/opportunities?region=SP"))
+
+    assert first.status_code == 200
+    assert first.headers["etag"].startswith('"')
+    assert second.status_code == 304
+
+
+def test_batch_lookup_keeps_request_order_and_reports_missing():
+    response = asyncio.run(_get("/v1/listings?ids=2,999,1&ids=2"))
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [item["id"] for item in body["items"]] == [2, 1]
+    assert body["missing"] == [999]
+
+
+def test_batch_lookup_rejects_bad_ids():
+    assert asyncio.run(_get("/v1/listings?ids=1,x")).status_code == 422
+    assert asyncio.run(_get("/v1/listings?ids=" + ",".join(["1"] * 201))).status_code == 422
+
+
+def test_batch_post_matches_get():
+    async def scenario():
+        app = await _build_app()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/v1/listings/batch", json={"ids": [1, 3]})
+
+    response = asyncio.run(scenario())
+
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()["items"]] == [1]
+    assert response.json()["missing"] == [3]
@@ -0,0 +1,118 @@
+import io
+import json
+import logging
+import queue
+import sys
+
+from app.core import logging_config
+from app.core.logging_config import BoundedQueueHandler, JsonFormatter, RepeatFilter
+
+
+def _record(
+    msg: str, *args, name: str = "app.test", level: int = logging.INFO, **extra
+) -> logging.LogRecord:
+    record = logging.LogRecord(name, level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_json_formatter_includes_extra_fields_and_exception():
+    try:
+        raise ValueError("bad page")
+    except ValueError:
+        record = logging.LogRecord(
+            "app.test", logging.ERROR, __file__, 1, "Parse failed for %s", ("MLB1",), None
+        )
+        record.exc_info = sys.exc_info()
+    record.request_metrics = {"db_queries": 2}
+
+    payload = json.loads(JsonFormatter().format(record))
+
+    assert payload["level"] == "ERROR"
+    assert payload["message"] == "Parse failed for MLB1"
+    assert payload["request_metrics"] == {"db_queries": 2}
+    assert "ValueError: bad page" in payload["exc"]
+
+
+def test_full_queue_drops_and_counts_without_blocking():
+    handler = BoundedQueueHandler(queue.Queue(maxsize=2))
+    for n in range(5):
+        handler.handle(_record("Normalized listing %s", n))
+
+    assert handler.queue.qsize() == 2
+    assert handler.take_dropped() == 3
+    assert handler.take_dropped() == 0
+
+
+def test_repeat_filter_limits_template_per_window(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(logging_config.time, "monotonic", lambda: clock[0])
+    repeat = RepeatFilter(burst=2, window_seconds=10, exempt=("app.requests",))
+
+    passed = [repeat.filter(_record("Normalized listing %s", n)) for n in range(5)]
+    assert passed == [True, True, False, False, False]
+    assert repeat.filter(_record("Ingested %s raw listings", 3))
+    assert all(repeat.filter(_record("GET / 200", name="app.requests")) for _ in range(5))
+
+    clock[0] += 10
+    record = _record("Normalized listing %s", 6)
+    assert repeat.filter(record)
+    assert record.suppressed == 3
+
+
+def test_pipeline_formats_on_listener_thread(monkeypatch):
+    stream = io.StringIO()
+    monkeypatch.setattr(logging_config.sys, "stdout", stream)
+    queue_handler, listener = logging_config._build_pipeline()
+    logger = logging.getLogger("app.test.pipeline")
+    logger.addHandler(queue_handler)
+    logger.propagate = False
+    listener.start()
+    try:
+        logger.warning("Raw listing %s not found", 42, extra={"source": "olx"})
+    finally:
+        listener.stop()
+        logger.removeHandler(queue_handler)
+
+    payload = json.loads(stream.getvalue().strip())
+    assert payload["message"] == "Raw listing 42 not found"
+    assert payload["source"] == "olx"
+
+
+def test_mutable_args_are_rendered_before_enqueue():
+    handler = BoundedQueueHandler(queue.Queue())
+    payload = {"price": 89000}
+    handler.handle(_record("Listing %s changed", payload))
+    handler.handle(_record("Listing %s seen", 7))
+    payload["price"] = 1
+
+    frozen, untouched = handler.queue.get_nowait(), handler.queue.get_nowait()
+    assert frozen.getMessage() == "Listing {'price': 89000} changed"
+    assert untouched.args == (7,)
+
+    repeat = RepeatFilter(burst=1, window_seconds=10)
+    handler.handle(_record("Listing %s changed", {"price": 2}))
+    assert repeat.filter(frozen)
+    assert not repeat.filter(handler.queue.get_nowait())
+
+
+def test_flush_logging_writes_queued_records_and_keeps_listening(monkeypatch):
+    stream = io.StringIO()
+    monkeypatch.setattr(logging_config.sys, "stdout", stream)
+    queue_handler, listener = logging_config._build_pipeline()
+    monkeypatch.setattr(logging_config, "_listener", listener)
+    logger = logging.getLogger("app.test.flush")
+    logger.addHandler(queue_handler)
+    logger.propagate = False
+    listener.start()
+    try:
+        logger.warning("Job %s done", 1)
+        logging_config.flush_logging()
+        assert json.loads(stream.getvalue())["message"] == "Job 1 done"
+
+        logger.warning("Job %s done", 2)
+    finally:
+        listener.stop()
+        logger.removeHandler(queue_handler)
+
+    assert stream.getvalue().count("\n") == 2
@@ -0,0 +1,126 @@
+import datetime as dt
+
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.db.base import Base
+from app.models.listing import LISTING_STATUS_INACTIVE, NormalizedListing, Seller, SellerStats
+from app.services import market_snapshot
+from app.services.market_snapshot import MarketSnapshot, cheapest, discount_scores, segment_medians
+from app.services.opportunities import opportunity_score
+
+
+def _listing(external_id: str, price: float, **overrides) -> NormalizedListing:
+    fields = dict(
+        source_id=1,
+        external_id=external_id,
+        brand="Honda",
+        model="Civic",
+        state="SP",
+        year=2020,
+        mileage_km=40_000,
+        final_price_brl=price,
+        photos=["a.jpg"],
+    )
+    fields.update(overrides)
+    return NormalizedListing(**fields)
+
+
+def _session() -> Session:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    return Session(engine)
+
+
+def test_build_filters_and_picks_cheapest_reliable():
+    with _session() as db:
+        seller = Seller(origin="olx", external_id="s1")
+        db.add(seller)
+        db.flush()
+        db.add(SellerStats(seller_id=seller.id, reliability_score=0.9))
+        db.add_all(
+            [
+                _listing("1", 90_000, seller_id=seller.id),
+                _listing("2", 70_000),
+                _listing("3", 80_000, year=2015, seller_id=seller.id),
+                _listing("4", 60_000, brand="Fiat", model="Uno", state="RJ"),
+            ]
+        )
+        db.commit()
+        snapshot = MarketSnapshot(ttl_seconds=60)
+        columns = snapshot.get(db)
+
+        assert columns.ids.tolist() == [1, 2, 3, 4]
+        civics = snapshot.mask(columns, state="SP", brand="Honda", min_year=2018)
+        assert columns.ids[civics].tolist() == [1, 2]
+        assert not snapshot.mask(columns, brand="Tesla").any()
+        assert cheapest(columns, snapshot.mask(columns, min_reliability=0.7)) == [3]
+        assert cheapest(columns, np.ones(len(columns), bool), limit=2) == [4, 2]
+
+
+def test_refresh_merges_changes_since_watermark():
+    with _session() as db:
+        db.add_all([_listing("1", 90_000), _listing("2", 70_000), _listing("3", 80_000)])
+        db.commit()
+        snapshot = MarketSnapshot(ttl_seconds=0)
+        snapshot.get(db)
+
+        later = dt.datetime.utcnow() + dt.timedelta(seconds=1)
+        first, second = db.get(NormalizedListing, 1), db.get(NormalizedListing, 2)
+        first.final_price_brl, first.updated_at = 50_000, later
+        second.status, second.updated_at = LISTING_STATUS_INACTIVE, later
+        db.add(_listing("4", 65_000, updated_at=later))
+        db.commit()
+
+        columns = snapshot.get(db)
+
+        assert columns.ids.tolist() == [1, 3, 4]
+        assert columns.price.tolist() == [50_000, 80_000, 65_000]
+
+
+def test_readers_that_do_not_wait_skip_a_refresh_in_progress():
+    with _session() as db:
+        db.add(_listing("1", 90_000))
+        db.commit()
+        snapshot = MarketSnapshot(ttl_seconds=0)
+
+        with snapshot._lock:
+            assert snapshot.get(db, wait=False) is None
+        columns = snapshot.get(db)
+        with snapshot._lock:
+            assert snapshot.get(db, wait=False) is columns
+
+
+def test_warm_up_builds_the_shared_snapshot(monkeypatch):
+    monkeypatch.setattr(market_snapshot, "_snapshot", MarketSnapshot(ttl_seconds=60))
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as db:
+        db.add_all([_listing("1", 90_000), _listing("2", 70_000)])
+        db.commit()
+
+    market_snapshot.warm_market_snapshot(factory)
+
+    with factory() as db:
+        assert market_snapshot.get_market_snapshot().get(db, wait=False).ids.tolist() == [1, 2]
+
+
+def test_discount_scores_match_scalar_opportunity_score():
+    with _session() as db:
+        prices = [50_000, 60_000, 70_000, 100_000]
+        db.add_all([_listing(str(n), price) for n, price in enumerate(prices)])
+        db.add(_listing("x", 0, brand="Fiat", model="Uno"))
+        db.commit()
+        columns = MarketSnapshot(ttl_seconds=60).get(db)
+
+    medians = segment_medians(columns)
+    scores = discount_scores(columns, medians)
+
+    class Stats:
+        median_price = 65_000
+
+    assert medians[:4].tolist() == [65_000] * 4
+    assert scores[:4].tolist() == [opportunity_score(price, Stats) for price in prices]
+    assert np.isnan(scores[4])
@@ -0,0 +1,94 @@
+import sys
+import types
+from pathlib import Path
+
+from app.connectors.mercadolivre import (
+    MercadoLivreConnector,
+    parse_listing_detail,
+    parse_search_results,
+)
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def _read_fixture(name: str) -> str:
+    return (FIXTURES / name).read_text(encoding="utf-8")
+
+
+def test_parse_search_results_returns_listing_urls():
+    assert parse_search_results(_read_fixture("mercadolivre_search.html")) == [
+        "https://carros.mercadolivre.com.br/MLB123456789-fi",
+        "https://carros.mercadolivre.com.br/MLB987654321-fi",
+    ]
+
+
+def test_parse_listing_detail_extracts_core_fields():
+    parsed = parse_listing_detail(_read_fixture("mercadolivre_detail.html"))
+
+    assert (parsed["brand"], parsed["price"], parsed["year"], parsed["mileage_km"]) == (
+        "Toyota",
+        98500,
+        2020,
+        42000.0,
+    )
+    assert (parsed["city"], parsed["state"]) == ("São Paulo", "SP")
+    assert parsed["seller_origin"] == "mercadolivre"
+
+
+class _FakePage:
+    def __init__(self, pages: dict[str, str]) -> None:
+        self.pages = pages
+        self.url = ""
+
+    def goto(self, url, wait_until=None):
+        self.url = url
+
+    def content(self):
+        return self.pages.get(self.url, _read_fixture("mercadolivre_search.html"))
+
+
+def _fake_playwright(monkeypatch, page: _FakePage) -> None:
+    browser = types.SimpleNamespace(
+        new_context=lambda: types.SimpleNamespace(route=lambda *args: None, new_page=lambda: page),
+        close=lambda: None,
+    )
+    playwright = types.SimpleNamespace(chromium=types.SimpleNamespace(launch=lambda headless: browser))
+
+    class _Context:
+        def __enter__(self):
+            return playwright
+
+        def __exit__(self, *exc_info):
+            return False
+
+    sync_api = types.ModuleType("playwright.sync_api")
+    sync_api.sync_playwright = _Context
+    monkeypatch.setitem(sys.modules, "playwright", types.ModuleType("playwright"))
+    monkeypatch.setitem(sys.modules, "playwright.sync_api", sync_api)
+
+
+class _RecordingStore:
+    def __init__(self) -> None:
+        self.pages = []
+
+    def put(self, external_id, url, html):
+        self.pages.append((external_id, url))
+
+
+def test_fetch_listings_stores_each_detail_page(monkeypatch):
+    detail = _read_fixture("mercadolivre_detail.html")
+    page = _FakePage(
+        {
+            "https://carros.mercadolivre.com.br/MLB123456789-fi": detail,
+            "https://carros.mercadolivre.com.br/MLB987654321-fi": detail,
+        }
+    )
+    _fake_playwright(monkeypatch, page)
+    store = _RecordingStore()
+    connector = MercadoLivreConnector(region_key="sp", limit=5, page_store=store)
+    monkeypatch.setattr(connector, "_delay", lambda: None)
+
+    listings = connector.fetch_listings()
+
+    assert [listing["external_id"] for listing in listings] == ["MLB123456789", "MLB987654321"]
+    assert [external_id for external_id, _ in store.pages] == ["MLB123456789", "MLB987654321"]
@@ -0,0 +1,150 @@
+import asyncio
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import QueuePool
+
+from app import internal
+from app.api import metrics
+from app.core.instrumentation import request_metrics_middleware
+from app.core.metrics import instrument_pool, render_metrics, track_job
+from app.workers import worker as rq_worker
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+
+def _sample(name: str, **labels: str) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_track_job_counts_outcomes_and_keeps_job_name():
+    @track_job
+    def metrics_probe_job(fail: bool = False) -> str:
+        if fail:
+            raise RuntimeError("boom")
+        return "done"
+
+    before = _sample("axis_job_runs_total", job="metrics_probe_job", outcome="success")
+    assert metrics_probe_job() == "done"
+    with pytest.raises(RuntimeError):
+        metrics_probe_job(fail=True)
+
+    assert metrics_probe_job.__name__ == "metrics_probe_job"
+    assert _sample("axis_job_runs_total", job="metrics_probe_job", outcome="success") == before + 1
+    assert _sample("axis_job_runs_total", job="metrics_probe_job", outcome="failure") >= 1
+    assert _sample("axis_job_duration_seconds_count", job="metrics_probe_job") >= 2
+
+
+def test_metrics_endpoint_exposes_route_latency():
+    app = FastAPI()
+
+    @app.get("/probe/{item_id}")
+    def probe(item_id: int) -> dict:
+        return {"id": item_id}
+
+    app.include_router(metrics.router)
+    app.middleware("http")(request_metrics_middleware)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.get("/probe/1")
+            await client.get("/probe/2")
+            return await client.get("/metrics")
+
+    response = asyncio.run(scenario())
+
+    assert response.headers["content-type"].startswith("text/plain")
+    assert (
+        'axis_http_request_duration_seconds_count{method="GET",route="/probe/{item_id}",status="200"}'
+        in response.text
+    )
+
+
+def test_pool_gauge_tracks_checked_out_connections():
+    engine = create_engine("sqlite://", poolclass=QueuePool, pool_size=2)
+    instrument_pool(engine, "test")
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        assert _sample("axis_db_pool_checked_out", engine="test") == 1
+    assert _sample("axis_db_pool_checked_out", engine="test") == 0
+    assert _sample("axis_db_pool_size", engine="test") == 2
+
+
+def test_multiprocess_mode_aggregates_other_processes(tmp_path, monkeypatch):
+    worker = textwrap.dedent("""
+        from app.core.metrics import track_job
+
+        @track_job
+        def worker_probe_job():
+            return None
+
+        worker_probe_job()
+        """)
+    for _ in range(2):
+        subprocess.run(
+            [sys.executable, "-c", worker],
+            check=True,
+            env={"PROMETHEUS_MULTIPROC_DIR": str(tmp_path), "PATH": ""},
+            cwd=BACKEND_DIR,
+        )
+
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    body, _ = render_metrics()
+
+    assert 'axis_job_runs_total{job="worker_probe_job",outcome="success"} 2.0' in body.decode()
+
+
+def test_dead_horses_stop_counting_towards_live_gauges(tmp_path, monkeypatch):
+    horse = textwrap.dedent("""
+        import os
+        from app.core.metrics import DB_POOL_CHECKED_OUT
+
+        DB_POOL_CHECKED_OUT.labels("horse").inc()
+        print(os.getpid())
+        """)
+    pid = int(
+        subprocess.run(
+            [sys.executable, "-c", horse],
+            check=True,
+            capture_output=True,
+            text=True,
+            env={"PROMETHEUS_MULTIPROC_DIR": str(tmp_path), "PATH": ""},
+            cwd=BACKEND_DIR,
+        ).stdout
+    )
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    assert 'axis_db_pool_checked_out{engine="horse"} 1.0' in render_metrics()[0].decode()
+
+    monitored = []
+    monkeypatch.setattr(rq_worker.Worker, "monitor_work_horse", lambda self, job, queue: monitored.append(job))
+    worker = rq_worker.MetricsWorker.__new__(rq_worker.MetricsWorker)
+    worker._horse_pid = pid
+    worker.monitor_work_horse("job", "queue")
+
+    assert monitored == ["job"]
+    assert 'engine="horse"' not in render_metrics()[0].decode()
+
+
+def test_metrics_are_served_by_the_internal_app_only():
+    assert internal.app.url_path_for("metrics") == "/metrics"
+    public = textwrap.dedent("""
+        from starlette.routing import NoMatchFound
+        from app.main import app
+
+        try:
+            app.url_path_for("metrics")
+        except NoMatchFound:
+            pass
+        else:
+            raise SystemExit("/metrics is routed on the public app")
+        """)
+    subprocess.run([sys.executable, "-c", public], check=True, cwd=BACKEND_DIR)
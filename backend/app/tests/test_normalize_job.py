@@ -0,0 +1,239 @@
+import datetime as dt
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.base import Base
+from app.models.listing import (
+    LISTING_STATUS_ACTIVE,
+    CrawlRun,
+    ListingPriceDrop,
+    ListingPriceHistory,
+    ListingSource,
+    MarketStats,
+    NormalizedListing,
+    RawListing,
+    Seller,
+)
+from app.services.html_store import ReparseResult
+from app.workers import jobs
+
+
+class _NullLeaderboard:
+    def publish(self, entries):
+        list(entries)
+
+
+@pytest.fixture
+def session_factory(monkeypatch):
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(jobs, "SessionLocal", factory)
+    monkeypatch.setattr(jobs, "get_seller_leaderboard", _NullLeaderboard)
+    monkeypatch.setattr(jobs, "invalidate_listing_responses", lambda *args, **kwargs: None)
+    return factory
+
+
+def _raw(db: Session, payload: dict, run_id: int | None = None) -> int:
+    source = db.execute(select(ListingSource)).scalars().first()
+    if source is None:
+        source = ListingSource(name="olx", base_url="https://www.olx.com.br")
+        db.add(source)
+        db.flush()
+    if run_id is None:
+        run = CrawlRun(source_id=source.id, region_key="SP", query_text="")
+        db.add(run)
+        db.flush()
+        run_id = run.id
+    raw = RawListing(
+        source_id=source.id,
+        external_id=payload["id"],
+        crawl_run_id=run_id,
+        raw_payload=payload,
+        fetched_at=dt.datetime.utcnow(),
+    )
+    db.add(raw)
+    db.commit()
+    return raw.id
+
+
+def test_raw_listing_is_normalized_into_a_stored_row(session_factory):
+    payload = {
+        "id": "OLX-1",
+        "brand": "vw",
+        "model": "gol",
+        "title": "VW Gol 1.0 2019",
+        "year": "2019",
+        "price": 45000,
+        "city": "Campinas",
+        "state": "SP",
+        "photos": ["https://example.com/gol.jpg"],
+        "seller_id": "seller-77",
+        "seller_origin": "olx",
+        "seller_type": "dealer",
+    }
+    with session_factory() as db:
+        raw_id = _raw(db, payload)
+
+    jobs.normalize_raw_listing(raw_id)
+    jobs.normalize_raw_listing(raw_id)
+
+    with session_factory() as db:
+        listings = db.execute(select(NormalizedListing)).scalars().all()
+        seller = db.execute(select(Seller)).scalars().one()
+        history = db.execute(select(ListingPriceHistory)).scalars().all()
+
+    assert len(listings) == 1
+    listing = listings[0]
+    assert (listing.brand, listing.model, listing.year) == ("Volkswagen", "Gol", 2019)
+    assert listing.status == LISTING_STATUS_ACTIVE
+    assert listing.seller_id == seller.id and seller.external_id == "seller-77"
+    assert listing.canonical_listing_id is None
+    assert listing.final_price_brl > listing.price_brl
+    assert listing.trust_badge is not None
+    assert len(history) == 1
+
+
+def test_photos_are_stored_as_a_list(session_factory):
+    with session_factory() as db:
+        single = _raw(db, {"id": "OLX-2", "brand": "fiat", "model": "uno", "price": 20000, "photos": "a.jpg"})
+        missing = _raw(db, {"id": "OLX-3", "brand": "fiat", "model": "uno", "price": 20000, "photos": None})
+
+    jobs.normalize_raw_listing(single)
+    jobs.normalize_raw_listing(missing)
+
+    with session_factory() as db:
+        photos = dict(db.execute(select(NormalizedListing.external_id, NormalizedListing.photos)).all())
+
+    assert photos == {"OLX-2": ["a.jpg"], "OLX-3": []}
+
+
+def test_crawl_run_is_normalized_with_one_cache_invalidation(session_factory, monkeypatch):
+    invalidations = []
+    monkeypatch.setattr(
+        jobs, "invalidate_listing_responses", lambda ids, regions=(): invalidations.append((ids, set(regions)))
+    )
+    with session_factory() as db:
+        first = _raw(db, {"id": "OLX-1", "brand": "Fiat", "model": "Argo", "price": 60000, "state": "SP"})
+        run_id = db.get(RawListing, first).crawl_run_id
+        _raw(db, {"id": "OLX-2", "brand": "Fiat", "model": "Mobi", "price": 40000, "state": "RJ"}, run_id)
+
+    jobs.normalize_crawl_run(run_id)
+
+    with session_factory() as db:
+        ids = db.execute(select(NormalizedListing.id).order_by(NormalizedListing.id)).scalars().all()
+    assert invalidations == [(ids, {"SP", "RJ"})]
+
+
+def test_crawl_run_is_scored_in_one_pass(session_factory, monkeypatch):
+    scored = []
+    score_listings = jobs.score_listings
+    monkeypatch.setattr(
+        jobs, "score_listings", lambda db, listings: scored.append(len(listings)) or score_listings(db, listings)
+    )
+    with session_factory() as db:
+        db.add(MarketStats(region_key="SP", brand="Fiat", model="Argo", median_price=80000, p25=70000, p75=90000))
+        first = _raw(db, {"id": "OLX-1", "brand": "Fiat", "model": "Argo", "price": 60000, "state": "SP"})
+        run_id = db.get(RawListing, first).crawl_run_id
+        for index in range(2, 5):
+            _raw(db, {"id": f"OLX-{index}", "brand": "Fiat", "model": "Argo", "price": 85000, "state": "SP"}, run_id)
+
+    jobs.normalize_crawl_run(run_id)
+
+    with session_factory() as db:
+        scores = db.execute(select(NormalizedListing.opportunity_score)).scalars().all()
+    assert scored == [4]
+    assert None not in scores
+
+
+def test_crawl_run_matches_alerts_once_for_new_listings(session_factory, monkeypatch):
+    matched = []
+    monkeypatch.setattr(jobs, "match_new_listings", lambda db, listings: matched.append(sorted(listing.external_id for listing in listings)))
+    with session_factory() as db:
+        first = _raw(db, {"id": "OLX-1", "brand": "Fiat", "model": "Argo", "price": 60000, "state": "SP"})
+        run_id = db.get(RawListing, first).crawl_run_id
+    jobs.normalize_crawl_run(run_id)
+    matched.clear()
+    with session_factory() as db:
+        _raw(db, {"id": "OLX-1", "brand": "Fiat", "model": "Argo", "price": 59000, "state": "SP"}, run_id)
+        _raw(db, {"id": "OLX-2", "brand": "Fiat", "model": "Mobi", "price": 40000, "state": "SP"}, run_id)
+        _raw(db, {"id": "OLX-3", "brand": "Fiat", "model": "Uno", "price": 30000, "state": "SP"}, run_id)
+
+    jobs.normalize_crawl_run(run_id)
+
+    # One call for the batch, with only the listings this run created.
+    assert matched == [["OLX-2", "OLX-3"]]
+
+
+class _RecordingQueue:
+    enqueued: list = []
+
+    def __init__(self, name, connection):
+        self.name = name
+
+    def enqueue(self, func, *args, **kwargs):
+        job = (self.name, func.__name__, args, kwargs)
+        self.enqueued.append(job)
+        return job
+
+
+def test_finished_crawl_run_chains_normalization_and_drop_detection(monkeypatch):
+    monkeypatch.setattr(jobs, "Queue", _RecordingQueue)
+    monkeypatch.setattr(_RecordingQueue, "enqueued", [])
+
+    jobs._enqueue_crawl_run_follow_ups(7)
+
+    normalize, flag = _RecordingQueue.enqueued
+    assert normalize == ("axis", "normalize_crawl_run", (7,), {})
+    assert flag == ("axis", "flag_price_drops", (7,), {"depends_on": normalize})
+
+
+def test_price_drops_of_a_crawl_run_are_stored(session_factory):
+    with session_factory() as db:
+        raw_id = _raw(db, {"id": "OLX-9", "brand": "fiat", "model": "uno", "price": 20000})
+        run_id = db.get(RawListing, raw_id).crawl_run_id
+    jobs.normalize_raw_listing(raw_id)
+    with session_factory() as db:
+        listing = db.execute(select(NormalizedListing)).scalars().one()
+        history = db.execute(select(ListingPriceHistory)).scalars().one()
+        history.observed_at = dt.datetime.utcnow() - dt.timedelta(days=10)
+        db.add(ListingPriceHistory(listing_id=listing.id, price_brl=17000, observed_at=dt.datetime.utcnow()))
+        db.commit()
+
+    jobs.flag_price_drops(run_id)
+    jobs.flag_price_drops(run_id)
+
+    with session_factory() as db:
+        drops = db.execute(select(ListingPriceDrop)).scalars().all()
+
+    assert [(drop.crawl_run_id, drop.previous_price_brl, drop.current_price_brl) for drop in drops] == [
+        (run_id, 20000, 17000)
+    ]
+
+
+def test_reparsed_listings_are_scored_and_matched(session_factory, monkeypatch):
+    matched = []
+    monkeypatch.setattr(jobs, "match_new_listings", lambda db, listings: matched.append([listing.id for listing in listings]))
+    with session_factory() as db:
+        db.add(MarketStats(region_key="SP", brand="Fiat", model="Argo", median_price=80000, p25=70000, p75=90000))
+        db.add(ListingSource(id=1, name="olx", base_url="https://www.olx.com.br"))
+        listing = NormalizedListing(
+            source_id=1, external_id="OLX-1", brand="Fiat", model="Argo", price_brl=60000, final_price_brl=63000, state="SP"
+        )
+        db.add(listing)
+        db.commit()
+        listing_id = listing.id
+    monkeypatch.setattr(
+        jobs,
+        "reparse_stored_pages",
+        lambda db, source_name, max_workers=None: ReparseResult(listing_ids=[listing_id], regions={"SP"}),
+    )
+
+    jobs.reparse_html_pages("olx")
+
+    with session_factory() as db:
+        assert db.get(NormalizedListing, listing_id).opportunity_score is not None
+    assert matched == [[listing_id]]
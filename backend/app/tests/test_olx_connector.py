@@ -1,6 +1,10 @@
 from pathlib import Path
 
+import pytest
+
+from app.connectors import olx
 from app.connectors.olx import OLXConnector, _extract_external_id, parse_listing_detail, parse_search_results
+from app.core.config import get_settings
 
 FIXTURES = Path(__file__).parent / "fixtures"
 
@@ -81,3 +85,58 @@ def test_fetch_listings_handles_pagination_and_detail_parsing():
     assert results[1]["city"] == "Campinas"
     assert results[2]["model"] == "T-Cross"
     assert results[-1]["price"] == 120000
+
+
+def test_live_fetching_is_off_by_default():
+    connector = olx.build_olx_connector(region_key="SP")
+
+    assert list(connector.fetch_listings()) == []
+
+
+def test_live_fetching_requires_an_identifying_user_agent(monkeypatch):
+    monkeypatch.setattr(get_settings(), "olx_live_fetch_enabled", True)
+    monkeypatch.setattr(get_settings(), "olx_user_agent", "")
+
+    with pytest.raises(ValueError):
+        olx.build_olx_connector(region_key="SP")
+
+
+def test_live_fetching_spaces_requests_and_closes_its_client(monkeypatch):
+    monkeypatch.setattr(get_settings(), "olx_live_fetch_enabled", True)
+    monkeypatch.setattr(get_settings(), "olx_user_agent", "AxisCrawler/1.0 (+mailto:crawler@example.com)")
+    pages = {
+        olx.build_search_url("SP", "", 1): _read_fixture("olx_search_page1.html"),
+        "https://www.olx.com/IDOLX123": _read_fixture("olx_detail_IDOLX123.html"),
+        "https://www.olx.com/IDOLX456": _read_fixture("olx_detail_IDOLX456.html"),
+    }
+    clients = []
+
+    class FakeClient:
+        def __init__(self, headers, **kwargs):
+            self.headers = headers
+            self.closed = False
+            clients.append(self)
+
+        def get(self, url):
+            class Response:
+                text = pages.get(url, "")
+
+                def raise_for_status(self):
+                    pass
+
+            return Response()
+
+        def close(self):
+            self.closed = True
+
+    sleeps = []
+    monkeypatch.setattr("httpx.Client", FakeClient)
+    monkeypatch.setattr(olx.time, "sleep", sleeps.append)
+
+    listings = list(olx.build_olx_connector(region_key="SP", max_pages=2).fetch_listings())
+
+    assert [listing["external_id"] for listing in listings] == ["IDOLX123", "IDOLX456"]
+    assert len(clients) == 1 and clients[0].closed
+    assert clients[0].headers["User-Agent"].startswith("AxisCrawler/1.0")
+    # Every request after the first waits at least 60 / OLX_RATE_LIMIT_PER_MINUTE seconds.
+    assert sleeps and min(sleeps) > 0
@@ -0,0 +1,86 @@
+import datetime as dt
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from app.db.base import Base
+from app.models.listing import MarketStats, NormalizedListing, photo_count
+from app.services.opportunities import score_region_opportunities
+
+
+def _listing(external_id: str, price: float, **overrides) -> NormalizedListing:
+    fields = {
+        "source_id": 1,
+        "external_id": external_id,
+        "brand": "Honda",
+        "model": "Civic",
+        "price_brl": price,
+        "final_price_brl": price,
+        "state": "SP",
+        "photos": ["https://example.com/a.jpg"],
+        "created_at": dt.datetime.utcnow() - dt.timedelta(days=2),
+    }
+    fields.update(overrides)
+    return NormalizedListing(**fields)
+
+
+def test_scores_every_listing_across_chunks_with_cached_stats():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.add(MarketStats(region_key="SP", brand="Honda", model="Civic", median_price=100000, p25=90000, p75=110000))
+        db.add_all([_listing(str(index), 100000 + index * 1000) for index in range(5)])
+        db.add_all(
+            [
+                _listing("cheap", 80000, seller_type="dealer"),
+                _listing("fresh", 80000, seller_type="dealer", created_at=dt.datetime.utcnow()),
+                _listing("no-photos", 100000, brand="Fiat", model="Argo", photos=[]),
+                _listing("other-region", 50000, state="RJ"),
+            ]
+        )
+        db.commit()
+
+        assert score_region_opportunities(db, "SP", chunk_size=2) == 8
+        db.commit()
+        rows = {row.external_id: row for row in db.execute(select(NormalizedListing)).scalars()}
+
+    assert rows["cheap"].opportunity_score == 0.2
+    assert rows["cheap"].opportunity_badge == "Selected by AXIS"
+    assert rows["cheap"].trust_badge == "Verified listing"
+    # Listings under six hours old lose a trust point.
+    assert rows["fresh"].trust_badge == "Selected by AXIS"
+    assert rows["4"].opportunity_score == -0.04 and rows["4"].opportunity_badge is None
+    # Argo has no segment stats, so it is scored against the region-wide median computed on the fly.
+    assert rows["no-photos"].opportunity_score is not None
+    assert rows["no-photos"].trust_badge is None
+    assert rows["other-region"].opportunity_score is None
+
+
+def test_photos_that_are_not_arrays_count_as_no_photos():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.add(MarketStats(region_key="SP", brand="Honda", model="Civic", median_price=100000, p25=90000, p75=110000))
+        db.add_all(
+            [
+                _listing("null", 80000, seller_type="dealer", photos=None),
+                _listing("scalar", 80000, seller_type="dealer", photos="https://example.com/a.jpg"),
+                _listing("object", 80000, seller_type="dealer", photos={"url": "https://example.com/a.jpg"}),
+                _listing("array", 80000, seller_type="dealer"),
+            ]
+        )
+        db.commit()
+
+        assert score_region_opportunities(db, "SP") == 4
+        db.commit()
+        rows = {row.external_id: row for row in db.execute(select(NormalizedListing)).scalars()}
+
+    assert rows["array"].trust_badge == "Verified listing"
+    assert {rows[key].trust_badge for key in ("null", "scalar", "object")} == {"Selected by AXIS"}
+
+
+def test_photo_count_checks_the_json_type_on_postgres():
+    sql = str(select(photo_count(NormalizedListing.photos)).compile(dialect=postgresql.dialect()))
+
+    assert "json_typeof(normalized_listings.photos) = 'array'" in sql
@@ -0,0 +1,96 @@
+import datetime as dt
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+from app.db.base import Base
+from app.models.listing import CrawlRun, ListingPriceDrop, ListingPriceHistory, NormalizedListing
+from app.services.price_history import (
+    PriceDrop,
+    detect_price_drops,
+    record_price,
+    record_price_drops,
+)
+
+NOW = dt.datetime(2024, 3, 1, 12, 0)
+
+
+def _session() -> Session:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    return Session(engine)
+
+
+def _listing(db: Session, external_id: str) -> NormalizedListing:
+    listing = NormalizedListing(
+        source_id=1, external_id=external_id, brand="Jeep", model="Renegade"
+    )
+    db.add(listing)
+    db.flush()
+    return listing
+
+
+def test_only_price_changes_are_appended_and_trend_follows_first_price():
+    with _session() as db:
+        listing = _listing(db, "1")
+        observed = [100000, 100000, 100000.4, 95000, 95000, 92000]
+        appended = [
+            record_price(db, listing, price, NOW + dt.timedelta(hours=hour))
+            for hour, price in enumerate(observed)
+        ]
+        db.flush()
+
+        assert appended == [True, False, False, True, False, True]
+        assert db.scalar(select(func.count()).select_from(ListingPriceHistory)) == 3
+        assert listing.price_trend == -0.08
+
+
+def test_detector_compares_with_price_in_effect_at_window_start():
+    with _session() as db:
+        dropped, stable, new = _listing(db, "dropped"), _listing(db, "stable"), _listing(db, "new")
+        history = [
+            (dropped, 120000, 30),
+            (dropped, 100000, 10),
+            (dropped, 92000, 2),
+            (stable, 80000, 20),
+            (stable, 79000, 1),
+            (new, 60000, 3),
+            (new, 54000, 1),
+        ]
+        db.add_all(
+            ListingPriceHistory(
+                listing_id=listing.id, price_brl=price, observed_at=NOW - dt.timedelta(days=days)
+            )
+            for listing, price, days in history
+        )
+        db.flush()
+
+        drops = detect_price_drops(db, [dropped.id, stable.id, new.id], now=NOW)
+
+    assert [(drop.listing_id, drop.previous_price, drop.current_price) for drop in drops] == [
+        (dropped.id, 100000, 92000),
+        (new.id, 60000, 54000),
+    ]
+    assert drops[0].drop == 0.08
+
+
+def test_a_persisting_drop_is_recorded_once_and_a_further_cut_again():
+    with _session() as db:
+        listing = _listing(db, "1")
+        runs = [CrawlRun(source_id=1), CrawlRun(source_id=1), CrawlRun(source_id=1)]
+        db.add_all(runs)
+        db.flush()
+        drop = PriceDrop(listing_id=listing.id, previous_price=100000, current_price=90000, drop=0.1)
+        further = PriceDrop(listing_id=listing.id, previous_price=100000, current_price=85000, drop=0.15)
+
+        assert record_price_drops(db, runs[0].id, [drop], detected_at=NOW) == 1
+        assert record_price_drops(db, runs[0].id, [drop], detected_at=NOW) == 0
+        # The price stayed at 90k on the next crawl: same drop, nothing new to store.
+        assert record_price_drops(db, runs[1].id, [drop], detected_at=NOW) == 0
+        assert record_price_drops(db, runs[2].id, [further], detected_at=NOW) == 1
+        stored = db.execute(select(ListingPriceDrop).order_by(ListingPriceDrop.id)).scalars().all()
+
+    assert [(row.crawl_run_id, row.previous_price_brl, row.current_price_brl, row.drop_ratio) for row in stored] == [
+        (runs[0].id, 100000, 90000, 0.1),
+        (runs[2].id, 100000, 85000, 0.15),
+    ]
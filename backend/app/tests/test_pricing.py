@@ -8,6 +8,7 @@ from app.services.pricing import (
     compute_opportunity_badge,
     compute_regional_market_stats,
     detect_opportunity,
+    opportunity_badges,
 )
 
 
@@ -20,6 +21,19 @@ def test_compute_opportunity_badge():
     assert badge == "Selected by AXIS"
 
 
+def test_batch_opportunity_badges_match_scalar():
+    rows = [
+        (price, median, p25)
+        for price in (None, 0, 85000, 91000, 99000, 120000)
+        for median in (None, 0, 100000)
+        for p25 in (None, 90000)
+    ]
+    prices, medians, p25s = zip(*rows, strict=True)
+
+    expected = [compute_opportunity_badge(price, median, p25) for price, median, p25 in rows]
+    assert opportunity_badges(prices, medians, p25s).tolist() == expected
+
+
 def test_compute_regional_market_stats_and_opportunity():
     engine = create_engine("sqlite:///:memory:")
     Base.metadata.create_all(engine)
@@ -0,0 +1,50 @@
+import datetime as dt
+import gzip
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+from app.db.base import Base
+from app.models.listing import RawListing, RawPayloadArchive
+from app.services.raw_archive import archive_superseded_payloads, load_raw_payload, purge_archive
+
+NOW = dt.datetime(2024, 3, 10, 12, 0)
+
+
+def _raw(external_id: str, days_ago: int, price: int) -> RawListing:
+    return RawListing(
+        source_id=1,
+        external_id=external_id,
+        raw_payload={"id": external_id, "price": price},
+        fetched_at=NOW - dt.timedelta(days=days_ago),
+    )
+
+
+def test_superseded_payloads_move_to_segments_and_stay_readable(tmp_path):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        rows = [_raw("a", 3, 100), _raw("a", 2, 95), _raw("b", 2, 50), _raw("a", 1, 90), _raw("c", 0, 10)]
+        db.add_all(rows)
+        db.commit()
+        ids = [row.id for row in rows]
+
+        archived = archive_superseded_payloads(db, tmp_path, older_than=NOW, batch_size=1)
+
+        assert archived == 2
+        assert db.scalars(select(RawListing.id).order_by(RawListing.id)).all() == [ids[2], ids[3], ids[4]]
+        assert load_raw_payload(db, ids[0], tmp_path) == {"id": "a", "price": 100}
+        assert load_raw_payload(db, ids[1], tmp_path) == {"id": "a", "price": 95}
+        assert load_raw_payload(db, ids[3], tmp_path) == {"id": "a", "price": 90}
+        segments = sorted(path.relative_to(tmp_path).as_posix() for path in tmp_path.rglob("*.gz"))
+        assert segments == [
+            "fetched_date=2024-03-07/segment-00000.ndjson.gz",
+            "fetched_date=2024-03-08/segment-00000.ndjson.gz",
+        ]
+        assert gzip.decompress((tmp_path / segments[0]).read_bytes()) == b'{"id":"a","price":100}\n'
+
+        purged = purge_archive(db, tmp_path, retention_days=(dt.date.today() - dt.date(2024, 3, 8)).days)
+
+        assert purged == 1
+        assert db.scalar(select(func.count()).select_from(RawPayloadArchive)) == 1
+        assert not (tmp_path / "fetched_date=2024-03-07").exists()
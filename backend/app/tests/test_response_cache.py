@@ -0,0 +1,127 @@
+from app.api.http_cache import digest_etag, etag_matches
+from app.services import response_cache
+from app.services.response_cache import (
+    LISTING_ROUTE,
+    OPPORTUNITIES_ROUTE,
+    SharedResponseCache,
+    region_group,
+)
+
+
+class FakeRedis:
+    """Just enough of the redis-py surface used by SharedResponseCache; pipelines run eagerly."""
+
+    def __init__(self) -> None:
+        self.values: dict[str, bytes] = {}
+        self.sets: dict[str, set[str]] = {}
+        self._results: list = []
+
+    def pipeline(self, transaction: bool = True):
+        self._results = []
+        return self
+
+    def execute(self):
+        results, self._results = self._results, []
+        return results
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+
+    def sadd(self, key, *members):
+        self.sets.setdefault(key, set()).update(members)
+
+    def smembers(self, key):
+        members = set(self.sets.get(key, set()))
+        self._results.append(members)
+        return members
+
+    def expire(self, key, seconds):
+        pass
+
+    def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+            self.sets.pop(key, None)
+
+
+def test_entries_round_trip_with_their_etag():
+    cache = SharedResponseCache(FakeRedis(), ttl_seconds=60)
+    cache.put(LISTING_ROUTE, "7", '"7-2024"', b'{"id":7}')
+
+    assert cache.get(LISTING_ROUTE, "7") == ('"7-2024"', b'{"id":7}')
+    assert cache.get(LISTING_ROUTE, "8") is None
+
+
+def test_listing_invalidation_drops_detail_and_only_its_region_feeds(monkeypatch):
+    cache = SharedResponseCache(FakeRedis(), ttl_seconds=60)
+    monkeypatch.setattr(response_cache, "get_response_cache", lambda: cache)
+    cache.put(LISTING_ROUTE, "7", '"a"', b"{}", group=region_group("SP"))
+    cache.put(LISTING_ROUTE, "8", '"b"', b"{}", group=region_group("SP"))
+    cache.put(OPPORTUNITIES_ROUTE, "SP", '"c"', b"{}")
+    cache.put(OPPORTUNITIES_ROUTE, "RJ", '"d"', b"{}")
+    cache.put(OPPORTUNITIES_ROUTE, "MG", '"e"', b"{}")
+
+    # A listing that moved from RJ to SP changes both feeds.
+    response_cache.invalidate_listing_responses([7], ["RJ", "SP", "SP"])
+
+    assert cache.get(LISTING_ROUTE, "7") is None
+    assert cache.get(LISTING_ROUTE, "8") is not None
+    assert cache.get(OPPORTUNITIES_ROUTE, "SP") is None
+    assert cache.get(OPPORTUNITIES_ROUTE, "RJ") is None
+    assert cache.get(OPPORTUNITIES_ROUTE, "MG") is not None
+
+
+def test_region_invalidation_drops_feed_and_detail_pages_of_the_region(monkeypatch):
+    cache = SharedResponseCache(FakeRedis(), ttl_seconds=60)
+    monkeypatch.setattr(response_cache, "get_response_cache", lambda: cache)
+    cache.put(LISTING_ROUTE, "7", '"a"', b"{}", group=region_group("SP"))
+    cache.put(LISTING_ROUTE, "9", '"b"', b"{}", group=region_group("RJ"))
+    cache.put(OPPORTUNITIES_ROUTE, "SP", '"c"', b"{}")
+
+    response_cache.invalidate_region_responses("SP")
+
+    assert cache.get(LISTING_ROUTE, "7") is None
+    assert cache.get(OPPORTUNITIES_ROUTE, "SP") is None
+    assert cache.get(LISTING_ROUTE, "9") is not None
+
+
+def test_if_none_match_uses_weak_comparison():
+    etag = digest_etag("SP", [(1, None)])
+
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"other"', etag)
+    assert not etag_matches(None, etag)
+
+
+class DownRedis(FakeRedis):
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls = 0
+
+    def get(self, key):
+        self.calls += 1
+        raise response_cache.redis.ConnectionError("connection refused")
+
+    def pipeline(self, transaction: bool = True):
+        self.calls += 1
+        raise response_cache.redis.ConnectionError("connection refused")
+
+
+def test_failed_redis_is_skipped_until_the_back_off_passes(monkeypatch):
+    client = DownRedis()
+    cache = SharedResponseCache(client, ttl_seconds=60, backoff_seconds=5)
+    now = [100.0]
+    monkeypatch.setattr(response_cache.time, "monotonic", lambda: now[0])
+
+    assert cache.get(LISTING_ROUTE, "7") is None
+    cache.put(LISTING_ROUTE, "7", '"a"', b"{}")
+    assert cache.get(LISTING_ROUTE, "7") is None
+    assert client.calls == 1
+
+    now[0] += 5
+    assert cache.get(LISTING_ROUTE, "7") is None
+    assert client.calls == 2
@@ -0,0 +1,85 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from app.api.serialization import LISTING_OUT_COLUMNS
+from app.db.base import Base
+from app.models.listing import NormalizedListing
+from app.services.search_index import (
+    _postgres_matches,
+    index_listing_text,
+    rebuild_search_index,
+    search_listings,
+)
+
+
+def _session() -> Session:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    return Session(engine)
+
+
+def _add(db: Session, external_id: str, brand: str, model: str, **fields) -> NormalizedListing:
+    listing = NormalizedListing(source_id=1, external_id=external_id, brand=brand, model=model, **fields)
+    db.add(listing)
+    db.flush()
+    index_listing_text(db, listing)
+    return listing
+
+
+def test_search_ranks_brand_and_model_above_description():
+    with _session() as db:
+        mention = _add(db, "1", "Toyota", "Corolla", description="Troquei meu Civic por este carro")
+        civic = _add(db, "2", "Honda", "Civic", title="Civic Touring único dono")
+
+        page = search_listings(db, LISTING_OUT_COLUMNS, "civic", limit=10)
+
+    assert [item["id"] for item in page.items] == [civic.id, mention.id]
+    assert page.next_cursor is None
+
+
+def test_search_folds_accents_and_matches_prefix_of_last_term():
+    with _session() as db:
+        listing = _add(db, "1", "Volkswagen", "Nivus", title="Nivus Highline automático")
+
+        assert [item["id"] for item in search_listings(db, LISTING_OUT_COLUMNS, "automatico", 10).items] == [listing.id]
+        assert [item["id"] for item in search_listings(db, LISTING_OUT_COLUMNS, "nivus high", 10).items] == [listing.id]
+        assert search_listings(db, LISTING_OUT_COLUMNS, "  ", 10).items == []
+
+
+def test_keyset_pagination_visits_every_match_once():
+    with _session() as db:
+        ids = {_add(db, str(index), "Fiat", "Argo").id for index in range(7)}
+        _add(db, "dup", "Fiat", "Argo", canonical_listing_id=1)
+
+        seen, cursor = [], None
+        while True:
+            page = search_listings(db, LISTING_OUT_COLUMNS, "argo", limit=3, cursor=cursor)
+            seen.extend(item["id"] for item in page.items)
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+
+    assert sorted(seen) == sorted(ids)
+
+
+def test_rebuild_indexes_existing_rows_and_rejects_bad_cursor():
+    with _session() as db:
+        db.add(NormalizedListing(source_id=1, external_id="1", brand="Jeep", model="Compass"))
+        db.flush()
+
+        assert rebuild_search_index(db) == 1
+        assert len(search_listings(db, LISTING_OUT_COLUMNS, "compass", 10).items) == 1
+        with pytest.raises(ValueError):
+            search_listings(db, LISTING_OUT_COLUMNS, "compass", 10, cursor="not-a-cursor")
+
+
+def test_postgres_matches_typos_against_the_closest_words_of_the_document():
+    sql = str(_postgres_matches("Corola").compile(dialect=postgresql.dialect()))
+
+    # psycopg's pyformat paramstyle doubles a literal %.
+    assert "<%% normalized_listings.search_document" in sql
+    assert "word_similarity(" in sql
+    assert "similarity(normalized_listings.search_document" not in sql
+    assert "search_document %" not in sql
@@ -0,0 +1,93 @@
+import asyncio
+import time
+
+import jwt
+import pytest
+from fastapi import HTTPException
+
+from app.core import security
+from app.core.security import PasswordHasher, VerifiedTokenCache
+
+
+@pytest.fixture
+def token_cache(monkeypatch):
+    cache = VerifiedTokenCache(max_entries=2)
+    monkeypatch.setattr(security, "_token_cache", cache)
+    return cache
+
+
+def test_decode_token_verifies_signature_once(token_cache, monkeypatch):
+    token = security.create_access_token("driver@example.com")
+    calls = []
+    real_decode = jwt.decode
+    monkeypatch.setattr(
+        jwt, "decode", lambda *args, **kwargs: calls.append(1) or real_decode(*args, **kwargs)
+    )
+
+    assert security.decode_token(token) == "driver@example.com"
+    assert security.decode_token(token) == "driver@example.com"
+    assert len(calls) == 1
+
+
+def test_cached_token_stops_at_its_own_expiry(token_cache, monkeypatch):
+    token = security.create_access_token("driver@example.com")
+    assert security.decode_token(token) == "driver@example.com"
+
+    expires_at = jwt.decode(token, options={"verify_signature": False})["exp"]
+    monkeypatch.setattr(security.time, "time", lambda: expires_at + 1)
+
+    assert token_cache.get(token) == (False, None)
+
+
+def test_token_cache_evicts_least_recently_used():
+    cache = VerifiedTokenCache(max_entries=2)
+    expires_at = time.time() + 60
+    cache.put("a", "a@example.com", expires_at)
+    cache.put("b", "b@example.com", expires_at)
+    cache.get("a")
+    cache.put("c", "c@example.com", expires_at)
+
+    assert cache.get("a") == (True, "a@example.com")
+    assert cache.get("b") == (False, None)
+
+
+def test_invalid_token_is_rejected_and_not_cached(token_cache):
+    with pytest.raises(HTTPException) as excinfo:
+        security.decode_token("not-a-jwt")
+
+    assert excinfo.value.status_code == 401
+    assert token_cache.get("not-a-jwt") == (False, None)
+
+
+def test_password_hasher_round_trips_in_process_pool():
+    hasher = PasswordHasher(workers=1, max_concurrency=1, max_waiting=4)
+
+    async def scenario():
+        hashed = await hasher.hash("s3cret")
+        return hashed, await hasher.verify("s3cret", hashed), await hasher.verify("wrong", hashed)
+
+    try:
+        hashed, ok, wrong = asyncio.run(scenario())
+    finally:
+        hasher.shutdown()
+
+    assert hashed.startswith("$2")
+    assert ok and not wrong
+
+
+def test_password_hasher_sheds_load_past_waiting_limit(monkeypatch):
+    hasher = PasswordHasher(workers=1, max_concurrency=1, max_waiting=0)
+    monkeypatch.setattr(hasher, "_pool", lambda: None)
+
+    async def scenario():
+        first = asyncio.create_task(hasher.hash("s3cret"))
+        await asyncio.sleep(0)
+        with pytest.raises(HTTPException) as excinfo:
+            await hasher.hash("other")
+        await first
+        return excinfo.value
+
+    error = asyncio.run(scenario())
+
+    assert error.status_code == 503
+    assert error.headers["Retry-After"] == "1"
@@ -0,0 +1,196 @@
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import Session
+
+from app.db.base import Base
+from app.models.listing import NormalizedListing, Seller, SellerStats
+from app.services.seller_leaderboard import SellerLeaderboard, seller_stats_entry
+from app.services.seller_stats import consolidate_seller_stats, top_trusted_sellers
+
+
+class FakeRedis:
+    """Just enough of the redis-py surface used by SellerLeaderboard; pipelines run eagerly."""
+
+    def __init__(self) -> None:
+        self.hashes: dict[str, dict[str, str]] = {}
+        self.zsets: dict[str, dict[str, float]] = {}
+        self.sets: dict[str, set[str]] = {}
+        self.strings: dict[str, str] = {}
+        self.commands: list[str] = []
+        self._results: list = []
+
+    def _record(self, command: str, result=None):
+        self.commands.append(command)
+        self._results.append(result)
+        return result
+
+    def pipeline(self, transaction: bool = True):
+        self._results = []
+        return self
+
+    def execute(self):
+        results, self._results = self._results, []
+        return results
+
+    def _stores(self):
+        return (self.hashes, self.zsets, self.sets, self.strings)
+
+    def hset(self, key, field, value):
+        self.hashes.setdefault(key, {})[field] = value
+        return self._record("hset")
+
+    def hmget(self, key, fields):
+        return [self.hashes.get(key, {}).get(field) for field in fields]
+
+    def zadd(self, key, mapping):
+        self.zsets.setdefault(key, {}).update(mapping)
+        return self._record("zadd")
+
+    def zrange(self, key, start, end):
+        # Redis orders equal scores by member, lexicographically.
+        ranked = sorted(self.zsets.get(key, {}).items(), key=lambda item: (item[1], item[0]))
+        return self._record("zrange", [member for member, _ in ranked[start : end + 1]])
+
+    def sadd(self, key, *members):
+        self.sets.setdefault(key, set()).update(members)
+        return self._record("sadd")
+
+    def smembers(self, key):
+        return set(self.sets.get(key, set()))
+
+    def set(self, key, value):
+        self.strings[key] = str(value)
+        return self._record("set")
+
+    def exists(self, key):
+        return self._record("exists", int(any(key in store for store in self._stores())))
+
+    def expire(self, key, seconds):
+        return self._record("expire")
+
+    def persist(self, key):
+        return self._record("persist")
+
+    def rename(self, source, target):
+        for store in self._stores():
+            if source in store:
+                store[target] = store.pop(source)
+        return self._record("rename")
+
+    def delete(self, *keys):
+        for key in keys:
+            for store in self._stores():
+                store.pop(key, None)
+        return self._record("delete")
+
+
+def _seed(db: Session) -> None:
+    for index, (origin, score) in enumerate([("olx", 0.5), ("mercadolivre", 0.9), ("olx", 0.8)]):
+        seller = Seller(origin=origin, external_id=f"s{index}", reputation_score=score, completed_sales=10)
+        db.add(seller)
+        db.flush()
+        db.add(NormalizedListing(source_id=1, external_id=f"l{index}", brand="VW", model="Polo", price_brl=50000, seller_id=seller.id))
+    db.commit()
+
+
+def test_top_trusted_sellers_filters_origin_before_limit_in_one_query():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        _seed(db)
+        consolidate_seller_stats(db)
+        db.expunge_all()
+
+        statements: list[str] = []
+        event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+        stats = top_trusted_sellers(db, limit=1, origin="olx")
+        origins = [stat.seller.origin for stat in stats]
+
+        assert origins == ["olx"]
+        assert stats[0].seller.reputation_score == 0.8
+        assert len(statements) == 1
+
+
+def test_leaderboard_serves_rankings_per_origin():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    leaderboard = SellerLeaderboard(FakeRedis())
+    with Session(engine) as db:
+        _seed(db)
+        assert leaderboard.top(5) is None
+
+        consolidate_seller_stats(db, leaderboard=leaderboard)
+        # Deltas alone never make the cache authoritative.
+        assert leaderboard.top(5) is None
+        leaderboard.rebuild(db)
+
+        ranked = leaderboard.top(5)
+        assert [row["reputation_score"] for row in ranked] == [0.9, 0.8, 0.5]
+        assert [row["origin"] for row in leaderboard.top(5, origin="olx")] == ["olx", "olx"]
+
+        stat = db.query(SellerStats).first()
+        assert seller_stats_entry(stat, stat.seller) in ranked
+
+
+def test_leaderboard_rebuild_replaces_stale_entries():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    client = FakeRedis()
+    leaderboard = SellerLeaderboard(client)
+    leaderboard.publish([{"seller_id": 99, "origin": "webmotors", "reliability_score": 1.0}])
+    with Session(engine) as db:
+        _seed(db)
+        consolidate_seller_stats(db)
+
+        assert leaderboard.rebuild(db) == 3
+        assert 99 not in [row["seller_id"] for row in leaderboard.top(10)]
+        assert leaderboard.top(10, origin="webmotors") == []
+        assert "keys" not in client.commands
+        assert not [key for store in client._stores() for key in store if ":build:" in key]
+
+
+def test_leaderboard_order_matches_the_database_with_ties_and_missing_scores():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    leaderboard = SellerLeaderboard(FakeRedis())
+    scores = [0.4, 0.7, None, 0.9, 0.4, 0.1, 0.7, 0.2, None, 0.7, 0.3]
+    with Session(engine) as db:
+        for index, score in enumerate(scores):
+            seller = Seller(origin="olx", external_id=f"s{index}")
+            db.add(seller)
+            db.flush()
+            db.add(SellerStats(seller_id=seller.id, reliability_score=score))
+        db.commit()
+        leaderboard.rebuild(db)
+        expected = [stat.seller_id for stat in top_trusted_sellers(db, limit=None)]
+
+    assert [row["seller_id"] for row in leaderboard.top(len(scores))] == expected
+    assert expected[:4] == [4, 2, 7, 10]
+    assert expected[-2:] == [3, 9]
+
+
+class _RecordingLeaderboard:
+    def __init__(self) -> None:
+        self.published: list[list[dict]] = []
+
+    def publish(self, entries):
+        self.published.append(list(entries))
+
+
+def test_consolidation_publishes_sellers_whose_displayed_fields_changed():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    leaderboard = _RecordingLeaderboard()
+    with Session(engine) as db:
+        _seed(db)
+        consolidate_seller_stats(db, leaderboard=leaderboard)
+        consolidate_seller_stats(db, leaderboard=leaderboard)
+        # Neither changes the reliability score, but both show up in the trusted-sellers rows.
+        seller = db.execute(select(Seller).where(Seller.external_id == "s0")).scalars().one()
+        seller.response_time_hours = 4.0
+        db.add(NormalizedListing(source_id=1, external_id="l9", brand="VW", model="Polo", price_brl=70000, seller_id=2))
+        db.commit()
+        consolidate_seller_stats(db, leaderboard=leaderboard)
+
+    assert [len(batch) for batch in leaderboard.published] == [3, 2]
+    assert {entry["seller_id"]: entry["response_time_hours"] for entry in leaderboard.published[1]}[1] == 4.0
+    assert {entry["seller_id"]: entry["listings_count"] for entry in leaderboard.published[1]}[2] == 2
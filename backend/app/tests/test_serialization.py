@@ -0,0 +1,53 @@
+import datetime as dt
+import json
+
+from app.api.serialization import dump_listing, dump_nearby, dump_opportunities
+from app.schemas.listing import ListingOut, OpportunityResponse
+
+ROW = {
+    "id": 7,
+    "brand": "BMW",
+    "model": "X1",
+    "trim": None,
+    "year": 2022,
+    "mileage_km": 22000,
+    "price_brl": 190000.0,
+    "final_price_brl": 185000.0,
+    "city": "São Paulo",
+    "state": "SP",
+    "photos": None,
+    "url": "https://example.com/listing/7",
+    "seller_type": "dealer",
+    "seller_id": None,
+    "status": "active",
+    "created_at": dt.datetime(2024, 5, 10, 12, 0, 0),
+    "updated_at": None,
+}
+
+
+def test_dump_opportunities_matches_validated_model():
+    expected = OpportunityResponse(
+        items=[ListingOut(**{**ROW, "photos": []}, badge="Selected by AXIS")], count=1
+    ).model_dump(mode="json")
+
+    assert json.loads(dump_opportunities([ROW], ["Selected by AXIS"])) == expected
+
+
+def test_dump_listing_defaults_missing_photos_to_empty_list():
+    payload = json.loads(dump_listing(ROW))
+
+    assert payload["photos"] == []
+    assert payload["badge"] is None
+    assert payload["created_at"] == "2024-05-10T12:00:00"
+
+
+def test_dump_listing_coerces_photos_that_are_not_a_list():
+    assert json.loads(dump_listing({**ROW, "photos": {"0": "https://img/1.jpg"}}))["photos"] == []
+    assert json.loads(dump_listing({**ROW, "photos": "https://img/1.jpg"}))["photos"] == ["https://img/1.jpg"]
+
+
+def test_dump_nearby_coerces_photos_that_are_not_a_list():
+    payload = json.loads(dump_nearby([({**ROW, "photos": {"0": "https://img/1.jpg"}}, 1.234)]))
+
+    assert payload["items"][0]["photos"] == []
+    assert payload["items"][0]["distance_km"] == 1.23
@@ -0,0 +1,54 @@
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+# Cumulative `-X importtime` of app.main; override on slow CI machines.
+IMPORT_BUDGET_MS = float(os.environ.get("AXIS_IMPORT_BUDGET_MS", 2000))
+# Worker- or endpoint-only dependencies that must stay out of API startup.
+DEFERRED_MODULES = (
+    "numpy",
+    "jwt",
+    "bcrypt",
+    "rq",
+    "bs4",
+    "playwright",
+    "app.workers.jobs",
+    "app.connectors.olx",
+    "app.connectors.mercadolivre",
+    "app.connectors.mercado_livre",
+)
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)")
+
+
+def _import_app_main() -> list[tuple[int, int, str]]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            rows.append((int(match[1]), int(match[2]), match[4]))
+    return rows
+
+
+def test_api_startup_skips_deferred_modules_and_stays_within_budget():
+    rows = _import_app_main()
+    imported = {name for _, _, name in rows}
+
+    assert not [module for module in DEFERRED_MODULES if module in imported]
+
+    cumulative_ms = next(cumulative for _, cumulative, name in rows if name == "app.main") / 1000
+    slowest = sorted(rows, reverse=True)[:10]
+    assert (
+        cumulative_ms <= IMPORT_BUDGET_MS
+    ), "import app.main took {:.0f}ms; slowest self times: {}".format(
+        cumulative_ms, ", ".join(f"{name} {own / 1000:.0f}ms" for own, _, name in slowest)
+    )
@@ -1,4 +1,6 @@
-from app.services.trust import TrustSignals, trust_badge
+import datetime as dt
+
+from app.services.trust import TrustSignals, listing_ages_hours, trust_badge, trust_badges
 
 
 def test_trust_badge_awards_verified():
@@ -9,3 +11,29 @@ def test_trust_badge_awards_verified():
 def test_trust_badge_selected():
     signals = TrustSignals(seller_type="dealer", has_photos=False, price_deviation=-0.3, listing_age_hours=1)
     assert trust_badge(signals) == "Selected by AXIS"
+
+
+def test_batch_trust_badges_match_scalar():
+    now = dt.datetime(2024, 5, 10, 12)
+    rows = [
+        (seller_type, has_photos, deviation, created_at)
+        for seller_type in ("dealer", "private", None)
+        for has_photos in (True, False)
+        for deviation in (None, -0.3, -0.2, 0.1)
+        for created_at in (None, now - dt.timedelta(hours=2), now - dt.timedelta(hours=6), now - dt.timedelta(days=3))
+    ]
+    seller_types, has_photos, deviations, created_at = zip(*rows, strict=True)
+    ages = listing_ages_hours(created_at, now)
+
+    expected = [
+        trust_badge(
+            TrustSignals(
+                seller_type=seller_type,
+                has_photos=photos,
+                price_deviation=deviation,
+                listing_age_hours=int((now - created).total_seconds() // 3600) if created else None,
+            )
+        )
+        for seller_type, photos, deviation, created in rows
+    ]
+    assert trust_badges(seller_types, has_photos, deviations, ages).tolist() == expected
@@ -0,0 +1,121 @@
+import math
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.db.base import Base
+from app.models.listing import NormalizedListing
+from app.services.valuation import (
+    ValuationQuery,
+    estimate_sale_price,
+    fit_depreciation_models,
+    get_model_cache,
+    parse_vehicle_description,
+)
+
+
+def _true_price(year: int, mileage_km: int) -> float:
+    return 150000 * math.exp(0.08 * (year - 2024) - 0.04 * mileage_km / 10000)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        listings = []
+        for index, year in enumerate(range(2016, 2024)):
+            for mileage_km in (10000, 40000, 70000):
+                noise = 1 + (0.01 if index % 2 else -0.01)
+                listings.append(
+                    NormalizedListing(
+                        source_id=1,
+                        external_id=f"{year}-{mileage_km}",
+                        brand="Bmw",
+                        model="X1",
+                        year=year,
+                        mileage_km=mileage_km,
+                        price_brl=_true_price(year, mileage_km) * noise,
+                        state="SP",
+                    )
+                )
+        session.add_all(listings)
+        session.commit()
+        get_model_cache().invalidate()
+        yield session
+
+
+def test_parse_vehicle_description_extracts_segment():
+    assert parse_vehicle_description("BMW X1 2022, pacote M") == ("Bmw", "X1", 2022)
+    assert parse_vehicle_description("") == (None, None, None)
+
+
+def test_fit_recovers_depreciation_coefficients(db):
+    assert fit_depreciation_models(db, min_samples=8, reference_year=2024) == 3
+
+    _, model = get_model_cache().lookup(db, "SP", "Bmw", "X1")
+    assert model is not None
+    assert model.year_coef == pytest.approx(0.08, abs=0.01)
+    assert model.mileage_coef == pytest.approx(-0.04, abs=0.01)
+
+
+def test_estimate_blends_model_with_nearest_comparables(db):
+    fit_depreciation_models(db, min_samples=8, reference_year=2024)
+
+    valuation = estimate_sale_price(db, ValuationQuery(brand="Bmw", model="X1", year=2021, mileage_km=30000, region="SP"))
+
+    assert valuation is not None
+    assert valuation.comparables == 5
+    assert valuation.segment == ("SP", "Bmw", "x1")
+    assert valuation.price == pytest.approx(_true_price(2021, 30000), rel=0.03)
+    assert valuation.min_price < valuation.price < valuation.max_price
+
+
+def test_estimate_without_data_returns_none(db):
+    assert estimate_sale_price(db, ValuationQuery(brand="Fiat", model="Uno", year=2010, mileage_km=None, region=None)) is None
+
+
+def test_comparables_are_the_nearest_rows_not_the_first_read(db):
+    # 60 in-band but distant rows are written first; only the last five match the query exactly.
+    far = [
+        NormalizedListing(
+            source_id=2, external_id=f"far-{index}", brand="Audi", model="A3", year=2018,
+            mileage_km=60000, price_brl=50000, state="SP",
+        )
+        for index in range(60)
+    ]
+    near = [
+        NormalizedListing(
+            source_id=2, external_id=f"near-{index}", brand="Audi", model="A3", year=2020,
+            mileage_km=40000, price_brl=90000, state="SP",
+        )
+        for index in range(5)
+    ]
+    db.add_all(far + near)
+    db.commit()
+
+    valuation = estimate_sale_price(db, ValuationQuery(brand="Audi", model="A3", year=2020, mileage_km=40000, region="SP"))
+
+    assert valuation is not None
+    assert valuation.comparables == 5
+    assert valuation.price == pytest.approx(90000)
+
+
+def test_models_match_regardless_of_spelling(db):
+    spellings = ["HR-V", "Hr-V", "hr-v"] * 4
+    db.add_all(
+        NormalizedListing(
+            source_id=3, external_id=f"hrv-{index}", brand="Honda", model=model, year=2021,
+            mileage_km=30000 + index * 1000, price_brl=120000, state="SP",
+        )
+        for index, model in enumerate(spellings)
+    )
+    db.commit()
+    fit_depreciation_models(db, min_samples=8, reference_year=2024)
+
+    valuation = estimate_sale_price(db, ValuationQuery(brand="Honda", model="HR-V", year=2021, mileage_km=35000, region="SP"))
+
+    assert valuation is not None
+    assert valuation.comparables == 5
+    assert valuation.segment == ("SP", "Honda", "hr-v")
@@ -1,62 +1,71 @@
 import logging
-from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, Callable
+from typing import Optional
 
-from sqlalchemy import select
+from redis import Redis
+from rq import Queue
+from sqlalchemy import or_, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from app.connectors.base import BaseConnector
-from app.connectors.example_marketplace import ExampleMarketplaceConnector
-from app.connectors.mercadolivre import MercadoLivreConnector
-from app.connectors.olx import OlxConnector
+from app.connectors.registry import DEFAULT_CONNECTOR, get_connector_config
+from app.core.config import get_settings
+from app.core.logging_config import setup_logging
+from app.core.metrics import LISTINGS_INGESTED, track_job
 from app.db.session import SessionLocal
-from app.models.listing import ListingSource, MarketStats, NormalizedListing, RawListing, Seller
+from app.models.listing import (
+    LISTING_STATUS_ACTIVE,
+    Alert,
+    AlertMatch,
+    CrawlRun,
+    ListingSource,
+    MarketStats,
+    NormalizedListing,
+    RawListing,
+    Seller,
+)
+from app.services.alerts import match_new_listings
+from app.services.crawl_runs import (
+    finish_crawl_run,
+    mark_listings_seen,
+    start_crawl_run,
+    sweep_unseen_listings,
+)
+from app.services.dedup import reelect_canonicals
+from app.services.geo import encode_geohash, geocode_city, resolve_coordinates
+from app.services.html_store import PAGE_PARSERS, HtmlPackWriter, reparse_stored_pages
+from app.services.listing_refresh import refresh_listing_derivatives
 from app.services.normalization import normalize_listing_fields
+from app.services.opportunities import score_listings, score_region_opportunities
+from app.services.price_history import detect_price_drops, record_price_drops
 from app.services.pricing import apply_markup, compute_regional_market_stats
+from app.services.raw_archive import archive_superseded_payloads, purge_archive
+from app.services.response_cache import (
+    invalidate_feed_responses,
+    invalidate_listing_responses,
+    invalidate_region_responses,
+)
+from app.services.search_index import rebuild_search_index
+from app.services.seller_leaderboard import get_seller_leaderboard
 from app.services.seller_stats import consolidate_seller_stats
+from app.services.valuation import fit_depreciation_models
 
+setup_logging()
 logger = logging.getLogger(__name__)
 
-
-@dataclass
-class ConnectorConfig:
-    base_url: str
-    factory: Callable[..., BaseConnector]
-
-
-def _example_factory(**_: Any) -> BaseConnector:
-    return ExampleMarketplaceConnector()
-
-
-def _mercado_livre_factory(region_key: str = "", query_text: str = "", limit: int = 30, **_: Any) -> BaseConnector:
-    return MercadoLivreConnector(region_key=region_key, query_text=query_text, limit=limit)
-
-
-def _olx_factory(**_: Any) -> BaseConnector:
-    return OlxConnector()
-
-
-CONNECTOR_REGISTRY: dict[str, ConnectorConfig] = {
-    "mercado_livre": ConnectorConfig(
-        base_url="https://carros.mercadolivre.com.br", factory=_mercado_livre_factory
-    ),
-    "mercadolivre": ConnectorConfig(
-        base_url="https://carros.mercadolivre.com.br", factory=_mercado_livre_factory
-    ),
-    "olx": ConnectorConfig(base_url="https://www.olx.com.br", factory=_olx_factory),
-}
-
-DEFAULT_CONNECTOR = ConnectorConfig(base_url="https://example.com", factory=_example_factory)
-
-
-def get_connector_config(source_name: str) -> ConnectorConfig:
-    return CONNECTOR_REGISTRY.get(source_name, DEFAULT_CONNECTOR)
+NORMALIZE_BATCH_SIZE = 500
 
 
+@track_job
 def ingest_source(source_name: str, region_key: str = "", query_text: str | None = None, limit: int = 30) -> None:
     config = get_connector_config(source_name)
-    connector = config.factory(region_key=region_key, query_text=query_text or "", limit=limit)
+    # Pages are only worth keeping for sources that have a parser to reparse them with.
+    page_store = (
+        HtmlPackWriter(source_name)
+        if get_settings().html_store_enabled and source_name in PAGE_PARSERS
+        else None
+    )
+    connector = config.factory(region_key=region_key, query_text=query_text or "", limit=limit, page_store=page_store)
     with SessionLocal() as db:
         source = db.execute(select(ListingSource).where(ListingSource.name == source_name)).scalars().first()
         if not source:
@@ -70,88 +79,305 @@ def ingest_source(source_name: str, region_key: str = "", query_text: str | None
             db.commit()
             db.refresh(source)
 
+        run = start_crawl_run(db, source.id, region_key=region_key, query_text=query_text or "")
+        seen_ids: list[str] = []
         for payload in connector.fetch_listings():
-            raw = RawListing(source_id=source.id, external_id=payload["id"], raw_payload=payload)
+            external_id = payload.get("id") or payload.get("external_id")
+            raw = RawListing(source_id=source.id, external_id=external_id, crawl_run_id=run.id, raw_payload=payload)
             db.add(raw)
+            seen_ids.append(str(external_id))
+        seen = len(seen_ids)
+        mark_listings_seen(db, run, seen_ids)
+        finish_crawl_run(run, seen)
+        LISTINGS_INGESTED.labels(source_name).inc(seen)
+        if page_store is not None:
+            page_store.flush(db)
         db.commit()
-        logger.info("Ingested raw listings for %s", source_name)
+        logger.info("Ingested %s raw listings for %s in crawl run %s", seen, source_name, run.id)
+        _enqueue_crawl_run_follow_ups(run.id)
 
 
+def _enqueue_crawl_run_follow_ups(crawl_run_id: int) -> None:
+    # Drop detection only runs once normalization of the same run succeeded (rq depends_on).
+    queue = Queue("axis", connection=Redis.from_url(get_settings().redis_url))
+    normalize = queue.enqueue(normalize_crawl_run, crawl_run_id)
+    queue.enqueue(flag_price_drops, crawl_run_id, depends_on=normalize)
+
+
+@track_job
 def ingest_marketplace(source_name: str, region_key: str, query_text: str = "", limit: int = 30) -> None:
     ingest_source(source_name=source_name, region_key=region_key, query_text=query_text, limit=limit)
 def _get_connector(source_name: str):
     normalized_name = source_name.lower().replace(" ", "_")
     if normalized_name in {"mercado_livre", "mercadolivre"}:
-        return MercadoLivreConnector(region_key="SP", query_text="carros")
-    return ExampleMarketplaceConnector()
+        return get_connector_config(normalized_name).factory(region_key="SP", query_text="carros")
+    return DEFAULT_CONNECTOR.factory()
+
+
+def _normalize_raw(db: Session, raw: RawListing) -> Optional[tuple[NormalizedListing, set[Optional[str]], bool]]:
+    """Upsert the normalized row of one raw payload, without committing or scoring it.
+
+    Returns the row, the regions it was in before and after (for response cache invalidation)
+    and whether it was created. Callers score the rows and match alerts for new ones in batches.
+    """
+    data = normalize_listing_fields(raw.raw_payload)
+    external_id = data.get("external_id") or raw.external_id
+    if not external_id:
+        logger.warning("Raw listing %s missing external id", raw.id)
+        return None
+    regions: set[Optional[str]] = set()
+
+    price = data.get("price")
+    seller_origin = data.get("seller_origin") or (raw.source.name if raw and raw.source else None)
+
+    seller = None
+    seller_external_id = data.get("seller_id")
+    if seller_external_id:
+        seller = db.execute(
+            select(Seller).where(
+                Seller.external_id == seller_external_id,
+                Seller.origin == (seller_origin or "unknown"),
+            )
+        ).scalars().first()
+        if not seller:
+            seller = Seller(
+                external_id=seller_external_id,
+                origin=seller_origin or "unknown",
+                source_id=raw.source_id if raw else None,
+            )
+            db.add(seller)
+            db.flush()
+
+        seller.reputation_medal = data.get("seller_medal") or seller.reputation_medal
+        seller.reputation_score = data.get("seller_score") or seller.reputation_score
+        seller.cancellations = data.get("seller_cancellations") or seller.cancellations
+        seller.response_time_hours = data.get("seller_response_time_hours") or seller.response_time_hours
+        seller.completed_sales = data.get("seller_completed_sales") or seller.completed_sales
+
+    final_price = apply_markup(price or 0)
+    coordinates = resolve_coordinates(data.get("lat"), data.get("lng"), data.get("city"), data.get("state"))
+    fields = dict(
+        source_id=raw.source_id,
+        external_id=external_id,
+        brand=data.get("brand"),
+        model=data.get("model"),
+        trim=data.get("trim"),
+        title=data.get("title"),
+        description=data.get("description"),
+        year=data.get("year"),
+        mileage_km=data.get("mileage_km"),
+        price_brl=price,
+        supplier_price_brl=price,
+        final_price_brl=final_price,
+        city=data.get("city"),
+        state=data.get("state"),
+        lat=coordinates[0] if coordinates else None,
+        lng=coordinates[1] if coordinates else None,
+        geohash=encode_geohash(*coordinates) if coordinates else None,
+        photos=data.get("photos"),
+        url=data.get("url"),
+        seller_type=data.get("seller_type"),
+        # The payload carries the marketplace's seller id; the FK points at our sellers row.
+        seller_id=seller.id if seller else None,
+        status=LISTING_STATUS_ACTIVE,
+        last_seen_run_id=raw.crawl_run_id,
+        last_seen_at=raw.fetched_at,
+    )
+    # Re-crawled listings update their existing row, which is what lets the sweep tell
+    # listings still on the marketplace apart from sold or removed ones.
+    normalized = db.execute(
+        select(NormalizedListing).where(
+            NormalizedListing.source_id == raw.source_id, NormalizedListing.external_id == external_id
+        )
+    ).scalars().first()
+    created = normalized is None
+    if created:
+        normalized = NormalizedListing(**fields)
+        try:
+            with db.begin_nested():
+                db.add(normalized)
+        except IntegrityError:
+            # Another worker inserted the same (source, external id) between our select and insert.
+            created = False
+            normalized = db.execute(
+                select(NormalizedListing).where(
+                    NormalizedListing.source_id == raw.source_id, NormalizedListing.external_id == external_id
+                )
+            ).scalars().one()
+    if not created:
+        regions.add(normalized.state)
+        if (normalized.last_seen_run_id or 0) > (raw.crawl_run_id or 0):
+            # Ingestion of a newer run already stamped the row; an older payload must not rewind it.
+            fields.pop("last_seen_run_id")
+            fields.pop("last_seen_at")
+        for key, value in fields.items():
+            setattr(normalized, key, value)
+    db.flush()
+    refresh_listing_derivatives(db, normalized, price, raw.fetched_at)
+    regions.add(normalized.state)
+    return normalized, regions, created
+
+
+def _score_and_match(db: Session, listing_ids: list[int], created_ids: set[int]) -> None:
+    """Score a run's listings and queue alert matches for the new ones, chunk by chunk.
+
+    Each chunk loads each region's market stats once and checks alert_matches in one query.
+    """
+    for start in range(0, len(listing_ids), NORMALIZE_BATCH_SIZE):
+        listings = db.execute(
+            select(NormalizedListing).where(NormalizedListing.id.in_(listing_ids[start : start + NORMALIZE_BATCH_SIZE]))
+        ).scalars().all()
+        score_listings(db, listings)
+        match_new_listings(db, [listing for listing in listings if listing.id in created_ids])
+        db.commit()
+        db.expunge_all()
 
 
+@track_job
 def normalize_raw_listing(raw_id: int) -> None:
     with SessionLocal() as db:
         raw = db.get(RawListing, raw_id)
         if not raw:
             logger.warning("Raw listing %s not found", raw_id)
             return
-        data = normalize_listing_fields(raw.raw_payload)
-        external_id = data.get("external_id") or raw.external_id
-        if not external_id:
-            logger.warning("Raw listing %s missing external id", raw_id)
+        result = _normalize_raw(db, raw)
+        if result is None:
             return
+        normalized, regions, created = result
+        score_listings(db, [normalized])
+        if created:
+            match_new_listings(db, [normalized])
+        listing_id, has_seller = normalized.id, normalized.seller_id is not None
+        db.commit()
+        invalidate_listing_responses([listing_id], regions)
+        if has_seller:
+            consolidate_seller_stats(db, leaderboard=get_seller_leaderboard())
+        logger.info("Normalized listing %s", raw_id)
 
-        price = data.get("price")
-        seller_origin = data.get("seller_origin") or (raw.source.name if raw and raw.source else None)
 
-        seller = None
-        seller_external_id = data.get("seller_id")
-        if seller_external_id:
-            seller = db.execute(
-                select(Seller).where(
-                    Seller.external_id == seller_external_id,
-                    Seller.origin == (seller_origin or "unknown"),
-                )
-            ).scalars().first()
-            if not seller:
-                seller = Seller(
-                    external_id=seller_external_id,
-                    origin=seller_origin or "unknown",
-                    source_id=raw.source_id if raw else None,
+@track_job
+def normalize_crawl_run(crawl_run_id: int) -> None:
+    """Normalize every raw listing of one crawl run, then score and invalidate in one pass.
+
+    Each listing still commits on its own. Scoring (which reads market stats), alert matching,
+    cache invalidation and seller stats consolidation run once for the run, after the loop.
+    """
+    with SessionLocal() as db:
+        raw_ids = db.execute(
+            select(RawListing.id).where(RawListing.crawl_run_id == crawl_run_id).order_by(RawListing.id)
+        ).scalars().all()
+        listing_ids: list[int] = []
+        created_ids: set[int] = set()
+        regions: set[Optional[str]] = set()
+        has_seller = False
+        for raw_id in raw_ids:
+            result = _normalize_raw(db, db.get(RawListing, raw_id))
+            if result is None:
+                continue
+            normalized, listing_regions, created = result
+            listing_ids.append(normalized.id)
+            if created:
+                created_ids.add(normalized.id)
+            regions |= listing_regions
+            has_seller = has_seller or normalized.seller_id is not None
+            db.commit()
+            db.expunge_all()
+        _score_and_match(db, listing_ids, created_ids)
+        invalidate_listing_responses(listing_ids, regions)
+        if has_seller:
+            consolidate_seller_stats(db, leaderboard=get_seller_leaderboard())
+        logger.info("Normalized %s listings of crawl run %s", len(listing_ids), crawl_run_id)
+
+
+@track_job
+def sweep_crawl_scope(source_name: str, region_key: str = "", query_text: str = "") -> None:
+    """Mark listings missing from the last K crawls of a (source, region, query) as inactive."""
+    with SessionLocal() as db:
+        run = db.execute(
+            select(CrawlRun)
+            .join(ListingSource, ListingSource.id == CrawlRun.source_id)
+            .where(
+                ListingSource.name == source_name,
+                CrawlRun.region_key == region_key,
+                CrawlRun.query_text == query_text,
+                CrawlRun.finished_at.is_not(None),
+            )
+            .order_by(CrawlRun.id.desc())
+        ).scalars().first()
+        if not run:
+            logger.info("No finished crawl runs for %s %s %r", source_name, region_key, query_text)
+            return
+        swept = sweep_unseen_listings(db, run)
+        promoted = reelect_canonicals(db) if swept else []
+        # Re-election repoints every member of the promoted clusters, so their pages change too.
+        reassigned = (
+            db.execute(
+                select(NormalizedListing.id, NormalizedListing.state).where(
+                    or_(NormalizedListing.canonical_listing_id.in_(promoted), NormalizedListing.id.in_(promoted))
                 )
-                db.add(seller)
-
-            seller.reputation_medal = data.get("seller_medal") or seller.reputation_medal
-            seller.reputation_score = data.get("seller_score") or seller.reputation_score
-            seller.cancellations = data.get("seller_cancellations") or seller.cancellations
-            seller.response_time_hours = data.get("seller_response_time_hours") or seller.response_time_hours
-            seller.completed_sales = data.get("seller_completed_sales") or seller.completed_sales
-
-        final_price = apply_markup(price or 0)
-        normalized = NormalizedListing(
-            source_id=raw.source_id,
-            external_id=external_id,
-            brand=data.get("brand"),
-            model=data.get("model"),
-            trim=data.get("trim"),
-            year=data.get("year"),
-            mileage_km=data.get("mileage_km"),
-            price_brl=price,
-            supplier_price_brl=price,
-            final_price_brl=final_price,
-            city=data.get("city"),
-            state=data.get("state"),
-            photos=data.get("photos"),
-            url=data.get("url"),
-            seller_type=data.get("seller_type"),
-            seller_id=data.get("seller_id"),
-            seller_reputation=data.get("seller_reputation"),
-            status="active",
+            ).all()
+            if promoted
+            else []
         )
-        db.add(normalized)
         db.commit()
-        if seller:
-            consolidate_seller_stats(db)
-        logger.info("Normalized listing %s", raw_id)
+        changed = [*swept, *reassigned]
+        invalidate_listing_responses([row[0] for row in changed], [row[1] for row in changed])
+        logger.info("Marked %s listings inactive for %s %s %r", len(swept), source_name, region_key, query_text)
+
+
+@track_job
+def flag_price_drops(crawl_run_id: int) -> None:
+    """Run the drop detector over the listings seen by one crawl and store what it finds.
+
+    Ingestion enqueues it behind the run's `normalize_crawl_run`, so prices are current.
+    """
+    with SessionLocal() as db:
+        listing_ids = db.execute(
+            select(NormalizedListing.id).where(NormalizedListing.last_seen_run_id == crawl_run_id)
+        ).scalars().all()
+        drops = detect_price_drops(db, listing_ids)
+        recorded = record_price_drops(db, crawl_run_id, drops)
+        db.commit()
+        for drop in sorted(drops, key=lambda item: item.drop, reverse=True):
+            logger.info(
+                "Listing %s dropped %.1f%% (%.2f -> %.2f)",
+                drop.listing_id,
+                drop.drop * 100,
+                drop.previous_price,
+                drop.current_price,
+            )
+        logger.info(
+            "Crawl run %s: %s price drops among %s listings, %s newly recorded",
+            crawl_run_id,
+            len(drops),
+            len(listing_ids),
+            recorded,
+        )
+
+
+@track_job
+def archive_raw_listings() -> None:
+    """Move superseded raw payloads to compressed cold storage and purge archives past retention."""
+    with SessionLocal() as db:
+        archived = archive_superseded_payloads(db)
+        purged = purge_archive(db)
+        logger.info("Archived %s raw payloads, purged %s past retention", archived, purged)
+
+
+@track_job
+def reparse_html_pages(source_name: str, max_workers: int | None = None) -> None:
+    """Re-extract listings from stored detail HTML with the current parser, without crawling."""
+    with SessionLocal() as db:
+        reparsed = reparse_stored_pages(db, source_name, max_workers=max_workers)
+        db.commit()
+        # A corrected price or model can change the score and which alerts the listing matches;
+        # match_new_listings skips pairs already queued.
+        _score_and_match(db, reparsed.listing_ids, set(reparsed.listing_ids))
+        invalidate_listing_responses(reparsed.listing_ids, reparsed.regions)
+        logger.info("Reparsed %s %s listings from stored pages", len(reparsed.listing_ids), source_name)
 
 
+@track_job
 def recompute_market_stats(region_key: str, model_key: str) -> None:
     with SessionLocal() as db:
         stats = db.execute(
@@ -177,16 +403,93 @@ def recompute_market_stats(region_key: str, model_key: str) -> None:
         stats.p75 = computed.p75
         stats.updated_at = datetime.utcnow()
         db.commit()
+        invalidate_feed_responses(region_key)
         logger.info("Recomputed market stats for %s", model_key)
 
 
+@track_job
+def geocode_listings(batch_size: int = 5000) -> None:
+    """Backfill coordinates and geohash cells from the offline gazetteer in bulk."""
+    updated = 0
+    last_id = 0
+    with SessionLocal() as db:
+        while True:
+            rows = db.execute(
+                select(NormalizedListing.id, NormalizedListing.city, NormalizedListing.state)
+                .where(NormalizedListing.geohash.is_(None), NormalizedListing.id > last_id)
+                .order_by(NormalizedListing.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            changes = []
+            for row in rows:
+                coordinates = geocode_city(row.city, row.state)
+                if coordinates:
+                    lat, lng = coordinates
+                    changes.append({"id": row.id, "lat": lat, "lng": lng, "geohash": encode_geohash(lat, lng)})
+            if changes:
+                db.execute(update(NormalizedListing), changes)
+                db.commit()
+                updated += len(changes)
+    logger.info("Geocoded %s listings", updated)
+
+
+@track_job
+def rebuild_listing_search_index() -> None:
+    with SessionLocal() as db:
+        indexed = rebuild_search_index(db)
+        db.commit()
+        logger.info("Rebuilt search index with %s listings", indexed)
+
+
+@track_job
+def deliver_alert_matches(batch_size: int = 500) -> None:
+    """Drain the alert_matches outbox, one digest per user per batch."""
+    delivered = 0
+    with SessionLocal() as db:
+        while True:
+            pending = db.execute(
+                select(AlertMatch.id, AlertMatch.listing_id, Alert.user_id)
+                .join(Alert, Alert.id == AlertMatch.alert_id)
+                .where(AlertMatch.delivered_at.is_(None))
+                .order_by(AlertMatch.id)
+                .limit(batch_size)
+            ).all()
+            if not pending:
+                break
+            digests: dict[int, list[int]] = {}
+            for match in pending:
+                digests.setdefault(match.user_id, []).append(match.listing_id)
+            for user_id, listing_ids in digests.items():
+                logger.info("Alert digest for user %s: listings %s", user_id, sorted(set(listing_ids)))
+            now = datetime.utcnow()
+            db.execute(update(AlertMatch), [{"id": match.id, "delivered_at": now} for match in pending])
+            db.commit()
+            delivered += len(pending)
+    logger.info("Delivered %s alert matches", delivered)
+
+
+@track_job
+def refit_depreciation_models() -> None:
+    with SessionLocal() as db:
+        fitted = fit_depreciation_models(db)
+        logger.info("Fitted %s depreciation segments", fitted)
+
+
+@track_job
 def daily_opportunities(region_key: str) -> None:
     with SessionLocal() as db:
-        listings = db.execute(select(NormalizedListing).where(NormalizedListing.state == region_key)).scalars().all()
-        logger.info("Found %s listings for opportunities", len(listings))
+        scored = score_region_opportunities(db, region_key)
+        db.commit()
+        invalidate_region_responses(region_key)
+        logger.info("Scored %s listings for opportunities in %s", scored, region_key)
 
 
+@track_job
 def refresh_seller_statistics() -> None:
     with SessionLocal() as db:
         consolidate_seller_stats(db)
-        logger.info("Consolidated seller stats")
+        ranked = get_seller_leaderboard().rebuild(db)
+        logger.info("Consolidated seller stats and ranked %s sellers", ranked)
@@ -0,0 +1,20 @@
+from rq import Worker
+from rq.job import Job
+from rq.queue import Queue
+
+from app.core.metrics import mark_process_dead
+
+
+class MetricsWorker(Worker):
+    """RQ worker that retires each work-horse's Prometheus files once the horse has exited.
+
+    Horses are forked per job and leave with `os._exit`, so nothing inside them can clean up;
+    the parent does it after `waitpid`. Run with `rq worker -w app.workers.worker.MetricsWorker`.
+    """
+
+    def monitor_work_horse(self, job: Job, queue: Queue) -> None:
+        pid = self.horse_pid
+        try:
+            super().monitor_work_horse(job, queue)
+        finally:
+            mark_process_dead(pid)
@@ -0,0 +1 @@
+# Benchmarks and load-test tooling; run from backend/ with `python -m benchmarks.<name>`.
@@ -0,0 +1,127 @@
+"""Compare sync (threadpool) and async (AsyncSession) handlers under concurrency.
+
+Both sides run the listing detail handler without the shared response cache: the async side is
+the real `GET /v1/listings/{id}` route, the sync side the same query, ETag and encoding on a sync
+session in the threadpool. Only the database path differs, and Redis is not needed.
+
+Usage: python -m benchmarks.bench_db_paths --requests 2000 --concurrency 200
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+from typing import Annotated
+
+import httpx
+from fastapi import Depends, FastAPI, HTTPException, Request, Response, status
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.api import listings
+from app.api.deps import get_async_db
+from app.api.http_cache import etag_matches, listing_etag, not_modified, validator_headers
+from app.api.serialization import LISTING_OUT_COLUMNS, PreEncodedJSONResponse, dump_listing
+from app.core.config import get_settings
+from app.db.base import Base
+from app.models.listing import NormalizedListing
+from app.schemas.listing import ListingOut
+
+
+def _seed(url: str, rows: int) -> None:
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.add_all(
+            NormalizedListing(
+                source_id=1,
+                external_id=str(i),
+                brand="Honda",
+                model="Civic",
+                price_brl=90000 + i,
+                final_price_brl=95000 + i,
+                state="SP",
+                photos=[f"https://example.com/{i}.jpg"],
+            )
+            for i in range(rows)
+        )
+        db.commit()
+    engine.dispose()
+
+
+def _sync_app(url: str, pool_size: int) -> FastAPI:
+    engine = create_engine(url, pool_size=pool_size, connect_args={"check_same_thread": False})
+    factory = sessionmaker(bind=engine)
+
+    def get_db():
+        with factory() as db:
+            yield db
+
+    app = FastAPI()
+
+    @app.get("/v1/listings/{listing_id}", response_model=ListingOut)
+    def get_listing(listing_id: int, request: Request, db: Annotated[Session, Depends(get_db)]) -> Response:
+        # Mirrors app.api.listings.get_listing on a cache miss.
+        cache_control = f"public, max-age={get_settings().listing_cache_max_age_seconds}"
+        row = db.execute(select(*LISTING_OUT_COLUMNS).where(NormalizedListing.id == listing_id)).mappings().first()
+        if not row:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Listing not found")
+        etag = listing_etag(row["id"], row["updated_at"])
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return not_modified(etag, cache_control)
+        return PreEncodedJSONResponse(dump_listing(row), headers=validator_headers(etag, cache_control))
+
+    return app
+
+
+def _async_app(url: str, pool_size: int) -> FastAPI:
+    engine = create_async_engine(url.replace("sqlite://", "sqlite+aiosqlite://"), pool_size=pool_size)
+    factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+
+    async def get_db():
+        async with factory() as db:
+            yield db
+
+    # The route reads the cache through this module-level name; without it every request would
+    # also measure a Redis round trip (or a failed connect when Redis is not running).
+    listings.get_response_cache = lambda: None
+    app = FastAPI()
+    app.include_router(listings.router)
+    app.dependency_overrides[get_async_db] = get_db
+    return app
+
+
+async def _drive(app: FastAPI, total: int, concurrency: int, rows: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    semaphore = asyncio.Semaphore(concurrency)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def one(i: int) -> None:
+            async with semaphore:
+                response = await client.get(f"/v1/listings/{i % rows + 1}")
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        return total / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--rows", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{Path(tmp) / 'bench.db'}"
+        _seed(url, args.rows)
+        apps = (("sync", _sync_app(url, args.concurrency)), ("async", _async_app(url, args.concurrency)))
+        for label, app in apps:
+            rps = asyncio.run(_drive(app, args.requests, args.concurrency, args.rows))
+            print(f"{label:>5}: {rps:8.1f} req/s (concurrency={args.concurrency})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""Connector parser and pricing micro-benchmarks with stored baselines.
+
+Reports µs/op and peak traced allocation per call over size-representative pages
+(see benchmarks/corpus.py). `--check` exits non-zero when a case is slower than its
+baseline by more than `--threshold`, or when a case was skipped or has no baseline;
+`--update-baseline` records the current numbers.
+
+Usage: python -m benchmarks.bench_parsers [--check] [--update-baseline] [--corpus DIR]
+"""
+
+import argparse
+import importlib
+import json
+import sys
+import timeit
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+from xml.etree import ElementTree
+
+from benchmarks.corpus import load_corpus, write_corpus
+
+BASELINE_PATH = Path(__file__).parent / "baselines" / "parsers.json"
+DEFAULT_THRESHOLD = 0.25
+
+RAW_PAYLOAD = {
+    "id": "MLB123456789",
+    "brand": "vw",
+    "model": "nivus highline",
+    "title": "Volkswagen Nivus Highline 2022",
+    "year": "2022",
+    "mileage_km": 31000,
+    "price": "129900",
+    "city": "Curitiba",
+    "state": "PR",
+    "seller_type": "dealer",
+    "photos": [f"https://img.example.com/{n}.jpg" for n in range(12)],
+}
+
+
+@dataclass
+class Case:
+    name: str
+    target: str
+    make_args: Callable[[dict[str, str]], tuple]
+
+
+# Mercado Livre lives under two module names in this tree; the first that imports wins.
+ML_MODULES = ("app.connectors.mercadolivre", "app.connectors.mercado_livre")
+
+
+CASES = [
+    Case(
+        "olx.parse_search_results",
+        "app.connectors.olx:parse_search_results",
+        lambda p: (p["olx_search"],),
+    ),
+    Case(
+        "olx.parse_listing_detail",
+        "app.connectors.olx:parse_listing_detail",
+        lambda p: (p["olx_detail"],),
+    ),
+    Case("ml.parse_search_results", "ML:parse_search_results", lambda p: (p["ml_search"],)),
+    Case("ml.parse_listing_detail", "ML:parse_listing_detail", lambda p: (p["ml_detail"],)),
+    Case(
+        "ml._extract_seller_metadata",
+        "ML:_extract_seller_metadata",
+        lambda p: (ElementTree.fromstring(p["ml_detail"]),),
+    ),
+    Case(
+        "normalization.normalize_listing_fields",
+        "app.services.normalization:normalize_listing_fields",
+        lambda p: (RAW_PAYLOAD,),
+    ),
+    Case(
+        "pricing.apply_markup", "app.services.pricing:apply_markup", lambda p: (129900.0, "premium")
+    ),
+    Case(
+        "pricing.compute_opportunity_badge",
+        "app.services.pricing:compute_opportunity_badge",
+        lambda p: (118000.0, 130000.0, 121000.0),
+    ),
+]
+
+
+def _resolve(target: str) -> Callable:
+    module_name, _, attribute = target.partition(":")
+    candidates = ML_MODULES if module_name == "ML" else (module_name,)
+    errors = []
+    for candidate in candidates:
+        try:
+            return getattr(importlib.import_module(candidate), attribute)
+        except Exception as exc:  # noqa: BLE001 - report a broken connector, keep timing the rest
+            errors.append(f"{candidate}: {type(exc).__name__}: {exc}")
+    raise ImportError("; ".join(errors))
+
+
+def _peak_kib(func: Callable, args: tuple) -> float:
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+
+def run_case(case: Case, pages: dict[str, str], min_seconds: float) -> Optional[dict[str, float]]:
+    try:
+        func = _resolve(case.target)
+    except ImportError as exc:
+        print(f"{case.name:>40}: skipped ({exc})")
+        return None
+    args = case.make_args(pages)
+    timer = timeit.Timer(lambda: func(*args))
+    number, elapsed = timer.autorange()
+    while elapsed < min_seconds:
+        number *= 2
+        elapsed = timer.timeit(number)
+    best = min([elapsed] + timer.repeat(repeat=2, number=number))
+    result = {
+        "us_per_op": round(best / number * 1e6, 3),
+        "peak_kib": round(_peak_kib(func, args), 1),
+    }
+    print(f"{case.name:>40}: {result['us_per_op']:12.2f} µs/op {result['peak_kib']:10.1f} KiB peak")
+    return result
+
+
+def check_regressions(
+    results: dict[str, dict],
+    baseline: dict[str, dict],
+    threshold: float,
+    expected: Iterable[str] = (),
+) -> list[str]:
+    """Cases slower than baseline by more than threshold, plus every case that was not compared.
+
+    A case in `expected` or the baseline that did not run (e.g. its module failed to import), or
+    one without a baseline entry, fails the check rather than passing unmeasured.
+    """
+    regressions = []
+    for name in sorted(set(expected) | set(baseline)):
+        if name not in results:
+            regressions.append(f"{name}: not measured (skipped)")
+        elif name not in baseline:
+            regressions.append(f"{name}: no baseline entry; record one with --update-baseline")
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference and result["us_per_op"] > reference["us_per_op"] * (1 + threshold):
+            ratio = result["us_per_op"] / reference["us_per_op"]
+            regressions.append(
+                f"{name}: {result['us_per_op']:.2f} µs/op vs {reference['us_per_op']:.2f} ({ratio:.2f}x)"
+            )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--corpus",
+        type=Path,
+        help="directory of recorded <name>.html pages overriding synthetic ones",
+    )
+    parser.add_argument(
+        "--write-corpus", type=Path, help="write the synthetic pages to this directory and exit"
+    )
+    parser.add_argument(
+        "--min-seconds", type=float, default=0.5, help="minimum timed duration per case"
+    )
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument(
+        "--check", action="store_true", help="fail when a case regresses past --threshold"
+    )
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    if args.write_corpus:
+        write_corpus(args.write_corpus)
+        return
+
+    pages = load_corpus(args.corpus)
+    for name, html in pages.items():
+        print(f"{name:>40}: {len(html.encode('utf-8')) / 1024:8.1f} KiB")
+    results = {}
+    for case in CASES:
+        result = run_case(case, pages, args.min_seconds)
+        if result is not None:
+            results[case.name] = result
+    skipped = [case.name for case in CASES if case.name not in results]
+
+    if args.update_baseline:
+        if skipped:
+            sys.exit(f"Not writing a baseline without {', '.join(skipped)}")
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline written to {args.baseline}")
+    if args.check:
+        baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+        regressions = check_regressions(
+            results, baseline, args.threshold, expected=[case.name for case in CASES]
+        )
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.threshold:.0%} of baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Serialization cost per listing: ORM + from_attributes validation vs precompiled mapping path.
+
+Usage: python -m benchmarks.bench_serialization --listings 20 --rounds 2000
+"""
+import argparse
+import datetime as dt
+import json
+import timeit
+from types import SimpleNamespace
+
+from fastapi.encoders import jsonable_encoder
+
+from app.api.serialization import dump_opportunities
+from app.schemas.listing import OpportunityResponse
+
+
+def _rows(count: int) -> list[dict]:
+    now = dt.datetime(2024, 5, 10, 12, 0, 0)
+    return [
+        {
+            "id": i,
+            "brand": "BMW",
+            "model": "X1",
+            "trim": "xDrive",
+            "year": 2022,
+            "mileage_km": 22000 + i,
+            "price_brl": 190000.0,
+            "final_price_brl": 185000.0,
+            "city": "São Paulo",
+            "state": "SP",
+            "photos": [f"https://img.example.com/{i}/{n}.jpg" for n in range(12)],
+            "url": f"https://example.com/listing/{i}",
+            "seller_type": "dealer",
+            "seller_id": 55,
+            "status": "active",
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in range(count)
+    ]
+
+
+def _legacy(objects: list[SimpleNamespace]) -> bytes:
+    response = OpportunityResponse.model_validate({"items": objects, "count": len(objects)}, from_attributes=True)
+    return json.dumps(jsonable_encoder(response)).encode()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--listings", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    rows = _rows(args.listings)
+    badges = ["Selected by AXIS"] * len(rows)
+    objects = [SimpleNamespace(**row, badge=badge) for row, badge in zip(rows, badges, strict=True)]
+
+    cases = {
+        "orm+jsonable_encoder": lambda: _legacy(objects),
+        "mappings+type_adapter": lambda: dump_opportunities(rows, badges),
+    }
+    for label, func in cases.items():
+        seconds = min(timeit.repeat(func, number=args.rounds, repeat=3))
+        per_listing_us = seconds / args.rounds / len(rows) * 1e6
+        print(f"{label:>24}: {per_listing_us:7.2f} µs/listing")
+
+
+if __name__ == "__main__":
+    main()
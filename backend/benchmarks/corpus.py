@@ -0,0 +1,224 @@
+"""Size-representative marketplace pages for the parser benchmarks.
+
+Real detail pages weigh a few hundred KB, mostly navigation, related-ad carousels and
+inline state scripts; search pages carry ~50 result cards. The app fixtures are a few
+hundred bytes, so parser costs measured on them say nothing about production. These
+builders wrap the same markup the parsers look for in that bulk, deterministically, as
+well-formed XHTML (the parsers use ElementTree). Pages recorded from the HTML store can
+replace them by name through `load_corpus`.
+"""
+
+import json
+import random
+from html import escape
+from pathlib import Path
+from typing import Optional
+
+DETAIL_TARGET_BYTES = 350_000
+SEARCH_RESULTS = 48
+
+_BRANDS = [
+    ("Honda", "Civic"),
+    ("Toyota", "Corolla"),
+    ("Volkswagen", "Nivus"),
+    ("Jeep", "Compass"),
+    ("Fiat", "Argo"),
+]
+_CITIES = [("São Paulo", "SP"), ("Campinas", "SP"), ("Rio de Janeiro", "RJ"), ("Curitiba", "PR")]
+_WORDS = (
+    "carro revisado único dono manual chave reserva ipva pago laudo aprovado pneus novos".split()
+)
+
+
+def _script_json(payload: object) -> str:
+    # Keep the JSON valid inside XHTML: no raw '<' or '&' in script bodies.
+    return json.dumps(payload, ensure_ascii=False).replace("<", "\\u003c").replace("&", "\\u0026")
+
+
+def _navigation(rng: random.Random, links: int) -> str:
+    items = "".join(
+        f'<li><a href="https://www.example.com/c/{rng.randrange(10**6)}">{escape(rng.choice(_WORDS).title())}</a></li>'
+        for _ in range(links)
+    )
+    return f'<nav class="nav-menu"><ul>{items}</ul></nav>'
+
+
+def _carousel(rng: random.Random, cards: int, domain: str) -> str:
+    blocks = []
+    for _ in range(cards):
+        brand, model = rng.choice(_BRANDS)
+        blocks.append(
+            f'<div class="related-card"><img src="https://img.{domain}/{rng.randrange(10**8)}.webp" alt="" />'
+            f'<span class="related-title">{brand} {model}</span>'
+            f'<span class="related-price">R$ {rng.randrange(40, 300)}.{rng.randrange(100, 999)}</span></div>'
+        )
+    return f'<section class="related">{"".join(blocks)}</section>'
+
+
+def _state_script(rng: random.Random, size: int, seller: Optional[dict] = None) -> str:
+    state: dict = {"components": [], "tracking": {"session": rng.randrange(10**12)}}
+    if seller:
+        state["seller"] = seller
+    while len(json.dumps(state)) < size:
+        state["components"].append(
+            {
+                "id": f"component-{len(state['components'])}",
+                "type": rng.choice(["carousel", "spec", "banner", "questions"]),
+                "text": " ".join(rng.choices(_WORDS, k=24)),
+                "values": [rng.randrange(10**6) for _ in range(12)],
+            }
+        )
+    return f"<script>window.__PRELOADED_STATE__ = {_script_json(state)};</script>"
+
+
+def _padding_bytes(page_without_state: str) -> int:
+    return max(DETAIL_TARGET_BYTES - len(page_without_state.encode("utf-8")), 10_000)
+
+
+def olx_detail_page(seed: int = 1) -> str:
+    rng = random.Random(seed)
+    brand, model = rng.choice(_BRANDS)
+    city, state = rng.choice(_CITIES)
+    year, price, mileage = (
+        rng.randrange(2012, 2024),
+        rng.randrange(40, 300) * 1000,
+        rng.randrange(5, 150) * 1000,
+    )
+    listing_id = f"IDOLX{rng.randrange(10**8)}"
+    ld_json = {
+        "@context": "https://schema.org",
+        "@type": "Product",
+        "name": f"{brand} {model} {year}",
+        "brand": brand,
+        "model": model,
+        "offers": {"price": str(price)},
+        "image": [f"https://img.olx.com.br/images/{rng.randrange(10**8)}.jpg" for _ in range(12)],
+        "url": f"https://www.olx.com.br/autos/{listing_id}",
+    }
+    features = [
+        ("Ano", str(year)),
+        ("Quilometragem", f"{mileage:,} km".replace(",", ".")),
+        ("Marca", brand),
+        ("Modelo", model),
+    ]
+    features += [(rng.choice(_WORDS).title(), rng.choice(_WORDS)) for _ in range(20)]
+    body = (
+        f'<h1 data-testid="ad-title">{brand} {model} {year}</h1>'
+        f'<span data-testid="ad-price">R$ {price:,}</span>'.replace(",", ".")
+        + '<ul data-testid="ad-features">'
+        + "".join(
+            f"<li><span>{escape(label)}</span><span>{escape(value)}</span></li>"
+            for label, value in features
+        )
+        + "</ul>"
+        + f'<div data-testid="ad-location">{city}, {state}</div>'
+        + f'<p class="ad-description">{escape(" ".join(rng.choices(_WORDS, k=300)))}</p>'
+    )
+    head = (
+        f"<head><title>{brand} {model} {year}</title>"
+        f'<link rel="canonical" href="https://www.olx.com.br/autos/{listing_id}" />'
+        f'<script type="application/ld+json">{_script_json(ld_json)}</script></head>'
+    )
+    shell = f"<html>{head}<body>{_navigation(rng, 250)}{body}{_carousel(rng, 24, 'olx.com.br')}</body></html>"
+    state_script = _state_script(rng, _padding_bytes(shell))
+    return shell.replace("</body>", f"{state_script}</body>")
+
+
+def olx_search_page(seed: int = 2, results: int = SEARCH_RESULTS) -> str:
+    rng = random.Random(seed)
+    cards = "".join(
+        f'<div class="ad-card"><a data-testid="ad-card-link" '
+        f'href="https://www.olx.com.br/autos/IDOLX{rng.randrange(10**8)}?lis=listing_{index}">'
+        f'<img src="https://img.olx.com.br/thumbs/{rng.randrange(10**8)}.jpg" alt="" />'
+        f"<span>{' '.join(rng.choice(_BRANDS))}</span></a></div>"
+        for index in range(results)
+    )
+    body = f"{_navigation(rng, 250)}<main>{cards}</main>{_carousel(rng, 12, 'olx.com.br')}"
+    return f"<html><body>{body}{_state_script(rng, 120_000)}</body></html>"
+
+
+def ml_detail_page(seed: int = 3) -> str:
+    rng = random.Random(seed)
+    brand, model = rng.choice(_BRANDS)
+    city, state = rng.choice(_CITIES)
+    year, price, mileage = (
+        rng.randrange(2012, 2024),
+        rng.randrange(40, 300) * 1000,
+        rng.randrange(5, 150) * 1000,
+    )
+    listing_id = f"MLB{rng.randrange(10**9)}"
+    ld_json = {
+        "@context": "http://schema.org",
+        "@type": "Product",
+        "name": f"{brand} {model} {year}",
+        "offers": {"@type": "Offer", "price": price},
+        "image": [f"https://http2.mlstatic.com/D_{rng.randrange(10**8)}-O.webp" for _ in range(12)],
+        "areaServed": {"addressLocality": city, "addressRegion": state},
+    }
+    seller = {
+        "sellerId": str(rng.randrange(10**8)),
+        "powerSellerStatus": "platinum",
+        "transparencyScore": 4.7,
+        "cancellations": 2,
+        "completed": 380,
+        "responseTime": 1.5,
+    }
+    specs = [("Quilometragem", f"{mileage} km"), ("Ano", str(year))]
+    specs += [(rng.choice(_WORDS).title(), rng.choice(_WORDS)) for _ in range(30)]
+    rows = "".join(
+        f'<tr class="ui-vpp-striped-specs__table-row"><th>{escape(label)}</th><td>{escape(value)}</td></tr>'
+        for label, value in specs
+    )
+    body = (
+        f'<ol class="ui-pdp-breadcrumb"><li>Carros</li><li>{brand}</li><li>{city}, {state}</li></ol>'
+        f'<h1 class="ui-pdp-title">{brand} {model} {year}</h1>'
+        f'<span class="andes-money-amount__fraction">{price:,}</span>'.replace(",", ".")
+        + f"<table>{rows}</table>"
+        + f'<p class="ui-pdp-description__content">{escape(" ".join(rng.choices(_WORDS, k=300)))}</p>'
+    )
+    head = (
+        f"<head><title>{brand} {model}</title>"
+        f'<link rel="canonical" href="https://carro.mercadolivre.com.br/{listing_id}-fi" />'
+        f'<script type="application/ld+json">{_script_json(ld_json)}</script></head>'
+    )
+    shell = f"<html>{head}<body>{_navigation(rng, 300)}{body}{_carousel(rng, 30, 'mlstatic.com')}</body></html>"
+    state_script = _state_script(rng, _padding_bytes(shell), seller=seller)
+    return shell.replace("</body>", f"{state_script}</body>")
+
+
+def ml_search_page(seed: int = 4, results: int = SEARCH_RESULTS) -> str:
+    rng = random.Random(seed)
+    cards = "".join(
+        f'<li class="ui-search-layout__item"><div class="ui-search-result">'
+        f'<a class="ui-search-link" href="https://carro.mercadolivre.com.br/MLB{rng.randrange(10**9)}-fi?tracking_id={index}">'
+        f"{' '.join(rng.choice(_BRANDS))}</a>"
+        f'<span class="andes-money-amount__fraction">{rng.randrange(40, 300)}.000</span></div></li>'
+        for index in range(results)
+    )
+    body = f'{_navigation(rng, 300)}<ol class="ui-search-layout">{cards}</ol>'
+    return f"<html><body>{body}{_state_script(rng, 150_000)}</body></html>"
+
+
+BUILDERS = {
+    "olx_detail": olx_detail_page,
+    "olx_search": olx_search_page,
+    "ml_detail": ml_detail_page,
+    "ml_search": ml_search_page,
+}
+
+
+def load_corpus(directory: Optional[Path] = None) -> dict[str, str]:
+    """Synthetic pages, replaced by `<name>.html` files from `directory` when present."""
+    pages = {name: build() for name, build in BUILDERS.items()}
+    if directory:
+        for name in pages:
+            recorded = Path(directory) / f"{name}.html"
+            if recorded.exists():
+                pages[name] = recorded.read_text(encoding="utf-8")
+    return pages
+
+
+def write_corpus(directory: Path) -> None:
+    directory.mkdir(parents=True, exist_ok=True)
+    for name, html in load_corpus().items():
+        (directory / f"{name}.html").write_text(html, encoding="utf-8")
@@ -0,0 +1,225 @@
+"""Closed-loop HTTP load test of the read endpoints and the Axis Bot chat.
+
+Each of `--concurrency` workers picks an endpoint from the weighted mix, sends the request and
+immediately sends the next one until `--duration` elapses; requests issued during `--warmup`
+are not recorded. Run it against a server started on a database filled by
+benchmarks.synthetic_data, with `RATE_LIMIT_PER_MINUTE` raised far above the expected request
+count, otherwise most responses are 429s.
+
+Latency of failing requests says nothing about the endpoint, so the run exits with status 1
+when any endpoint's error rate (non-2xx responses and transport errors) exceeds
+`--max-error-rate`, 0 by default.
+
+Usage: python -m benchmarks.load_test --base-url http://localhost:8000 --concurrency 64 --duration 60
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Optional
+
+import httpx
+import numpy as np
+
+DEFAULT_MIX = "opportunities=3,listing=10,trusted_sellers=2,axis_bot_chat=1"
+REGIONS = ["SP", "RJ", "MG", "PR", "RS", "SC", "BA", "GO", "DF", "PE"]
+CHAT_MESSAGES = [
+    "Quero um SUV automático até 150 mil",
+    "Procuro um sedã econômico para família",
+    "Tem alguma picape diesel com baixa quilometragem?",
+    "Qual a melhor oportunidade em São Paulo hoje?",
+]
+
+RequestSpec = tuple[str, str, Optional[dict]]
+
+
+@dataclass
+class EndpointStats:
+    latencies_ms: list[float] = field(default_factory=list)
+    statuses: Counter = field(default_factory=Counter)
+    errors: int = 0
+
+    def summary(self, elapsed: float) -> dict:
+        latencies = np.array(self.latencies_ms) if self.latencies_ms else np.zeros(1)
+        p50, p90, p99 = np.percentile(latencies, [50, 90, 99])
+        ok = sum(count for code, count in self.statuses.items() if 200 <= code < 300)
+        return {
+            "requests": len(self.latencies_ms),
+            "ok": ok,
+            "errors": len(self.latencies_ms) - ok + self.errors,
+            "rps": round(len(self.latencies_ms) / elapsed, 1),
+            "p50_ms": round(float(p50), 2),
+            "p90_ms": round(float(p90), 2),
+            "p99_ms": round(float(p99), 2),
+            "max_ms": round(float(latencies.max()), 2),
+            "statuses": {str(code): count for code, count in sorted(self.statuses.items())},
+        }
+
+
+def _endpoints(max_listing_id: int) -> dict[str, Callable[[random.Random], RequestSpec]]:
+    return {
+        "opportunities": lambda rng: (
+            "GET",
+            f"/v1/opportunities?region={rng.choice(REGIONS)}",
+            None,
+        ),
+        "listing": lambda rng: ("GET", f"/v1/listings/{rng.randint(1, max_listing_id)}", None),
+        "trusted_sellers": lambda rng: (
+            "GET",
+            f"/v1/trusted-sellers?limit={rng.choice([10, 20, 50])}",
+            None,
+        ),
+        "axis_bot_chat": lambda rng: (
+            "POST",
+            "/v1/axis-bot/chat",
+            {
+                "session_id": str(uuid.UUID(int=rng.getrandbits(128))),
+                "message": rng.choice(CHAT_MESSAGES),
+            },
+        ),
+    }
+
+
+def parse_mix(mix: str) -> dict[str, float]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        weights[name.strip()] = float(weight or 1)
+    return weights
+
+
+async def run_load(
+    base_url: str,
+    concurrency: int,
+    duration: float,
+    warmup: float,
+    mix: dict[str, float],
+    max_listing_id: int,
+    timeout: float = 30.0,
+    seed: int = 7,
+) -> tuple[dict[str, EndpointStats], float]:
+    endpoints = _endpoints(max_listing_id)
+    unknown = set(mix) - set(endpoints)
+    if unknown:
+        raise ValueError(f"Unknown endpoints in mix: {', '.join(sorted(unknown))}")
+    names, weights = list(mix), list(mix.values())
+    stats: dict[str, EndpointStats] = defaultdict(EndpointStats)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=timeout) as client:
+        started = time.perf_counter()
+        record_from, stop_at = started + warmup, started + warmup + duration
+
+        async def worker(worker_id: int) -> None:
+            rng = random.Random(seed * 10_007 + worker_id)
+            while (now := time.perf_counter()) < stop_at:
+                name = rng.choices(names, weights)[0]
+                method, path, body = endpoints[name](rng)
+                try:
+                    response = await client.request(method, path, json=body)
+                    code: Optional[int] = response.status_code
+                except httpx.HTTPError:
+                    code = None
+                if now < record_from:
+                    continue
+                entry = stats[name]
+                entry.latencies_ms.append((time.perf_counter() - now) * 1000)
+                if code is None:
+                    entry.errors += 1
+                else:
+                    entry.statuses[code] += 1
+
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - record_from
+    return stats, elapsed
+
+
+def report(stats: dict[str, EndpointStats], elapsed: float) -> dict[str, dict]:
+    summaries = {name: entry.summary(elapsed) for name, entry in sorted(stats.items())}
+    combined = EndpointStats()
+    for entry in stats.values():
+        combined.latencies_ms.extend(entry.latencies_ms)
+        combined.statuses.update(entry.statuses)
+        combined.errors += entry.errors
+    summaries["total"] = combined.summary(elapsed)
+
+    print(
+        f"{'endpoint':>16} {'requests':>9} {'errors':>7} {'req/s':>9} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8}"
+    )
+    for name, row in summaries.items():
+        print(
+            f"{name:>16} {row['requests']:>9} {row['errors']:>7} {row['rps']:>9.1f} "
+            f"{row['p50_ms']:>8.2f} {row['p90_ms']:>8.2f} {row['p99_ms']:>8.2f} {row['max_ms']:>8.2f}"
+        )
+    return summaries
+
+
+def failing_endpoints(summaries: dict[str, dict], max_error_rate: float) -> dict[str, float]:
+    """Error rate of every endpoint above the threshold; the `total` row is not judged on its own."""
+    rates = {
+        name: row["errors"] / row["requests"] if row["requests"] else 1.0
+        for name, row in summaries.items()
+        if name != "total"
+    }
+    return {name: rate for name, rate in rates.items() if rate > max_error_rate}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=30, help="recorded seconds")
+    parser.add_argument(
+        "--warmup", type=float, default=5, help="unrecorded seconds before measuring"
+    )
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="comma-separated endpoint=weight pairs")
+    parser.add_argument(
+        "--max-listing-id", type=int, default=100_000, help="listing ids are drawn from 1..N"
+    )
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", type=Path, help="also write the summary to this file")
+    parser.add_argument(
+        "--max-error-rate",
+        type=float,
+        default=0.0,
+        help="fail when an endpoint's share of non-2xx or failed requests is above this",
+    )
+    args = parser.parse_args()
+
+    stats, elapsed = asyncio.run(
+        run_load(
+            args.base_url,
+            args.concurrency,
+            args.duration,
+            args.warmup,
+            parse_mix(args.mix),
+            args.max_listing_id,
+            args.timeout,
+            args.seed,
+        )
+    )
+    summaries = report(stats, elapsed)
+    if args.json:
+        payload = {
+            "base_url": args.base_url,
+            "concurrency": args.concurrency,
+            "duration_s": round(elapsed, 2),
+        }
+        args.json.write_text(json.dumps({**payload, "endpoints": summaries}, indent=2) + "\n")
+    failing = failing_endpoints(summaries, args.max_error_rate)
+    if failing:
+        details = ", ".join(f"{name} {rate:.1%}" for name, rate in sorted(failing.items()))
+        raise SystemExit(f"error rate above {args.max_error_rate:.1%}: {details}")
+
+
+if __name__ == "__main__":
+    main()
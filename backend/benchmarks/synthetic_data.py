@@ -0,0 +1,409 @@
+"""Fill the schema with a synthetic marketplace at production scale.
+
+Listings follow per-model depreciation with mileage and noise, sit around real city centroids
+from the offline gazetteer and point at generated sellers; market stats and seller stats are
+derived from the generated prices, and alerts reference the same brands and regions. Rows go in
+through executemany bulk inserts in chunks, so a million listings fit in a few minutes.
+
+Usage: python -m benchmarks.synthetic_data --listings 1000000 --database-url sqlite:///./synthetic.db
+"""
+
+import argparse
+import csv
+import datetime as dt
+import time
+from collections import defaultdict
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+import app
+from app.core.security import hash_password
+from app.db.base import Base
+from app.models.listing import (
+    LISTING_STATUS_ACTIVE,
+    LISTING_STATUS_INACTIVE,
+    Alert,
+    ListingSource,
+    MarketStats,
+    NormalizedListing,
+    Seller,
+    SellerStats,
+)
+from app.models.user import User
+from app.services.geo import encode_geohash
+from app.services.opportunities import score_region_opportunities
+from app.services.pricing import apply_markup
+from app.services.seller_stats import _compute_reliability_score
+
+CHUNK_ROWS = 10_000
+SYNTHETIC_PASSWORD = "synthetic-password"
+REFERENCE_YEAR = 2024
+
+# brand, model, price new (BRL), category, trims
+SEGMENTS = [
+    ("Fiat", "Argo", 85_000, "popular", ["Drive", "Trekking"]),
+    ("Fiat", "Toro", 150_000, "mid", ["Freedom", "Volcano", "Ultra"]),
+    ("Volkswagen", "Polo", 95_000, "popular", ["MPI", "Highline", "GTS"]),
+    ("Volkswagen", "Nivus", 130_000, "mid", ["Comfortline", "Highline"]),
+    ("Chevrolet", "Onix", 90_000, "popular", ["LT", "LTZ", "Premier"]),
+    ("Chevrolet", "Tracker", 140_000, "mid", ["LT", "Premier"]),
+    ("Hyundai", "HB20", 88_000, "popular", ["Sense", "Comfort", "Platinum"]),
+    ("Toyota", "Corolla", 160_000, "mid", ["GLi", "XEi", "Altis"]),
+    ("Toyota", "Hilux", 280_000, "premium", ["SR", "SRV", "SRX"]),
+    ("Honda", "Civic", 170_000, "mid", ["EXL", "Touring"]),
+    ("Jeep", "Compass", 190_000, "premium", ["Sport", "Longitude", "Limited"]),
+    ("BMW", "320i", 300_000, "premium", ["GP", "M Sport"]),
+    ("Porsche", "911", 900_000, "rare", ["Carrera", "Carrera S"]),
+]
+ORIGINS = ["olx", "mercadolivre"]
+MEDALS = np.array(["gold", "silver", "bronze", ""], dtype=object)
+
+
+def _cities() -> list[tuple[str, str, float, float]]:
+    with (Path(app.__file__).parent / "data" / "br_cities.csv").open(encoding="utf-8") as handle:
+        return [
+            (row["city"], row["state"], float(row["lat"]), float(row["lng"]))
+            for row in csv.DictReader(handle)
+        ]
+
+
+def _bulk_insert(db: Session, model: type, rows: list[dict]) -> None:
+    for start in range(0, len(rows), CHUNK_ROWS):
+        db.execute(insert(model), rows[start : start + CHUNK_ROWS])
+    db.commit()
+
+
+def _sources(db: Session) -> dict[str, int]:
+    existing = dict(db.execute(select(ListingSource.name, ListingSource.id)).all())
+    missing = [
+        {"name": name, "base_url": f"https://www.{name}.com.br", "enabled": True}
+        for name in ORIGINS
+        if name not in existing
+    ]
+    if missing:
+        _bulk_insert(db, ListingSource, missing)
+        existing = dict(db.execute(select(ListingSource.name, ListingSource.id)).all())
+    return existing
+
+
+def generate_users(db: Session, rng: np.random.Generator, count: int, tag: str) -> np.ndarray:
+    # One bcrypt hash for everyone keeps generation fast and lets load tests log in as any user.
+    hashed = hash_password(SYNTHETIC_PASSWORD)
+    _bulk_insert(
+        db,
+        User,
+        [
+            {"email": f"synthetic-{tag}-{i}@example.com", "hashed_password": hashed}
+            for i in range(count)
+        ],
+    )
+    return np.array(
+        db.execute(select(User.id).where(User.email.like(f"synthetic-{tag}-%"))).scalars().all()
+    )
+
+
+def generate_sellers(
+    db: Session, rng: np.random.Generator, count: int, tag: str, sources: dict[str, int]
+) -> tuple[np.ndarray, list[dict]]:
+    origins = rng.choice(ORIGINS, size=count)
+    completed = rng.geometric(0.004, size=count)
+    cancellations = rng.binomial(completed, rng.beta(1, 30, size=count))
+    rows = [
+        {
+            "source_id": sources[origins[i]],
+            "origin": origins[i],
+            "external_id": f"synthetic-{tag}-{i}",
+            "reputation_medal": MEDALS[index] or None,
+            "reputation_score": round(float(score), 3),
+            "cancellations": int(cancellations[i]),
+            "response_time_hours": round(float(response), 1),
+            "completed_sales": int(completed[i]),
+        }
+        for i, (index, score, response) in enumerate(
+            zip(
+                rng.choice(len(MEDALS), size=count, p=[0.1, 0.2, 0.3, 0.4]),
+                rng.beta(6, 2, size=count),
+                rng.exponential(6, size=count),
+                strict=True,
+            )
+        )
+    ]
+    _bulk_insert(db, Seller, rows)
+    ids = (
+        db.execute(
+            select(Seller.id)
+            .where(Seller.external_id.like(f"synthetic-{tag}-%"))
+            .order_by(Seller.id)
+        )
+        .scalars()
+        .all()
+    )
+    return np.array(ids), rows
+
+
+def _listing_chunk(
+    rng: np.random.Generator,
+    size: int,
+    offset: int,
+    tag: str,
+    sources: dict[str, int],
+    seller_ids: np.ndarray,
+    cities: list[tuple[str, str, float, float]],
+    now: dt.datetime,
+) -> tuple[list[dict], np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    segment = rng.choice(len(SEGMENTS), size=size, p=_segment_weights())
+    city = rng.integers(len(cities), size=size)
+    year = rng.integers(2008, REFERENCE_YEAR + 1, size=size)
+    age = REFERENCE_YEAR - year + rng.random(size)
+    mileage = np.round(age * 12_000 * rng.lognormal(0, 0.35, size=size), -2).astype(int)
+    base = np.array([SEGMENTS[s][2] for s in segment], dtype=float)
+    price = np.round(
+        base * 0.9**age * np.exp(-mileage / 900_000) * rng.lognormal(0, 0.12, size=size), -2
+    )
+    jitter = rng.normal(0, 0.05, size=(size, 2))
+    photos = rng.integers(0, 16, size=size)
+    has_seller = (rng.random(size) < 0.7) & (len(seller_ids) > 0)
+    seller = (
+        seller_ids[rng.integers(len(seller_ids), size=size)]
+        if len(seller_ids)
+        else np.zeros(size, dtype=int)
+    )
+    active = rng.random(size) < 0.92
+    created = rng.integers(0, 90 * 24 * 3600, size=size)
+
+    rows = []
+    for i in range(size):
+        brand, model, _, category, trims = SEGMENTS[segment[i]]
+        city_name, state, lat, lng = cities[city[i]]
+        lat, lng = lat + jitter[i, 0], lng + jitter[i, 1]
+        origin = ORIGINS[i % 2]
+        external_id = f"SYN{tag}{offset + i}"
+        created_at = now - dt.timedelta(seconds=int(created[i]))
+        rows.append(
+            {
+                "source_id": sources[origin],
+                "external_id": external_id,
+                "brand": brand,
+                "model": model,
+                "trim": trims[i % len(trims)],
+                "title": f"{brand} {model} {trims[i % len(trims)]} {year[i]}",
+                "year": int(year[i]),
+                "mileage_km": int(mileage[i]),
+                "price_brl": float(price[i]),
+                "supplier_price_brl": float(price[i]),
+                "final_price_brl": apply_markup(float(price[i]), category),
+                "city": city_name,
+                "state": state,
+                "lat": round(lat, 5),
+                "lng": round(lng, 5),
+                "geohash": encode_geohash(lat, lng),
+                "photos": [
+                    f"https://img.example.com/{external_id}/{n}.jpg" for n in range(photos[i])
+                ],
+                "url": f"https://www.{origin}.com.br/{external_id}",
+                "seller_type": "dealer" if has_seller[i] else "private",
+                "seller_id": int(seller[i]) if has_seller[i] else None,
+                "status": LISTING_STATUS_ACTIVE if active[i] else LISTING_STATUS_INACTIVE,
+                "last_seen_at": now if active[i] else created_at,
+                "created_at": created_at,
+                "updated_at": now,
+            }
+        )
+    seller_column = np.where(has_seller, seller, 0)
+    return rows, segment, city, price, seller_column
+
+
+def _segment_weights() -> np.ndarray:
+    # Popular models dominate the market; rare ones are a sliver of it.
+    weights = np.array(
+        [{"popular": 8, "mid": 5, "premium": 2, "rare": 0.2}[s[3]] for s in SEGMENTS]
+    )
+    return weights / weights.sum()
+
+
+def generate_listings(
+    db: Session,
+    rng: np.random.Generator,
+    count: int,
+    tag: str,
+    sources: dict[str, int],
+    seller_ids: np.ndarray,
+) -> tuple[dict[tuple[str, int], list[np.ndarray]], np.ndarray, np.ndarray]:
+    """Insert listings chunk by chunk; returns prices grouped by (state, segment) and per-seller sums."""
+    cities = _cities()
+    now = dt.datetime.utcnow()
+    prices_by_segment: dict[tuple[str, int], list[np.ndarray]] = defaultdict(list)
+    size = int(seller_ids.max()) + 1 if len(seller_ids) else 1
+    seller_counts, seller_sums = np.zeros(size, dtype=int), np.zeros(size)
+    started = time.perf_counter()
+    for offset in range(0, count, CHUNK_ROWS):
+        rows, segment, city, price, seller = _listing_chunk(
+            rng, min(CHUNK_ROWS, count - offset), offset, tag, sources, seller_ids, cities, now
+        )
+        db.execute(insert(NormalizedListing), rows)
+        db.commit()
+        states = np.array([cities[c][1] for c in city])
+        for state in np.unique(states):
+            in_state = states == state
+            for s in np.unique(segment[in_state]):
+                prices_by_segment[(state, int(s))].append(price[in_state & (segment == s)])
+        seller_counts += np.bincount(seller, minlength=size)
+        seller_sums += np.bincount(seller, weights=price, minlength=size)
+        done = offset + len(rows)
+        print(
+            f"listings: {done}/{count} ({done / (time.perf_counter() - started):,.0f} rows/s)",
+            end="\r",
+        )
+    print()
+    return prices_by_segment, seller_counts, seller_sums
+
+
+def generate_market_stats(
+    db: Session, prices_by_segment: dict[tuple[str, int], list[np.ndarray]]
+) -> int:
+    rows = []
+    for (state, s), chunks in prices_by_segment.items():
+        prices = np.concatenate(chunks)
+        p25, median, p75 = np.percentile(prices, [25, 50, 75])
+        brand, model = SEGMENTS[s][:2]
+        rows.append(
+            {
+                "region_key": state,
+                "brand": brand,
+                "model": model,
+                "year_range": None,
+                "median_price": float(median),
+                "p25": float(p25),
+                "p75": float(p75),
+            }
+        )
+    _bulk_insert(db, MarketStats, rows)
+    return len(rows)
+
+
+def generate_seller_stats(
+    db: Session, seller_ids: np.ndarray, sellers: list[dict], counts: np.ndarray, sums: np.ndarray
+) -> int:
+    rows = []
+    for seller_id, seller in zip(seller_ids, sellers, strict=True):
+        listings = int(counts[seller_id])
+        if not listings:
+            continue
+        stats = SimpleNamespace(
+            completed_sales=seller["completed_sales"],
+            problem_rate=seller["cancellations"] / max(seller["completed_sales"] or 1, 1),
+        )
+        rows.append(
+            {
+                "seller_id": int(seller_id),
+                "average_price_brl": round(float(sums[seller_id] / listings), 2),
+                "listings_count": listings,
+                "completed_sales": stats.completed_sales,
+                "problem_rate": stats.problem_rate,
+                "reliability_score": _compute_reliability_score(stats, SimpleNamespace(**seller)),
+            }
+        )
+    _bulk_insert(db, SellerStats, rows)
+    return len(rows)
+
+
+def generate_alerts(
+    db: Session, rng: np.random.Generator, count: int, user_ids: np.ndarray
+) -> None:
+    states = sorted({state for _, state, _, _ in _cities()})
+    rows = []
+    for i in range(count):
+        brand, model, base, _, _ = SEGMENTS[rng.integers(len(SEGMENTS))]
+        query: dict = {"brand": brand}
+        if rng.random() < 0.7:
+            query["model"] = model
+        if rng.random() < 0.6:
+            query["max_price"] = int(base * rng.uniform(0.4, 0.9))
+        if rng.random() < 0.4:
+            query["min_year"] = int(rng.integers(2012, REFERENCE_YEAR))
+        rows.append(
+            {
+                "user_id": int(user_ids[i % len(user_ids)]),
+                "query_json": query,
+                "region_key": "*" if rng.random() < 0.2 else states[rng.integers(len(states))],
+                "active": bool(rng.random() < 0.9),
+            }
+        )
+    _bulk_insert(db, Alert, rows)
+
+
+def generate(
+    database_url: str,
+    listings: int,
+    sellers: int,
+    users: int,
+    alerts: int,
+    seed: int = 7,
+    score: bool = False,
+    tag: Optional[str] = None,
+) -> None:
+    engine = create_engine(database_url)
+    Base.metadata.create_all(engine)
+    rng = np.random.default_rng(seed)
+    # Tag external ids and emails so several runs can be appended to one database.
+    tag = tag or dt.datetime.utcnow().strftime("%y%m%d%H%M%S")
+    with Session(engine) as db:
+        sources = _sources(db)
+        user_ids = generate_users(db, rng, users, tag)
+        seller_ids, seller_rows = generate_sellers(db, rng, sellers, tag, sources)
+        print(
+            f"users: {len(user_ids)} (password {SYNTHETIC_PASSWORD!r}), sellers: {len(seller_ids)}"
+        )
+        first_id = (
+            db.execute(select(NormalizedListing.id).order_by(NormalizedListing.id.desc())).scalar()
+            or 0
+        ) + 1
+        prices, counts, sums = generate_listings(db, rng, listings, tag, sources, seller_ids)
+        print(f"listing ids: {first_id}..{first_id + listings - 1}")
+        print(f"market_stats: {generate_market_stats(db, prices)} segments")
+        print(
+            f"seller_stats: {generate_seller_stats(db, seller_ids, seller_rows, counts, sums)} sellers"
+        )
+        if user_ids.size:
+            generate_alerts(db, rng, alerts, user_ids)
+            print(f"alerts: {alerts}")
+        if score:
+            for state in sorted({state for state, _ in prices}):
+                score_region_opportunities(db, state)
+            db.commit()
+            print("opportunity scores written")
+    engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--database-url", default="sqlite:///./synthetic.db")
+    parser.add_argument("--listings", type=int, default=100_000)
+    parser.add_argument("--sellers", type=int, default=5_000)
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--alerts", type=int, default=5_000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument(
+        "--score", action="store_true", help="run the opportunity scoring job per state afterwards"
+    )
+    args = parser.parse_args()
+    generate(
+        args.database_url,
+        args.listings,
+        args.sellers,
+        args.users,
+        args.alerts,
+        args.seed,
+        args.score,
+    )
+
+
+if __name__ == "__main__":
+    main()